@@ -1,16 +1,38 @@
 import os
-from supabase import create_client, Client
+import asyncio
+from supabase import acreate_client, AsyncClient
 from dotenv import load_dotenv
 
-load_dotenv() 
+load_dotenv()
 
 url: str = os.environ.get("SUPABASE_URL")
 key: str = os.environ.get("SUPABASE_SERVICE_KEY")
 
-# initialize supabase client
-try:
-    supabase: Client = create_client(url, key)
-    print("Supabase client initialized successfully.")
-except Exception as e:
-    print(f"Error initializing Supabase client: {e}")
-    supabase = None
\ No newline at end of file
+_client = None
+_client_lock = asyncio.Lock()
+
+
+async def get_db() -> AsyncClient:
+    """
+    Shared async Supabase client, created on first use.
+    Set SUPABASE_BACKEND=local to use the in-process stand-in from local_db.
+    """
+    global _client
+    if _client is None:
+        async with _client_lock:
+            if _client is None:
+                if os.environ.get("SUPABASE_BACKEND") == "local":
+                    from local_db import LocalSupabase
+                    _client = LocalSupabase()
+                    print("Using local in-process Supabase stand-in.")
+                else:
+                    # initialize supabase client
+                    _client = await acreate_client(url, key)
+                    print("Supabase client initialized successfully.")
+    return _client
+
+
+def set_db(client) -> None:
+    """Swap the shared client, e.g. for a LocalSupabase when measuring offline"""
+    global _client
+    _client = client
@@ -0,0 +1,443 @@
+"""
+In-process stand-in for the async Supabase client.
+
+Implements the subset of the PostgREST query builder the routes and services
+use (select/insert/upsert/update/delete, the common filters including or_()
+expressions, ordering, limits, single rows and RPCs) against plain Python lists, so the API can be
+exercised and load-tested without a network. An optional per-request latency
+simulates the round-trip to PostgREST.
+
+Enable it with SUPABASE_BACKEND=local, or call db.set_db(LocalSupabase(...)).
+"""
+import asyncio
+import copy
+import itertools
+import json
+import math
+import re
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from postgrest.exceptions import APIError
+
+
+class LocalResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _resolve_defaults(values: Dict) -> Dict:
+    return {k: (_now() if v == "now()" else v) for k, v in values.items()}
+
+
+def _get_path(row: Dict, column: str) -> Any:
+    """Read a column, following PostgREST JSON paths like metadata->>source"""
+    parts = re.split(r"->>?", column)
+    value = row.get(parts[0].strip())
+    for part in parts[1:]:
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return None
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part.strip())
+    if "->>" in column and value is not None and not isinstance(value, str):
+        value = json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+    return value
+
+
+def _coerce(value: Any, like: Any) -> Any:
+    """PostgREST compares filter values as text; mimic that for mixed types"""
+    if like is None or value is None or type(value) is type(like):
+        return value
+    try:
+        if isinstance(like, bool):
+            return str(value).lower() == "true"
+        if isinstance(like, int):
+            return int(value)
+        if isinstance(like, float):
+            return float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    return str(value)
+
+
+def _like_to_regex(pattern: str, ignore_case: bool = True) -> re.Pattern:
+    """LIKE pattern as a regex; a backslash makes the next character literal, as in Postgres"""
+    regex, chars = "", iter(pattern)
+    for char in chars:
+        if char == "\\":
+            regex += re.escape(next(chars, "\\"))
+        elif char == "%":
+            regex += ".*"
+        elif char == "_":
+            regex += "."
+        else:
+            regex += re.escape(char)
+    return re.compile(f"^{regex}$", (re.IGNORECASE if ignore_case else 0) | re.DOTALL)
+
+
+def _compare(op: str, actual: Any, expected: Any) -> bool:
+    if op == "is":
+        return actual is expected or (expected is None and actual is None)
+    if op == "in":
+        return any(actual == _coerce(value, actual) for value in expected)
+    if op in ("like", "ilike"):
+        return actual is not None and bool(_like_to_regex(expected, op == "ilike").match(str(actual)))
+    if actual is None:
+        return False
+    expected = _coerce(expected, actual)
+    try:
+        return {
+            "eq": lambda: actual == expected,
+            "neq": lambda: actual != expected,
+            "gt": lambda: actual > expected,
+            "gte": lambda: actual >= expected,
+            "lt": lambda: actual < expected,
+            "lte": lambda: actual <= expected,
+        }[op]()
+    except TypeError:
+        return False
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split a PostgREST logic expression on commas outside parentheses and quotes"""
+    parts, depth, quoted, current = [], 0, False, ""
+    for i, char in enumerate(text):
+        if char == '"' and (i == 0 or text[i - 1] != "\\"):
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            continue
+        current += char
+    if current.strip():
+        parts.append(current)
+    return [part.strip() for part in parts]
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def _parse_logic(expression: str) -> Callable[[Dict], bool]:
+    """Predicate for one or_() term: "col.op.value", "col.not.op.value" or nested and(...)/or(...)"""
+    expression = expression.strip()
+    group = re.match(r"^(not\.)?(and|or)\((.*)\)$", expression, re.DOTALL)
+    if group:
+        children = [_parse_logic(term) for term in _split_top_level(group.group(3))]
+        combine = all if group.group(2) == "and" else any
+        negate = bool(group.group(1))
+        return lambda row: combine(child(row) for child in children) != negate
+
+    column, op, value = expression.split(".", 2)
+    negate = op == "not"
+    if negate:
+        op, value = value.split(".", 1)
+    if op == "in":
+        value = [_unquote(item) for item in _split_top_level(value.strip()[1:-1])]
+    elif op == "is":
+        value = {"null": None, "true": True, "false": False}.get(value.lower(), value)
+    elif op in ("like", "ilike"):
+        value = _unquote(value).replace("*", "%")
+    else:
+        value = _unquote(value)
+    return lambda row: _compare(op, _get_path(row, column), value) != negate
+
+
+def _to_vector(value: Any) -> Optional[List[float]]:
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _match(rows: List[Dict], params: Dict, extra_columns: List[str]) -> List[Dict]:
+    query = _to_vector(params["query_embedding"])
+    matches = []
+    for row in rows:
+        embedding = _to_vector(row.get("embedding"))
+        if embedding is None:
+            continue
+        similarity = _cosine(query, embedding)
+        if similarity > params.get("match_threshold", 0):
+            match = {"id": row.get("id"), "content": row.get("content"), "metadata": row.get("metadata")}
+            match.update({column: row.get(column) for column in extra_columns})
+            match["similarity"] = similarity
+            matches.append(match)
+    matches.sort(key=lambda match: match["similarity"], reverse=True)
+    return matches[:params.get("match_count", 5)]
+
+
+def match_documents(db: "LocalSupabase", params: Dict) -> List[Dict]:
+    return _match(db.rows("documents"), params, [])
+
+
+def match_datacenter_documents(db: "LocalSupabase", params: Dict) -> List[Dict]:
+    rows = db.rows("datacenter_knowledge")
+    if params.get("filter_type"):
+        rows = [row for row in rows if row.get("document_type") == params["filter_type"]]
+    return _match(rows, params, ["document_type"])
+
+
+class LocalQuery:
+    def __init__(self, db: "LocalSupabase", table: str):
+        self._db = db
+        self._table = table
+        self._operation = "select"
+        self._columns: Optional[List[str]] = None
+        self._payload: Any = None
+        self._on_conflict = "id"
+        self._count: Optional[str] = None
+        self._filters: List[Callable[[Dict], bool]] = []
+        self._order: List[tuple] = []
+        self._offset = 0
+        self._limit: Optional[int] = None
+        self._single = False
+        self._maybe_single = False
+
+    # --- operations -------------------------------------------------------
+
+    def select(self, *columns: str, count: Optional[str] = None) -> "LocalQuery":
+        spec = ",".join(columns) or "*"
+        self._columns = None if spec.strip() == "*" else [c.strip() for c in spec.split(",") if c.strip()]
+        self._count = count
+        return self
+
+    def insert(self, rows: Any, **kwargs) -> "LocalQuery":
+        self._operation = "insert"
+        self._payload = rows
+        return self
+
+    def upsert(self, rows: Any, on_conflict: str = "id", **kwargs) -> "LocalQuery":
+        self._operation = "upsert"
+        self._payload = rows
+        self._on_conflict = on_conflict or "id"
+        return self
+
+    def update(self, values: Dict, **kwargs) -> "LocalQuery":
+        self._operation = "update"
+        self._payload = values
+        return self
+
+    def delete(self, **kwargs) -> "LocalQuery":
+        self._operation = "delete"
+        return self
+
+    # --- filters ----------------------------------------------------------
+
+    def _filter(self, op: str, column: str, value: Any) -> "LocalQuery":
+        self._filters.append(lambda row: _compare(op, _get_path(row, column), value))
+        return self
+
+    def eq(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter("eq", column, value)
+
+    def neq(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter("neq", column, value)
+
+    def gt(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter("gt", column, value)
+
+    def gte(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter("gte", column, value)
+
+    def lt(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter("lt", column, value)
+
+    def lte(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter("lte", column, value)
+
+    def in_(self, column: str, values: List[Any]) -> "LocalQuery":
+        return self._filter("in", column, list(values))
+
+    def ilike(self, column: str, pattern: str) -> "LocalQuery":
+        return self._filter("ilike", column, pattern)
+
+    def is_(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter("is", column, None if value in (None, "null") else value)
+
+    def or_(self, filters: str, **kwargs) -> "LocalQuery":
+        terms = [_parse_logic(term) for term in _split_top_level(filters)]
+        self._filters.append(lambda row: any(term(row) for term in terms))
+        return self
+
+    # --- modifiers --------------------------------------------------------
+
+    def order(self, column: str, desc: bool = False, **kwargs) -> "LocalQuery":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, count: int, **kwargs) -> "LocalQuery":
+        self._limit = count
+        return self
+
+    def range(self, start: int, end: int, **kwargs) -> "LocalQuery":
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def single(self) -> "LocalQuery":
+        self._single = True
+        return self
+
+    def maybe_single(self) -> "LocalQuery":
+        self._maybe_single = True
+        return self
+
+    # --- execution --------------------------------------------------------
+
+    def _matches(self, row: Dict) -> bool:
+        return all(check(row) for check in self._filters)
+
+    def _sorted(self, rows: List[Dict]) -> List[Dict]:
+        # Apply the last ordering first so earlier .order() calls take precedence
+        for column, desc in reversed(self._order):
+            present = [row for row in rows if _get_path(row, column) is not None]
+            missing = [row for row in rows if _get_path(row, column) is None]
+            present.sort(key=lambda row: _get_path(row, column), reverse=desc)
+            # Postgres puts NULLs last ascending and first descending
+            rows = missing + present if desc else present + missing
+        return rows
+
+    def _project(self, row: Dict) -> Dict:
+        if self._columns is None:
+            return copy.deepcopy(row)
+        return {column: copy.deepcopy(_get_path(row, column)) for column in self._columns}
+
+    def _run(self) -> LocalResponse:
+        table = self._db.rows(self._table)
+
+        if self._operation in ("insert", "upsert"):
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            written = []
+            for values in payload:
+                values = _resolve_defaults(values)
+                existing = None
+                if self._operation == "upsert" and self._on_conflict in values:
+                    existing = next(
+                        (row for row in table if row.get(self._on_conflict) == values[self._on_conflict]),
+                        None
+                    )
+                if existing is not None:
+                    existing.update(values)
+                    written.append(existing)
+                    continue
+                if self._operation == "insert" and "id" in values and any(
+                    row.get("id") == values["id"] for row in table
+                ):
+                    raise APIError({
+                        "message": f'duplicate key value violates unique constraint "{self._table}_pkey"',
+                        "code": "23505"
+                    })
+                row = {"id": self._db.next_id(self._table), "created_at": _now()}
+                row.update(values)
+                table.append(row)
+                written.append(row)
+            return LocalResponse([self._project(row) for row in written])
+
+        matched = [row for row in table if self._matches(row)]
+
+        if self._operation == "update":
+            values = _resolve_defaults(self._payload)
+            for row in matched:
+                row.update(copy.deepcopy(values))
+            return LocalResponse([self._project(row) for row in matched])
+
+        if self._operation == "delete":
+            self._db.tables[self._table] = [row for row in table if not self._matches(row)]
+            return LocalResponse([self._project(row) for row in matched])
+
+        total = len(matched)
+        rows = self._sorted(matched)[self._offset:]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        data = [self._project(row) for row in rows]
+        count = total if self._count else None
+
+        if self._single:
+            if len(data) != 1:
+                raise APIError({
+                    "message": "JSON object requested, multiple (or no) rows returned",
+                    "code": "PGRST116",
+                    "details": f"The result contains {len(data)} rows"
+                })
+            return LocalResponse(data[0], count)
+        if self._maybe_single:
+            return LocalResponse(data[0], count) if data else None
+        return LocalResponse(data, count)
+
+    async def execute(self) -> LocalResponse:
+        await self._db.round_trip()
+        return self._run()
+
+
+class LocalRPC:
+    def __init__(self, db: "LocalSupabase", function: Callable, params: Dict):
+        self._db = db
+        self._function = function
+        self._params = params
+
+    async def execute(self) -> LocalResponse:
+        await self._db.round_trip()
+        return LocalResponse(self._function(self._db, self._params))
+
+
+class LocalSupabase:
+    """Drop-in for supabase.AsyncClient backed by in-memory tables"""
+
+    def __init__(self, tables: Optional[Dict[str, List[Dict]]] = None, latency: float = 0.0):
+        self.tables: Dict[str, List[Dict]] = {name: list(rows) for name, rows in (tables or {}).items()}
+        self.latency = latency
+        self.requests = 0
+        self.functions: Dict[str, Callable] = {
+            "match_documents": match_documents,
+            "match_datacenter_documents": match_datacenter_documents,
+        }
+        self._ids: Dict[str, itertools.count] = {}
+
+    def rows(self, table: str) -> List[Dict]:
+        return self.tables.setdefault(table, [])
+
+    def next_id(self, table: str) -> int:
+        if table not in self._ids:
+            existing = [row["id"] for row in self.rows(table) if isinstance(row.get("id"), int)]
+            self._ids[table] = itertools.count(max(existing, default=0) + 1)
+        return next(self._ids[table])
+
+    def register_rpc(self, name: str, function: Callable[["LocalSupabase", Dict], Any]) -> None:
+        self.functions[name] = function
+
+    async def round_trip(self) -> None:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def table(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> LocalRPC:
+        if name not in self.functions:
+            raise APIError({"message": f"Could not find the function public.{name}", "code": "PGRST202"})
+        return LocalRPC(self, self.functions[name], params or {})
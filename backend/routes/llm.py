@@ -3,16 +3,16 @@ import json
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, EmailStr
 from dotenv import load_dotenv
-from openai import OpenAI
-from typing import List, Optional
+from typing import Dict, List, Optional
+from services.chat_stream import ChatReplyStreamParser
+from services.openai_client import get_openai_client
+from services.validation_service import get_validation_service
+from sse import event_stream
 
 # Load env vars
 load_dotenv()
 
-# Initialize OpenAI client (new way for openai>=1.0.0)
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-if not client.api_key:
+if not os.getenv("OPENAI_API_KEY"):
     raise ValueError("OPENAI_API_KEY not found in environment variables. Please check your .env file.")
 
 router = APIRouter()
@@ -31,6 +31,9 @@ class TicketData(BaseModel):
 class ChatMessage(BaseModel):
     message: str
     ticket_data: TicketData
+    # Lets validation stages start in the background as fields arrive;
+    # pass the same id to /api/tickets/create
+    session_id: Optional[str] = None
 
 class ChatResponse(BaseModel):
     response: str
@@ -80,6 +83,90 @@ Common parts:
 
 Be friendly and natural in your responses!"""
 
+REQUIRED_FIELDS = ["device", "pod", "rack", "switch", "ports", "required_parts", "action", "assign_to_email"]
+FALLBACK_RESPONSE = "I'm having trouble processing that. Could you rephrase?"
+
+def build_chat_messages(chat_data: ChatMessage) -> List[Dict]:
+    # Build context about current ticket state
+    context = f"Current ticket data: {json.dumps(chat_data.ticket_data.dict(), indent=2)}\n\nUser message: {chat_data.message}"
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": context}
+    ]
+
+def strip_code_fences(ai_response: str) -> str:
+    # Sometimes GPT wraps JSON in markdown code blocks
+    if "```json" in ai_response:
+        return ai_response.split("```json")[1].split("```")[0].strip()
+    if "```" in ai_response:
+        return ai_response.split("```")[1].split("```")[0].strip()
+    return ai_response
+
+def is_extracted_value(value) -> bool:
+    """Whether an extracted field should overwrite the current ticket data"""
+    if isinstance(value, list):
+        return len(value) > 0
+    return value is not None and value != ""
+
+def merge_extracted_data(current_ticket_data: Dict, extracted: Dict) -> Dict:
+    updated_ticket_data = current_ticket_data.copy()
+    for key, value in extracted.items():
+        if is_extracted_value(value):
+            updated_ticket_data[key] = value
+    return updated_ticket_data
+
+def finalize_chat(chat_data: ChatMessage, parsed_response: Optional[Dict]) -> ChatResponse:
+    """Merge the parsed model reply into the ticket and work out what's still missing"""
+    if parsed_response is None:
+        # Fallback if JSON parsing failed
+        return ChatResponse(
+            response=FALLBACK_RESPONSE,
+            ticket_data=chat_data.ticket_data,
+            is_complete=False,
+            missing_fields=[]
+        )
+
+    # Merge extracted data with current data
+    updated_ticket_data = merge_extracted_data(
+        chat_data.ticket_data.dict(),
+        parsed_response.get("extracted_data") or {}
+    )
+    print(f"[DEBUG] Updated ticket data: {updated_ticket_data}")
+
+    # Check if all fields are complete
+    missing_fields = [field for field in REQUIRED_FIELDS if not updated_ticket_data.get(field)]
+    is_complete = len(missing_fields) == 0
+
+    print(f"[DEBUG] Is complete: {is_complete}, Missing fields: {missing_fields}")
+
+    return ChatResponse(
+        response=parsed_response.get("response_message", "Got it!"),
+        ticket_data=TicketData(**updated_ticket_data),
+        is_complete=is_complete,
+        missing_fields=missing_fields
+    )
+
+async def prefetch_validation(chat_data: ChatMessage, result: ChatResponse):
+    """Speculatively start validation for the fields collected so far; never fails the chat"""
+    if not chat_data.session_id:
+        return
+    try:
+        started = await get_validation_service().prefetch(chat_data.session_id, result.ticket_data.dict())
+        if started:
+            print(f"[DEBUG] Prefetching validation stages: {started}")
+    except Exception as e:
+        print(f"[DEBUG] Validation prefetch failed: {e}")
+
+def parse_chat_reply(ai_response: str) -> Optional[Dict]:
+    try:
+        parsed_response = json.loads(strip_code_fences(ai_response))
+        print("[DEBUG] Successfully parsed JSON response")
+        return parsed_response
+    except json.JSONDecodeError as e:
+        print(f"[DEBUG] JSON parsing failed: {e}")
+        print(f"[DEBUG] Raw response: {ai_response}")
+        return None
+
 @router.post("/api/chat", response_model=ChatResponse)
 async def chat_endpoint(chat_data: ChatMessage):
     """
@@ -87,23 +174,12 @@ async def chat_endpoint(chat_data: ChatMessage):
     """
     try:
         print(f"[DEBUG] Received message: {chat_data.message}")
-        
-        # Prepare the conversation context
-        user_message = chat_data.message
-        current_ticket_data = chat_data.ticket_data.dict()
-        
-        # Build context about current ticket state
-        context = f"Current ticket data: {json.dumps(current_ticket_data, indent=2)}\n\nUser message: {user_message}"
-        
         print("[DEBUG] Calling OpenAI API...")
         
-        # Call OpenAI API using new client method
-        response = client.chat.completions.create(
+        # Call OpenAI API without blocking the event loop
+        response = await get_openai_client().chat.completions.create(
             model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": context}
-            ],
+            messages=build_chat_messages(chat_data),
             temperature=0.7,
             max_tokens=500,
             timeout=30  # 30 second timeout
@@ -116,56 +192,52 @@ async def chat_endpoint(chat_data: ChatMessage):
         
         print(f"[DEBUG] AI Response: {ai_response[:200]}...")  # Print first 200 chars
         
-        # Try to extract JSON from response
-        try:
-            # Sometimes GPT wraps JSON in markdown code blocks
-            if "```json" in ai_response:
-                ai_response = ai_response.split("```json")[1].split("```")[0].strip()
-            elif "```" in ai_response:
-                ai_response = ai_response.split("```")[1].split("```")[0].strip()
-            
-            parsed_response = json.loads(ai_response)
-            print("[DEBUG] Successfully parsed JSON response")
-        except json.JSONDecodeError as e:
-            print(f"[DEBUG] JSON parsing failed: {e}")
-            print(f"[DEBUG] Raw response: {ai_response}")
-            # Fallback if JSON parsing fails
-            return ChatResponse(
-                response="I'm having trouble processing that. Could you rephrase?",
-                ticket_data=chat_data.ticket_data,
-                is_complete=False,
-                missing_fields=[]
-            )
-        
-        # Merge extracted data with current data
-        extracted = parsed_response.get("extracted_data", {})
-        updated_ticket_data = current_ticket_data.copy()
-        
-        for key, value in extracted.items():
-            if value is not None and value != "":
-                if isinstance(value, list) and len(value) > 0:
-                    updated_ticket_data[key] = value
-                elif not isinstance(value, list):
-                    updated_ticket_data[key] = value
-        
-        print(f"[DEBUG] Updated ticket data: {updated_ticket_data}")
-        
-        # Check if all fields are complete
-        required_fields = ["device", "pod", "rack", "switch", "ports", "required_parts", "action", "assign_to_email"]
-        missing_fields = [field for field in required_fields if not updated_ticket_data.get(field)]
-        is_complete = len(missing_fields) == 0
-        
-        print(f"[DEBUG] Is complete: {is_complete}, Missing fields: {missing_fields}")
-        
-        return ChatResponse(
-            response=parsed_response.get("response_message", "Got it!"),
-            ticket_data=TicketData(**updated_ticket_data),
-            is_complete=is_complete,
-            missing_fields=missing_fields
-        )
+        result = finalize_chat(chat_data, parse_chat_reply(ai_response))
+        await prefetch_validation(chat_data, result)
+        return result
         
     except Exception as e:
         print(f"[ERROR] Exception in chat_endpoint: {str(e)}")
         import traceback
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
+
+async def stream_chat(chat_data: ChatMessage):
+    """
+    Yield "token" events with the conversational reply as it is generated,
+    a "field" event per extracted_data field as soon as its value parses,
+    then "done" with the same payload /api/chat returns
+    """
+    stream = await get_openai_client().chat.completions.create(
+        model="gpt-4o-mini",
+        messages=build_chat_messages(chat_data),
+        temperature=0.7,
+        max_tokens=500,
+        timeout=30,
+        stream=True
+    )
+
+    parser = ChatReplyStreamParser()
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        for kind, payload in parser.feed(delta):
+            if kind == "message":
+                yield "token", {"text": payload}
+            elif is_extracted_value(payload[1]):
+                yield "field", {"field": payload[0], "value": payload[1]}
+
+    result = finalize_chat(chat_data, parse_chat_reply(parser.text))
+    await prefetch_validation(chat_data, result)
+    yield "done", result.dict()
+
+@router.post("/api/chat/stream")
+async def chat_stream_endpoint(chat_data: ChatMessage):
+    """
+    Server-sent events version of /api/chat: "token", "field", then "done" (or "error")
+    """
+    print(f"[DEBUG] Received message (stream): {chat_data.message}")
+    return event_stream(stream_chat(chat_data))
@@ -1,6 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
 from schemas import QueryRequest, QueryResponse
-from services.rag_service import process_query
+from routes.tickets import get_current_user_id
+from services.answer_cache import get_answer_cache
+from services.role_cache import get_role_cache
+from services.rag_service import process_query, stream_query
+from sse import event_stream
 
 router = APIRouter()
 
@@ -12,6 +17,24 @@ async def query_knowledge_base(request: QueryRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/query/stream")
+async def stream_knowledge_base(request: QueryRequest):
+    """
+    Server-sent events: "sources" once retrieval returns, then "token"
+    events as the answer is generated, then "done" (or "error")
+    """
+    return event_stream(stream_query(request.query))
+
+@router.get("/query/cache/stats")
+async def answer_cache_stats(current_user_id: Optional[str] = Depends(get_current_user_id)):
+    """Hit rate of the semantic answer cache in front of /query (admins only)"""
+    if not current_user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    if await get_role_cache().get_role(current_user_id) != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view answer cache stats")
+    cache = get_answer_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
 @router.get("/health")
 async def health_check():
     return {"status": "healthy"}
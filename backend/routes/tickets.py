@@ -1,16 +1,44 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
 from pydantic import BaseModel
 from typing import List, Optional, Dict
-from services.validation_service import TicketValidationService
-from db import supabase
+from services.validation_service import get_validation_service
+from services.user_directory import get_user_directory
+from services.role_cache import get_role_cache, DEFAULT_ROLE
+from services.ticket_jobs import FINISHED, QueueFullError, get_ticket_job_queue
+from fastapi.responses import JSONResponse
+from sse import event_stream
+from db import get_db
 from clerk_backend_api import Clerk
+import asyncio
 import os
+import re
+import json
+import base64
 import jwt
 
 clerk_client = Clerk(bearer_auth=os.getenv("CLERK_SECRET_KEY"))
 
 router = APIRouter(prefix="/api/tickets", tags=["tickets"])
-validation_service = TicketValidationService()
+validation_service = get_validation_service()
+
+# Columns the Kanban board renders; the large JSON-string columns below are
+# fetched per ticket from /{ticket_id}/context when a card is expanded
+BOARD_FIELDS = [
+    "id", "title", "description", "device", "pod", "rack", "switch", "ports",
+    "required_parts", "priority", "priority_justification", "status",
+    "estimated_duration_minutes", "created_at", "assigned_to"
+]
+CONTEXT_FIELDS = [
+    "technical_requirements", "datacenter_context", "technical_context",
+    "warnings", "suggestions"
+]
+# Keyset columns, always selected so the next cursor can be built
+CURSOR_FIELDS = ["priority", "created_at", "id"]
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+MAX_BULK_TICKETS = 200
+MAX_BATCH_UPDATES = 500
+TICKET_STATUSES = ["ready", "in_progress", "complete"]
 
 class TicketCreate(BaseModel):
     device: str
@@ -19,6 +47,8 @@ class TicketCreate(BaseModel):
     switch: Optional[str]
     ports: Optional[List[str]]
     required_parts: Optional[List[str]] = []
+    # Token from an earlier /validate, to reuse its unchanged stages
+    validation_token: Optional[str] = None
 
 
 class ValidationResponse(BaseModel):
@@ -26,6 +56,9 @@ class ValidationResponse(BaseModel):
     warnings: List[str]
     suggestions: List[str]
     technical_requirements: List[str]
+    # Pass to /create (or the next /validate) to skip unchanged stages
+    validation_token: Optional[str] = None
+    reused_stages: List[str] = []
 
 
 class TicketCreateRequest(BaseModel):
@@ -38,6 +71,9 @@ class TicketCreateRequest(BaseModel):
     action: Optional[str] = "INSTALL"
     description: Optional[str] = ""
     assign_to_email: Optional[str] = None
+    validation_token: Optional[str] = None
+    # Intake chat session whose prefetched validation stages to pick up
+    session_id: Optional[str] = None
 
 
 class TicketResponse(BaseModel):
@@ -48,6 +84,17 @@ class TicketResponse(BaseModel):
     priority: Optional[Dict] = None
 
 
+class BulkTicketCreateRequest(BaseModel):
+    tickets: List[TicketCreateRequest]
+
+
+class BulkTicketResponse(BaseModel):
+    created: int
+    failed: int
+    # One entry per submitted ticket, in order
+    results: List[TicketResponse]
+
+
 class TicketAssignRequest(BaseModel):
     technician_id: str
 
@@ -55,20 +102,22 @@ class TicketAssignRequest(BaseModel):
 class TicketStatusUpdate(BaseModel):
     status: str
 
+
+class TicketBatchChange(BaseModel):
+    ticket_id: str
+    status: Optional[str] = None
+    technician_id: Optional[str] = None
+
+
+class TicketBatchUpdate(BaseModel):
+    updates: List[TicketBatchChange]
+
 async def get_user_id_by_email(email: str) -> Optional[str]:
     """Look up user_id from email"""
     try:
-        # Strip whitespace and convert to lowercase
-        clean_email = email.strip().lower()
-        
-        result = supabase.table("users")\
-            .select("id, email")\
-            .execute()
-        
-        # Manual search with normalized comparison
-        for user in result.data:
-            if user.get("email", "").strip().lower() == clean_email:
-                return user.get("id")
+        user_id = await get_user_directory().get_user_id(email)
+        if user_id:
+            return user_id
         
         print(f"No match found for email: {email}")
         return None
@@ -78,6 +127,85 @@ async def get_user_id_by_email(email: str) -> Optional[str]:
         return None
 
 
+async def enrich_assignee_emails(tickets: List[Dict]) -> List[Dict]:
+    """Copy tickets with assigned_to_email filled in, using one batched user lookup"""
+    try:
+        emails = await get_user_directory().get_emails(
+            ticket["assigned_to"] for ticket in tickets if ticket.get("assigned_to")
+        )
+    except Exception as e:
+        print(f"Assignee lookup error: {e}")
+        emails = {}
+    
+    return [
+        {**ticket, "assigned_to_email": emails.get(ticket["assigned_to"]) if ticket.get("assigned_to") else None}
+        for ticket in tickets
+    ]
+
+
+def resolve_fields(fields: Optional[str]) -> str:
+    """select() spec for fields= ("board" by default, "all", or a comma-separated column list)"""
+    if not fields or fields == "board":
+        return ", ".join(BOARD_FIELDS)
+    if fields == "all":
+        return "*"
+    
+    columns = [column.strip() for column in fields.split(",") if column.strip()]
+    invalid = [column for column in columns if not re.fullmatch(r"[a-z_][a-z0-9_]*", column)]
+    if invalid or not columns:
+        raise HTTPException(status_code=400, detail=f"Invalid fields: {fields}")
+    # assigned_to is needed to fill in assigned_to_email
+    extra = [column for column in CURSOR_FIELDS + ["assigned_to"] if column not in columns]
+    return ", ".join(columns + extra)
+
+
+def encode_cursor(ticket: Dict) -> str:
+    key = [ticket.get(column) for column in CURSOR_FIELDS]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if isinstance(key, list) and len(key) == len(CURSOR_FIELDS):
+            return key
+    except ValueError:
+        pass
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _filter_value(value) -> str:
+    """Quote a value for a PostgREST logic expression"""
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def paginate_tickets(query, cursor: Optional[str], limit: int):
+    """Order by (priority, created_at desc, id desc) and start after cursor"""
+    query = query\
+        .order("priority")\
+        .order("created_at", desc=True)\
+        .order("id", desc=True)
+    
+    if cursor:
+        priority, created_at, ticket_id = (_filter_value(value) for value in decode_cursor(cursor))
+        query = query.or_(
+            f"priority.gt.{priority},"
+            f"and(priority.eq.{priority},created_at.lt.{created_at}),"
+            f"and(priority.eq.{priority},created_at.eq.{created_at},id.lt.{ticket_id})"
+        )
+    
+    # One extra row tells whether there is a next page
+    return query.limit(limit + 1)
+
+
+async def ticket_page(rows: List[Dict], limit: int) -> Dict:
+    page = rows[:limit]
+    return {
+        "tickets": await enrich_assignee_emails(page),
+        "next_cursor": encode_cursor(page[-1]) if len(rows) > limit else None
+    }
+
+
 async def get_current_user_id(authorization: Optional[str] = Header(None)) -> Optional[str]:
     if not authorization or not authorization.startswith("Bearer "):
         return None
@@ -97,19 +225,15 @@ async def get_current_user_id(authorization: Optional[str] = Header(None)) -> Op
 
 
 async def get_user_role(user_id: Optional[str] = None) -> Optional[str]:
-    """Get user role from Supabase"""
+    """Get user role (cached, see services/role_cache.py)"""
     if not user_id:
         return None
     
     try:
-        result = supabase.table("user_roles")\
-            .select("role")\
-            .eq("user_id", user_id)\
-            .single()\
-            .execute()
-        return result.data.get("role") if result.data else "technician"
-    except:
-        return "technician"  # Default role
+        return await get_role_cache().get_role(user_id)
+    except Exception as e:
+        print(f"Role lookup error: {e}")
+        return DEFAULT_ROLE
 
 
 # ============================================================================
@@ -120,7 +244,9 @@ async def get_user_role(user_id: Optional[str] = None) -> Optional[str]:
 async def validate_ticket(ticket: TicketCreate):
     """Validate ticket using dual-RAG system"""
     try:
-        result = await validation_service.validate_ticket(ticket.model_dump())
+        ticket_dict = ticket.model_dump()
+        validation_token = ticket_dict.pop("validation_token")
+        result = await validation_service.validate_ticket(ticket_dict, validation_token)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -129,14 +255,20 @@ async def validate_ticket(ticket: TicketCreate):
 @router.post("/create", response_model=TicketResponse)
 async def create_ticket(
     ticket: TicketCreateRequest,
+    run_async: bool = Query(False, alias="async"),
     current_user_id: Optional[str] = Depends(get_current_user_id)
 ):
     """
     Complete ticket creation flow:
-    1. Validate with dual-RAG
+    1. Validate with dual-RAG (stages still current in validation_token, or
+       prefetched for the chat session_id, are reused)
     2. Assign priority with AI
     3. Look up assignee by email (if provided)
     4. Store in Supabase
+
+    With ?async=true the role and assignee checks still happen here, but
+    steps 1, 2 and 4 are queued as a job: the response is 202 with a job_id
+    to poll at /jobs/{job_id} or stream from /jobs/{job_id}/events.
     """
     try:
         # Check user role
@@ -159,11 +291,36 @@ async def create_ticket(
         
         # Create validated ticket
         ticket_dict = ticket.dict()
+        validation_token = ticket_dict.pop('validation_token')
+        session_id = ticket_dict.pop('session_id')
         ticket_dict['assigned_to_user_id'] = assigned_to_user_id  # Add resolved user_id
         
+        if run_async:
+            try:
+                job = get_ticket_job_queue().submit(
+                    current_user_id,
+                    lambda job: validation_service.create_validated_ticket(
+                        ticket_dict,
+                        user_id=current_user_id,
+                        validation_token=validation_token,
+                        session_id=session_id,
+                        progress=job.progress
+                    )
+                )
+            except QueueFullError as e:
+                raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+            return JSONResponse(status_code=202, content={
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": f"/api/tickets/jobs/{job.id}",
+                "events_url": f"/api/tickets/jobs/{job.id}/events"
+            })
+        
         result = await validation_service.create_validated_ticket(
             ticket_dict,
-            user_id=current_user_id
+            user_id=current_user_id,
+            validation_token=validation_token,
+            session_id=session_id
         )
         return result
     except HTTPException:
@@ -173,9 +330,78 @@ async def create_ticket(
 
 
 
+@router.post("/bulk", response_model=BulkTicketResponse)
+async def create_tickets_bulk(
+    request: BulkTicketCreateRequest,
+    current_user_id: Optional[str] = Depends(get_current_user_id)
+):
+    """
+    Create many tickets at once (e.g. a rack build-out): validation stages
+    shared between tickets run once, priorities are assigned in one pass,
+    assignees are resolved with one users query and all rows go in with one
+    insert. Tickets that fail validation or name an unknown assignee are
+    reported in results without failing the rest.
+    """
+    if not request.tickets:
+        raise HTTPException(status_code=400, detail="No tickets provided")
+    if len(request.tickets) > MAX_BULK_TICKETS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_TICKETS} tickets per request")
+    
+    try:
+        user_role = await get_user_role(current_user_id)
+        if user_role not in ['ticket_creator', 'admin']:
+            raise HTTPException(
+                status_code=403, 
+                detail="Only ticket creators can create tickets"
+            )
+        
+        directory = get_user_directory()
+        user_ids = await directory.get_user_ids(
+            ticket.assign_to_email for ticket in request.tickets if ticket.assign_to_email
+        )
+        
+        results: List[Optional[Dict]] = [None] * len(request.tickets)
+        to_create, positions = [], []
+        for i, ticket in enumerate(request.tickets):
+            ticket_dict = ticket.dict()
+            ticket_dict.pop('validation_token')
+            ticket_dict.pop('session_id')
+            assigned_to_user_id = None
+            if ticket.assign_to_email:
+                assigned_to_user_id = user_ids.get(directory.normalize_email(ticket.assign_to_email))
+                if not assigned_to_user_id:
+                    results[i] = {
+                        "success": False,
+                        "message": f"User with email '{ticket.assign_to_email}' not found"
+                    }
+                    continue
+            ticket_dict['assigned_to_user_id'] = assigned_to_user_id
+            to_create.append(ticket_dict)
+            positions.append(i)
+        
+        if to_create:
+            created = await validation_service.create_validated_tickets(to_create, user_id=current_user_id)
+            for i, result in zip(positions, created):
+                results[i] = result
+        
+        created_count = sum(1 for result in results if result["success"])
+        return {
+            "created": created_count,
+            "failed": len(results) - created_count,
+            "results": results
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/list")
 async def list_tickets(
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
     current_user_id: Optional[str] = Depends(get_current_user_id)
 ):
     """
@@ -184,91 +410,196 @@ async def list_tickets(
     - Technicians see only their assigned tickets + unassigned tickets
     
     RLS policies automatically filter results.
+    
+    Returns one page in board order; pass next_cursor back as cursor for
+    the next one. fields defaults to the slim board view.
     """
     try:
-        query = supabase.table("tickets")\
-            .select("*")\
-            .order("priority")\
-            .order("created_at", desc=True)
+        db = await get_db()
+        query = db.table("tickets").select(resolve_fields(fields))
         
         if status:
             query = query.eq("status", status)
         
-        result = query.execute()
+        result = await paginate_tickets(query, cursor, limit).execute()
         
-        # Enrich tickets with assigned user email
-        enriched_tickets = []
-        for ticket in result.data:
-            ticket_copy = ticket.copy()
-            
-            # Get assigned user's email if ticket is assigned
-            if ticket.get("assigned_to"):
-                try:
-                    user_result = supabase.table("users")\
-                        .select("email")\
-                        .eq("id", ticket["assigned_to"])\
-                        .single()\
-                        .execute()
-                    
-                    if user_result.data:
-                        ticket_copy["assigned_to_email"] = user_result.data.get("email")
-                except:
-                    ticket_copy["assigned_to_email"] = None
-            else:
-                ticket_copy["assigned_to_email"] = None
-            
-            enriched_tickets.append(ticket_copy)
-        
-        return {"tickets": enriched_tickets}
+        return await ticket_page(result.data, limit)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/my-tickets")
 async def get_my_tickets(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
     current_user_id: Optional[str] = Depends(get_current_user_id)
 ):
     """
-    Get tickets assigned to current user (for technicians)
+    Get tickets assigned to current user (for technicians), paginated like /list
     """
     if not current_user_id:
         raise HTTPException(status_code=401, detail="Authentication required")
     
     try:
-        result = supabase.table("tickets")\
-            .select("*")\
-            .eq("assigned_to", current_user_id)\
-            .order("priority")\
-            .order("created_at", desc=True)\
-            .execute()
+        db = await get_db()
+        query = db.table("tickets")\
+            .select(resolve_fields(fields))\
+            .eq("assigned_to", current_user_id)
         
-        # Enrich tickets with assigned user email
-        enriched_tickets = []
-        for ticket in result.data:
-            ticket_copy = ticket.copy()
-            
-            # Get assigned user's email
-            if ticket.get("assigned_to"):
-                try:
-                    user_result = supabase.table("users")\
-                        .select("email")\
-                        .eq("id", ticket["assigned_to"])\
-                        .single()\
-                        .execute()
-                    
-                    if user_result.data:
-                        ticket_copy["assigned_to_email"] = user_result.data.get("email")
-                except:
-                    ticket_copy["assigned_to_email"] = None
-            else:
-                ticket_copy["assigned_to_email"] = None
+        result = await paginate_tickets(query, cursor, limit).execute()
+        
+        return await ticket_page(result.data, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def status_update_data(new_status: str) -> Dict:
+    """Columns to write for a status change, with its timestamp"""
+    update_data = {"status": new_status}
+    
+    # Track timestamps
+    if new_status == "in_progress":
+        update_data["started_at"] = "now()"
+    elif new_status == "complete":
+        update_data["completed_at"] = "now()"
+    return update_data
+
+
+@router.patch("/batch")
+async def batch_update_tickets(
+    batch: TicketBatchUpdate,
+    current_user_id: Optional[str] = Depends(get_current_user_id)
+):
+    """
+    Apply many status and/or assignment changes at once (Kanban multi-card
+    moves). Tickets receiving the same change are written with a single
+    filtered update. Same checks as the single-ticket endpoints: statuses
+    must be valid and only ticket creators/admins may assign. Returns one
+    outcome per requested ticket, in order.
+    """
+    if not batch.updates:
+        raise HTTPException(status_code=400, detail="No updates provided")
+    if len(batch.updates) > MAX_BATCH_UPDATES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_UPDATES} updates per request")
+    
+    try:
+        can_assign = False
+        if any(change.technician_id for change in batch.updates) and current_user_id:
+            can_assign = await get_user_role(current_user_id) in ['ticket_creator', 'admin']
+        
+        results: List[Optional[Dict]] = [None] * len(batch.updates)
+        groups: Dict[str, Dict] = {}
+        seen = set()
+        for i, change in enumerate(batch.updates):
+            error = None
+            if change.ticket_id in seen:
+                error = "Duplicate ticket_id in batch"
+            elif change.status is None and change.technician_id is None:
+                error = "Nothing to update"
+            elif change.status is not None and change.status not in TICKET_STATUSES:
+                error = f"Invalid status: {change.status}. Must be one of: ready, in_progress, complete"
+            elif change.technician_id and not current_user_id:
+                error = "Authentication required"
+            elif change.technician_id and not can_assign:
+                error = "Only ticket creators can assign tickets"
+            if error:
+                results[i] = {"ticket_id": change.ticket_id, "success": False, "error": error}
+                continue
+            seen.add(change.ticket_id)
             
-            enriched_tickets.append(ticket_copy)
+            update_data = status_update_data(change.status) if change.status else {}
+            if change.technician_id:
+                update_data["assigned_to"] = change.technician_id
+            group = groups.setdefault(json.dumps(update_data, sort_keys=True), {"data": update_data, "positions": []})
+            group["positions"].append(i)
         
-        return {"tickets": enriched_tickets}
+        db = await get_db()
+        
+        async def apply(group: Dict) -> List[Dict]:
+            ids = [batch.updates[i].ticket_id for i in group["positions"]]
+            result = await db.table("tickets")\
+                .update(group["data"])\
+                .in_("id", ids)\
+                .execute()
+            return result.data or []
+        
+        group_list = list(groups.values())
+        # A failed group must not hide what the others already wrote
+        updated = await asyncio.gather(*[apply(group) for group in group_list], return_exceptions=True)
+        for group, rows in zip(group_list, updated):
+            if isinstance(rows, BaseException):
+                print(f"Error applying batch update {group['data']}: {rows}")
+                for i in group["positions"]:
+                    results[i] = {"ticket_id": batch.updates[i].ticket_id, "success": False, "error": str(rows)}
+                continue
+            rows_by_id = {str(row["id"]): row for row in rows}
+            for i in group["positions"]:
+                ticket_id = batch.updates[i].ticket_id
+                row = rows_by_id.get(str(ticket_id))
+                results[i] = (
+                    {"ticket_id": ticket_id, "success": True, "ticket": row}
+                    if row is not None else
+                    {"ticket_id": ticket_id, "success": False, "error": "Ticket not found or unauthorized"}
+                )
+        
+        return {
+            "updated": sum(1 for result in results if result["success"]),
+            "failed": sum(1 for result in results if not result["success"]),
+            "results": results
+        }
+    except HTTPException:
+        raise
     except Exception as e:
+        print(f"Error batch updating tickets: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+def get_owned_job(job_id: str, current_user_id: Optional[str]):
+    """A queued ticket job, visible only to the user who submitted it"""
+    job = get_ticket_job_queue().get(job_id)
+    if job is None or job.owner != current_user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/stats")
+async def ticket_job_stats(current_user_id: Optional[str] = Depends(get_current_user_id)):
+    """Job counts by status for the async creation queue (ticket creators/admins)"""
+    if not current_user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    if await get_user_role(current_user_id) not in ['ticket_creator', 'admin']:
+        raise HTTPException(status_code=403, detail="Only ticket creators can view job stats")
+    return get_ticket_job_queue().stats()
+
+
+@router.get("/jobs/{job_id}")
+async def get_ticket_job(
+    job_id: str,
+    current_user_id: Optional[str] = Depends(get_current_user_id)
+):
+    """Status, per-stage progress and (once finished) result of an async create"""
+    return get_owned_job(job_id, current_user_id).snapshot()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_ticket_job(
+    job_id: str,
+    current_user_id: Optional[str] = Depends(get_current_user_id)
+):
+    """SSE stream of "progress" events as stages advance, then "done" with the result"""
+    job = get_owned_job(job_id, current_user_id)
+    
+    async def events():
+        async for snapshot in get_ticket_job_queue().watch(job):
+            yield ("done" if snapshot["status"] in FINISHED else "progress"), snapshot
+    
+    return event_stream(events())
+
+
 @router.patch("/{ticket_id}/status")
 async def update_ticket_status(
     ticket_id: str,
@@ -279,24 +610,18 @@ async def update_ticket_status(
     new_status = status_update.status
     
     # Validate status
-    if new_status not in ["ready", "in_progress", "complete"]:
+    if new_status not in TICKET_STATUSES:
         raise HTTPException(
             status_code=400, 
             detail=f"Invalid status: {new_status}. Must be one of: ready, in_progress, complete"
         )
     
     try:
-        # Build update data
-        update_data = {"status": new_status}
-        
-        # Track timestamps
-        if new_status == "in_progress":
-            update_data["started_at"] = "now()"
-        elif new_status == "complete":
-            update_data["completed_at"] = "now()"
+        update_data = status_update_data(new_status)
         
         # Update in Supabase
-        result = supabase.table("tickets")\
+        db = await get_db()
+        result = await db.table("tickets")\
             .update(update_data)\
             .eq("id", ticket_id)\
             .execute()
@@ -338,7 +663,8 @@ async def assign_ticket(
             )
         
         # Assign ticket
-        result = supabase.table("tickets")\
+        db = await get_db()
+        result = await db.table("tickets")\
             .update({"assigned_to": assignment.technician_id})\
             .eq("id", ticket_id)\
             .execute()
@@ -374,7 +700,8 @@ async def delete_ticket(
                 detail="Only ticket creators can delete tickets"
             )
         
-        result = supabase.table("tickets")\
+        db = await get_db()
+        result = await db.table("tickets")\
             .delete()\
             .eq("id", ticket_id)\
             .execute()
@@ -386,6 +713,30 @@ async def delete_ticket(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{ticket_id}/context")
+async def get_ticket_context(
+    ticket_id: str,
+    current_user_id: Optional[str] = Depends(get_current_user_id)
+):
+    """Validation and RAG context left out of the board view"""
+    try:
+        db = await get_db()
+        result = await db.table("tickets")\
+            .select(", ".join(["id"] + CONTEXT_FIELDS))\
+            .eq("id", ticket_id)\
+            .limit(1)\
+            .execute()
+        
+        if not result.data:
+            raise HTTPException(status_code=404, detail="Ticket not found")
+        
+        return {"ticket": result.data[0]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{ticket_id}")
 async def get_ticket(
     ticket_id: str,
@@ -393,7 +744,8 @@ async def get_ticket(
 ):
     """Get a single ticket by ID"""
     try:
-        result = supabase.table("tickets")\
+        db = await get_db()
+        result = await db.table("tickets")\
             .select("*")\
             .eq("id", ticket_id)\
             .single()\
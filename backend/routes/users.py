@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends, Header
-from db import supabase
+from db import get_db
 from typing import Optional
 from routes.tickets import get_current_user_id
+from services.role_cache import get_role_cache
 
 
 # Create a new router instance
@@ -9,7 +10,8 @@ router = APIRouter()
 
 @router.get("/")
 async def get_all_users():
-    response = supabase.table("users").select("*").execute()
+    db = await get_db()
+    response = await db.table("users").select("*").execute()
     return response.data
 
 # @router.get("/{user_id}")
@@ -23,8 +25,9 @@ async def list_technicians():
     Returns email and user_id.
     """
     try:
+        db = await get_db()
         # Get all users with technician role
-        technician_ids = supabase.table("user_roles")\
+        technician_ids = await db.table("user_roles")\
             .select("user_id")\
             .eq("role", "technician")\
             .execute()
@@ -36,7 +39,7 @@ async def list_technicians():
         user_ids = [item["user_id"] for item in technician_ids.data]
         
         # Get user details from users table
-        result = supabase.table("users")\
+        result = await db.table("users")\
             .select("user_id, email")\
             .in_("user_id", user_ids)\
             .execute()
@@ -55,19 +58,9 @@ async def get_user_role_endpoint(current_user_id: Optional[str] = Depends(get_cu
     print(f"Looking up role for user_id: {current_user_id}")
 
     try:
-        result = supabase.table("user_roles")\
-            .select("role")\
-            .eq("user_id", current_user_id)\
-            .execute()
-
-        print(f"Supabase query result data: {result.data}")  # Add this print
-
-        if result.data and len(result.data) > 0:
-            role = result.data[0].get("role")  # get role properly
-            print(f"Extracted role: {role}")
-        else:
-            role = "technician"
-            print("No role record found, defaulting to 'technician'")
+        # Cached; users without a user_roles row get "technician"
+        role = await get_role_cache().get_role(current_user_id)
+        print(f"Resolved role: {role}")
 
         return {"role": role}
     except Exception as e:
@@ -75,6 +68,16 @@ async def get_user_role_endpoint(current_user_id: Optional[str] = Depends(get_cu
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/role-cache/stats")
+async def role_cache_stats(current_user_id: Optional[str] = Depends(get_current_user_id)):
+    """Hit rate of the role cache used by the authorization checks (admins only)"""
+    if not current_user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    if await get_role_cache().get_role(current_user_id) != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view role cache stats")
+    return get_role_cache().stats()
+
+
 @router.get("/test")
 async def test_route():
     print("Test route hit")
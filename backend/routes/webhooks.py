@@ -3,7 +3,9 @@ import os
 import json
 from fastapi import APIRouter, Request, HTTPException
 from svix.webhooks import Webhook
-from db import supabase
+from db import get_db
+from services.user_directory import get_user_directory
+from services.role_cache import get_role_cache
 from postgrest.exceptions import APIError
 
 router = APIRouter()
@@ -45,25 +47,33 @@ async def clerk_webhook(request: Request):
         print(f"Webhook received: Creating user {clerk_user_id} with email {primary_email}")
 
         try:
+            db = await get_db()
             # Check if user already exists (idempotency check)
-            existing = supabase.table("users").select("id").eq("id", clerk_user_id).execute()
+            existing = await db.table("users").select("id").eq("id", clerk_user_id).execute()
             
             if existing.data and len(existing.data) > 0:
+                get_user_directory().add_user(clerk_user_id, primary_email)
                 print(f"User {clerk_user_id} already exists, skipping insert")
                 return {"status": "success", "message": "User already exists"}
             
             # Insert new user
-            response = supabase.table("users").insert({
+            response = await db.table("users").insert({
                 "id": clerk_user_id,
                 "email": primary_email,
             }).execute()
             
+            # Make the new user assignable by email without a users lookup, and
+            # drop any default role cached before the user existed
+            get_user_directory().add_user(clerk_user_id, primary_email)
+            get_role_cache().invalidate(clerk_user_id)
+            
             print(f"Successfully created user {clerk_user_id}")
             return {"status": "success", "data": response.data}
             
         except APIError as e:
             # Handle duplicate key errors gracefully
             if "duplicate key" in str(e).lower() or "unique constraint" in str(e).lower():
+                get_user_directory().add_user(clerk_user_id, primary_email)
                 print(f"User {clerk_user_id} already exists (duplicate key error)")
                 return {"status": "success", "message": "User already exists"}
             
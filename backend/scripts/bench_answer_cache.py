@@ -0,0 +1,125 @@
+"""
+Cost of repeated technician questions with and without the semantic answer cache.
+
+Replays a mix of paraphrased questions through process_query against
+LocalSupabase and a delayed fake OpenAI client whose embeddings put
+paraphrases of the same question close together. Reports latency, chat
+completions and match_documents calls per query for a cold run (retrieval
+still runs on every query: a hit must have retrieved the same chunks), then
+re-ingests one chunk and checks the answers built on it are regenerated, and
+checks a lookalike query that retrieves different chunks is not served a
+cached answer.
+
+Usage (from backend/):
+    python -m scripts.bench_answer_cache --rounds 5 --db-latency 0.03
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import time
+
+import numpy as np
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+
+from db import set_db
+from local_db import LocalSupabase
+from scripts.fakes import FakeOpenAI
+from services import answer_cache
+from services.embedding_cache import get_embedding_cache
+from services.openai_client import set_openai_client
+from services.rag_service import process_query
+
+# Paraphrases of the same question share a topic
+QUESTIONS = {
+    "power": ["H100 power cable requirements", "what power cables does the H100 need",
+              "How many power cables for an H100?"],
+    "dac": ["DAC cable length for switch uplinks", "which DAC cable should I use for the uplink"],
+    "rails": ["How do I mount the H100 rails?", "H100 rail kit installation steps"],
+}
+DOCUMENTS = [
+    {"id": 1, "topic": "power", "content": "H100 nodes take two 16-pin power cables.", "metadata": {"source": "h100.pdf", "page": 3}},
+    {"id": 2, "topic": "dac", "content": "Use 3m DAC cables for top-of-rack uplinks.", "metadata": {"source": "switch.pdf", "page": 8}},
+    {"id": 3, "topic": "rails", "content": "Slide the rails in until both latches click.", "metadata": {"source": "h100.pdf", "page": 11}},
+]
+
+
+def _vector(seed: str, dims: int = 1536) -> np.ndarray:
+    rng = np.random.default_rng(int(hashlib.sha256(seed.encode()).hexdigest()[:8], 16))
+    vector = rng.standard_normal(dims)
+    return vector / np.linalg.norm(vector)
+
+
+def embed_text(text: str):
+    """Topic direction plus a little per-phrasing noise, like a real embedding of a paraphrase"""
+    topic = next((name for name, questions in QUESTIONS.items() if text in questions), text)
+    return list(_vector(f"topic:{topic}") + 0.15 * _vector(f"text:{text}"))
+
+
+def topic_rpc(db, params):
+    query = np.asarray(params["query_embedding"])
+    best = max(DOCUMENTS, key=lambda doc: float(query @ _vector(f"topic:{doc['topic']}")))
+    row = next(row for row in db.tables["documents"] if row["id"] == best["id"])
+    return [dict(row)]
+
+
+async def replay(client: FakeOpenAI, searches: list, queries):
+    client.chat_calls = 0
+    searches.clear()
+    start = time.perf_counter()
+    for query in queries:
+        await process_query(query)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(queries), client.chat_calls / len(queries), len(searches) / len(queries)
+
+
+async def main(rounds: int, latency: float, generation: float, threshold: float):
+    db = LocalSupabase({"documents": [{k: v for k, v in doc.items() if k != "topic"} for doc in DOCUMENTS]}, latency=latency)
+    searches = []
+    db.register_rpc("match_documents", lambda db, params: searches.append(1) or topic_rpc(db, params))
+    set_db(db)
+    client = FakeOpenAI(chat_latency=generation, embedder=embed_text)
+    set_openai_client(client)
+
+    queries = [q for _ in range(rounds) for questions in QUESTIONS.values() for q in questions]
+    print(f"{'mode':>14} {'ms/query':>9} {'completions':>12} {'searches':>9}")
+    for label, enabled in (("no cache", False), ("semantic cache", True)):
+        os.environ["RAG_ANSWER_CACHE"] = "true" if enabled else "false"
+        answer_cache._cache = answer_cache.SemanticAnswerCache(threshold=threshold)
+        get_embedding_cache().clear()
+        per_query, completions, search_calls = await replay(client, searches, queries)
+        print(f"{label:>14} {per_query * 1000:>9.1f} {completions:>12.2f} {search_calls:>9.2f}")
+    cache = answer_cache.get_answer_cache()
+    print(f"Cache: {cache.stats()}")
+
+    # Re-ingest the power chunk: its cached answers must be regenerated once
+    db.tables["documents"][0]["content"] = "H100 nodes take two 16-pin power cables (rev B)."
+    client.chat_calls = 0
+    await process_query(QUESTIONS["power"][1])
+    await process_query(QUESTIONS["power"][2])
+    await process_query(QUESTIONS["dac"][0])
+    assert client.chat_calls == 1, f"expected one regenerated answer after re-ingest, got {client.chat_calls}"
+    print(f"After re-ingesting one chunk: {client.chat_calls} completion for 3 queries "
+          f"({cache.stats()['invalidations']} invalidated)")
+
+    # Same wording, different retrieval (like an H200 query next to a cached
+    # H100 one): the cached power answer must not be served
+    rails = next(row for row in db.tables["documents"] if row["id"] == 3)
+    db.register_rpc("match_documents", lambda db, params: [dict(rails)])
+    client.chat_calls = 0
+    await process_query(QUESTIONS["power"][0])
+    assert client.chat_calls == 1, "served a cached answer built on different chunks"
+    print(f"Lookalike query retrieving other chunks: {client.chat_calls} completion "
+          f"({cache.stats()['rejections']} rejected)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Semantic answer cache hit rate and savings")
+    parser.add_argument("--rounds", type=int, default=5, help="Times each question set is replayed")
+    parser.add_argument("--db-latency", type=float, default=0.03)
+    parser.add_argument("--generation", type=float, default=0.8, help="Fake completion time in seconds")
+    parser.add_argument("--threshold", type=float, default=0.95)
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds, args.db_latency, args.generation, args.threshold))
@@ -0,0 +1,93 @@
+"""
+Moving a Kanban column of cards: one PATCH per card vs one /api/tickets/batch.
+
+Serves the real FastAPI app in-process against LocalSupabase with a fixed
+per-round-trip delay. Moves --cards tickets to in_progress (half of them
+also reassigned) both ways and reports latency and DB round-trips, checks
+the stored rows match, and checks that a technician's changes that assign
+are refused per ticket while their other moves still apply.
+
+Usage (from backend/):
+    python -m scripts.bench_batch_update --cards 30 --db-latency 0.03
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+import jwt
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from db import set_db
+from scripts.bench_tickets_api import CREATOR_ID, TECHNICIAN_ID, seed_database
+from scripts.fakes import FakeOpenAI
+from services.openai_client import set_openai_client
+from services.role_cache import get_role_cache
+
+
+def moves(cards: int):
+    return [
+        {"ticket_id": str(i + 1), "status": "in_progress", **({"technician_id": TECHNICIAN_ID} if i % 2 else {})}
+        for i in range(cards)
+    ]
+
+
+def board(db):
+    return sorted(
+        # now() resolves at write time, so compare whether it was stamped
+        (row["id"], row["status"], row["assigned_to"], row.get("started_at") is not None)
+        for row in db.tables["tickets"]
+    )
+
+
+async def main(cards: int, latency: float):
+    set_openai_client(FakeOpenAI())
+    from main import app
+
+    creator = {"Authorization": f"Bearer {jwt.encode({'sub': CREATOR_ID}, 'bench', algorithm='HS256')}"}
+    technician = {"Authorization": f"Bearer {jwt.encode({'sub': TECHNICIAN_ID}, 'bench', algorithm='HS256')}"}
+    changes = moves(cards)
+    boards = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api.local", timeout=None) as api:
+        for label in ("PATCH x N", "batch"):
+            db = seed_database(cards, latency)
+            set_db(db)
+            get_role_cache().invalidate()
+            start = time.perf_counter()
+            if label == "batch":
+                response = await api.patch("/api/tickets/batch", json={"updates": changes}, headers=creator)
+                response.raise_for_status()
+                assert response.json()["updated"] == cards
+            else:
+                for change in changes:
+                    response = await api.patch(f"/api/tickets/{change['ticket_id']}/status",
+                                               json={"status": change["status"]}, headers=creator)
+                    response.raise_for_status()
+                    if "technician_id" in change:
+                        response = await api.post(f"/api/tickets/{change['ticket_id']}/assign",
+                                                  json={"technician_id": change["technician_id"]}, headers=creator)
+                        response.raise_for_status()
+            elapsed = time.perf_counter() - start
+            boards[label] = board(db)
+            print(f"{label:>10}: {elapsed * 1000:>6.0f} ms, {db.requests} DB round-trips")
+
+        assert boards["batch"] == boards["PATCH x N"], "batch left the board in a different state"
+        print("Board state identical")
+
+        db = seed_database(4, latency)
+        set_db(db)
+        response = await api.patch("/api/tickets/batch", json={"updates": moves(4) + [{"ticket_id": "99", "status": "complete"}]},
+                                   headers=technician)
+        outcomes = [(r["ticket_id"], r["success"], r.get("error")) for r in response.json()["results"]]
+        print(f"As technician: {outcomes}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch vs per-card ticket updates")
+    parser.add_argument("--cards", type=int, default=30)
+    parser.add_argument("--db-latency", type=float, default=0.03)
+    args = parser.parse_args()
+    asyncio.run(main(args.cards, args.db_latency))
@@ -0,0 +1,123 @@
+"""
+One /api/tickets/bulk request vs the same tickets posted to /api/tickets/create.
+
+Serves the real FastAPI app in-process against LocalSupabase (with Pod 7
+topology seeded, so location checks resolve from the topology graph) and a
+delayed fake OpenAI client. Simulates a rack build-out: --tickets tickets on
+the same pod, switch and parts list with different ports, every fourth one
+an ambiguous FIX that needs the LLM priority tier, and one with an unknown
+assignee. Reports latency, completions, embeddings and DB round-trips for
+each approach, and checks both store the same tickets.
+
+Usage (from backend/):
+    python -m scripts.bench_bulk_tickets --tickets 24 --db-latency 0.03
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+import jwt
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+
+from db import set_db
+from scripts.bench_tickets_api import CREATOR_ID, seed_database
+from scripts.fakes import FakeOpenAI, fixed_rows_rpc
+from services.embedding_cache import get_embedding_cache
+from services.openai_client import set_openai_client
+from services.user_directory import get_user_directory
+
+TOPOLOGY = [
+    {"id": 101, "document_type": "topology", "content": "Pod 7 contains racks 40U through 48U. Pod 7 network switch is switch-7b. Total racks: 9",
+     "metadata": {"pod": "Pod_7", "switch": "switch-7b", "rack_range": "40U-48U"}},
+    {"id": 102, "document_type": "switch_status", "content": "switch-7b is located in Pod 7. 48 ports total. Ports 1-24 currently in use. Ports 25-48 available",
+     "metadata": {"switch": "switch-7b", "pod": "Pod_7", "available_ports": 24}},
+]
+
+
+def build_out(tickets: int):
+    rows = []
+    for i in range(tickets):
+        ambiguous = i % 4 == 3
+        rows.append({
+            "device": "H100",
+            "pod": "Pod 7",
+            "rack": "42U",
+            "switch": "switch-7b",
+            "ports": [str(25 + i % 24)],
+            "required_parts": ["part_a", "part_b"],
+            "action": "FIX" if ambiguous else "INSTALL",
+            "description": "Reseat the uplink" if ambiguous else "Rack build-out node",
+            "assign_to_email": "nobody@example.com" if i == tickets - 1 else "Tech@Example.com",
+        })
+    return rows
+
+
+def fresh_environment(latency: float, generation: float):
+    db = seed_database(0, latency)
+    db.tables["datacenter_knowledge"] = [dict(row) for row in TOPOLOGY]
+    db.register_rpc("match_documents", fixed_rows_rpc([
+        {"id": 1, "content": "H100 power", "metadata": {"source": "bench.pdf", "page": 1}}
+    ]))
+    db.register_rpc("match_datacenter_documents", fixed_rows_rpc([
+        {"id": 1, "content": "part availability: 10 in stock", "similarity": 0.9}
+    ]))
+    set_db(db)
+    client = FakeOpenAI(chat_latency=generation)
+    set_openai_client(client)
+    get_embedding_cache().clear()
+    get_user_directory().invalidate()
+    return db, client
+
+
+def stored(db):
+    return sorted(
+        (row["ports"][0], row["priority"], row["assigned_to"], row["warnings"])
+        for row in db.tables.get("tickets", [])
+    )
+
+
+async def main(tickets: int, latency: float, generation: float):
+    from main import app
+    from routes.tickets import validation_service
+
+    token = jwt.encode({"sub": CREATOR_ID}, "bench", algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+    payloads = build_out(tickets)
+    transport = httpx.ASGITransport(app=app)
+    outcomes = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://api.local", timeout=None) as api:
+        for label in ("create x N", "bulk"):
+            db, client = fresh_environment(latency, generation)
+            # Fresh topology graph for each run
+            validation_service.datacenter_rag._metadata_loaded_at = None
+            db.requests = 0
+            start = time.perf_counter()
+            if label == "bulk":
+                response = await api.post("/api/tickets/bulk", json={"tickets": payloads}, headers=headers)
+                response.raise_for_status()
+                created = response.json()["created"]
+            else:
+                created = 0
+                for payload in payloads:
+                    response = await api.post("/api/tickets/create", json=payload, headers=headers)
+                    created += response.status_code == 200 and response.json()["success"]
+            elapsed = time.perf_counter() - start
+            outcomes[label] = stored(db)
+            print(f"{label:>11}: {elapsed * 1000:>6.0f} ms, {created}/{tickets} created, {client.chat_calls} completions, "
+                  f"{client.embedding_calls} embeddings, {db.requests} DB round-trips")
+
+    assert outcomes["bulk"] == outcomes["create x N"], "bulk stored different tickets"
+    print("Stored tickets identical")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk ticket creation vs one request per ticket")
+    parser.add_argument("--tickets", type=int, default=24)
+    parser.add_argument("--db-latency", type=float, default=0.03)
+    parser.add_argument("--generation", type=float, default=0.3, help="Fake completion time in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.tickets, args.db_latency, args.generation))
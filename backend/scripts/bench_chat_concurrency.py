@@ -0,0 +1,97 @@
+"""
+Wall-clock timing of concurrent /llm/api/chat requests.
+
+Points the shared AsyncOpenAI client at a fake OpenAI server that delays
+every completion, fires N chat requests at once and reports how long they
+take and how many calls were in flight together. The pass/fail check lives
+in tests/test_chat_concurrency.py.
+
+Usage (from backend/):
+    python -m scripts.bench_chat_concurrency --requests 10 --delay 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+from fastapi import FastAPI
+from openai import AsyncOpenAI
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from routes import llm
+from services.openai_client import set_openai_client
+
+
+def build_fake_openai(delay: float) -> tuple:
+    """AsyncOpenAI client backed by an in-process fake server"""
+    stats = {"in_flight": 0, "max_in_flight": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            stats["in_flight"] -= 1
+
+        content = json.dumps({
+            "extracted_data": {"device": "H100", "pod": "Pod 7"},
+            "response_message": "Which rack should the H100 go in?",
+            "missing_fields": ["rack"]
+        })
+        return httpx.Response(200, json={
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "gpt-4o-mini",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }]
+        })
+
+    client = AsyncOpenAI(
+        api_key="bench",
+        base_url="http://fake-openai.local/v1",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    return client, stats
+
+
+async def main(requests: int, delay: float):
+    client, stats = build_fake_openai(delay)
+    set_openai_client(client)
+
+    app = FastAPI()
+    app.include_router(llm.router, prefix="/llm")
+
+    payload = {"message": "Install an H100 in Pod 7", "ticket_data": {}}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api.local") as api:
+        # Warm up client construction and connection setup before timing
+        await api.post("/llm/api/chat", json=payload)
+        stats["max_in_flight"] = 0
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            api.post("/llm/api/chat", json=payload) for _ in range(requests)
+        ])
+        elapsed = time.perf_counter() - start
+
+    print(f"Requests:            {requests}")
+    print(f"Fake server delay:   {delay * 1000:.0f} ms")
+    print(f"Wall clock:          {elapsed * 1000:.0f} ms (serial would be {requests * delay * 1000:.0f} ms)")
+    print(f"Max in-flight calls: {stats['max_in_flight']}")
+    print(f"Responses 200:       {sum(response.status_code == 200 for response in responses)}/{requests}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time concurrent chat requests against a delayed fake OpenAI")
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--delay", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.delay))
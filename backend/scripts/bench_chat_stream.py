@@ -0,0 +1,86 @@
+"""
+Time-to-first-token of /llm/api/chat vs the /llm/api/chat/stream SSE endpoint.
+
+Calls the real FastAPI app in-process with a delayed fake OpenAI client that
+answers with a fenced intake JSON reply. Reports when the first extracted
+field, the first reply token and the final "done" event arrive on the stream,
+next to the latency of the buffered /llm/api/chat response, and checks both
+endpoints end with the same ticket data.
+
+Usage (from backend/):
+    python -m scripts.bench_chat_stream --generation 2.0
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from scripts.bench_query_stream import asgi_post_stream
+from scripts.fakes import FakeOpenAI
+from services.openai_client import set_openai_client
+
+CHAT = {"message": "Install an H100 in Pod 7, rack 42U, switch-7b ports 49 and 50", "ticket_data": {}}
+
+
+async def time_buffered(api: httpx.AsyncClient):
+    start = time.perf_counter()
+    response = await api.post("/llm/api/chat", json=CHAT)
+    response.raise_for_status()
+    return time.perf_counter() - start, response.json()
+
+
+async def time_stream(app) -> dict:
+    timings = {"fields": 0}
+    reply = []
+    event = None
+    start = time.perf_counter()
+    async for chunk in asgi_post_stream(app, "/llm/api/chat/stream", CHAT):
+        for line in chunk.decode().splitlines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+                timings.setdefault(event, time.perf_counter() - start)
+                if event == "token":
+                    reply.append(data["text"])
+                elif event == "field":
+                    timings["fields"] += 1
+                elif event == "done":
+                    timings["result"] = data
+                elif event == "error":
+                    raise RuntimeError(line)
+    timings["total"] = time.perf_counter() - start
+    timings["reply"] = "".join(reply)
+    return timings
+
+
+async def main(generation: float):
+    set_openai_client(FakeOpenAI(chat_latency=generation))
+
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api.local", timeout=None) as api:
+        buffered, buffered_result = await time_buffered(api)
+    streamed = await time_stream(app)
+
+    assert streamed["result"] == buffered_result, "stream and buffered responses differ"
+    assert streamed["reply"] == buffered_result["response"], "streamed tokens don't add up to the reply"
+
+    print(f"/llm/api/chat (buffered):      {buffered * 1000:.0f} ms to first byte")
+    print(f"/llm/api/chat/stream field 1:  {streamed['field'] * 1000:.0f} ms ({streamed['fields']} fields)")
+    print(f"/llm/api/chat/stream token 1:  {streamed['token'] * 1000:.0f} ms")
+    print(f"/llm/api/chat/stream done:     {streamed['total'] * 1000:.0f} ms")
+    print(f"Missing fields:                {streamed['result']['missing_fields']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming vs buffered intake chat latency")
+    parser.add_argument("--generation", type=float, default=2.0, help="Fake completion time in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.generation))
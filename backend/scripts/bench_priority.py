@@ -0,0 +1,72 @@
+"""
+Priority assignment cost with and without the rule-based tier.
+
+Runs PriorityService.assign_priority over a mix of tickets against a delayed
+fake OpenAI client and reports latency, chat completions and which tier
+decided each ticket. Routine installs and upgrades should be decided by the
+rules with no completion; ambiguous tickets still reach the LLM.
+
+Usage (from backend/):
+    python -m scripts.bench_priority --generation 0.6
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from scripts.fakes import FakeOpenAI
+from services.openai_client import set_openai_client
+from services.priority_service import PriorityService
+
+BASE = {"device": "H100", "pod": "Pod 7", "rack": "42U", "switch": "switch-7b",
+        "ports": ["49", "50"], "required_parts": ["3m_DAC_cable", "16pin_power"]}
+TICKETS = [
+    ("routine install", {**BASE, "action": "INSTALL", "description": "Install new H100 node"}, {}),
+    ("planned upgrade", {**BASE, "action": "UPGRADE", "description": "Firmware upgrade"}, {}),
+    ("outage fix", {**BASE, "action": "FIX", "description": "Node is down after PSU failure"}, {}),
+    ("degraded replace", {**BASE, "action": "REPLACE", "description": "Production link degraded"}, {}),
+    ("plain fix", {**BASE, "action": "FIX", "description": "Reseat the DAC cable"}, {}),
+    ("install in prod", {**BASE, "action": "INSTALL", "description": "Urgent capacity for production"}, {}),
+    ("blocked install", {**BASE, "action": "INSTALL", "description": "Install new H100 node"},
+     {"warnings": ["16pin_power: inventory shows 0 in stock"]}),
+]
+
+
+async def run(use_rules: bool, generation: float, repeat: int):
+    client = FakeOpenAI(chat_latency=generation)
+    set_openai_client(client)
+    service = PriorityService(use_rules=use_rules)
+    decided = {}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for label, ticket, validation in TICKETS:
+            result = await service.assign_priority(ticket, validation)
+            decided[label] = (result["priority"], result["tier"], result["estimated_duration_minutes"])
+    per_ticket = (time.perf_counter() - start) / (repeat * len(TICKETS))
+    return per_ticket, client.chat_calls / (repeat * len(TICKETS)), decided
+
+
+async def main(generation: float, repeat: int):
+    for use_rules in (False, True):
+        per_ticket, calls, decided = await run(use_rules, generation, repeat)
+        print(f"rules {'on ' if use_rules else 'off'}: {per_ticket * 1000:.0f} ms/ticket, {calls:.2f} completions/ticket")
+    for label, (priority, tier, minutes) in decided.items():
+        print(f"  {label:<17} {priority}  {tier:<6} {minutes} min")
+
+    # Routine installs alone, the bulk of intake traffic
+    client = FakeOpenAI(chat_latency=generation)
+    set_openai_client(client)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await PriorityService(use_rules=True).assign_priority(TICKETS[0][1], {})
+    print(f"Routine INSTALL: {(time.perf_counter() - start) / repeat * 1e6:.0f} us/ticket, {client.chat_calls} completions")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rule-based vs LLM priority assignment")
+    parser.add_argument("--generation", type=float, default=0.6, help="Fake completion time in seconds")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.generation, args.repeat))
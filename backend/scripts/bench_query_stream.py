@@ -0,0 +1,127 @@
+"""
+Time-to-first-byte of /api/query vs the /api/query/stream SSE endpoint.
+
+Calls the real FastAPI app in-process with a delayed fake OpenAI client and
+LocalSupabase. The streaming request is driven through the raw ASGI
+interface (httpx's ASGITransport buffers whole responses) so each body chunk
+is timed as the app sends it. Reports when the sources event, the first
+answer token and the end of the stream arrive, next to the latency of the
+buffered /api/query response.
+
+Usage (from backend/):
+    python -m scripts.bench_query_stream --generation 1.5 --db-latency 0.03
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+
+from db import set_db
+from local_db import LocalSupabase
+from scripts.fakes import FakeOpenAI, fixed_rows_rpc
+from services.embedding_cache import get_embedding_cache
+from services.openai_client import set_openai_client
+
+QUERY = {"query": "How many power cables does an H100 node need?"}
+
+
+async def time_buffered(api: httpx.AsyncClient) -> float:
+    start = time.perf_counter()
+    response = await api.post("/api/query", json=QUERY)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def asgi_post_stream(app, path: str, payload: dict):
+    """Yield response body chunks as the ASGI app sends them"""
+    body = json.dumps(payload).encode()
+    chunks: asyncio.Queue = asyncio.Queue()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "server": ("api.local", 80), "client": ("bench", 0),
+        "headers": [(b"host", b"api.local"), (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode())],
+    }
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{path} returned {message['status']}")
+        if message["type"] == "http.response.body":
+            await chunks.put(message.get("body", b""))
+            if not message.get("more_body"):
+                await chunks.put(None)
+
+    task = asyncio.create_task(app(scope, receive, send))
+    try:
+        while (chunk := await chunks.get()) is not None:
+            yield chunk
+    finally:
+        await task
+
+
+async def time_stream(app) -> dict:
+    timings = {}
+    answer = []
+    event = None
+    start = time.perf_counter()
+    async for chunk in asgi_post_stream(app, "/api/query/stream", QUERY):
+        for line in chunk.decode().splitlines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                timings.setdefault(event, time.perf_counter() - start)
+                if event == "token":
+                    answer.append(json.loads(line[len("data: "):])["text"])
+                elif event == "error":
+                    raise RuntimeError(line)
+    timings["total"] = time.perf_counter() - start
+    timings["answer"] = "".join(answer)
+    return timings
+
+
+async def main(generation: float, embedding: float, latency: float):
+    db = LocalSupabase(latency=latency)
+    db.register_rpc("match_documents", fixed_rows_rpc([
+        {"id": 1, "content": "H100 nodes take two 16-pin power cables.", "metadata": {"source": "bench.pdf", "page": 3}}
+    ]))
+    set_db(db)
+    set_openai_client(FakeOpenAI(embedding_latency=embedding, chat_latency=generation))
+
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api.local", timeout=None) as api:
+        get_embedding_cache().clear()
+        buffered = await time_buffered(api)
+    get_embedding_cache().clear()
+    streamed = await time_stream(app)
+
+    print(f"/api/query (buffered):     {buffered * 1000:.0f} ms to first byte")
+    print(f"/api/query/stream sources: {streamed['sources'] * 1000:.0f} ms")
+    print(f"/api/query/stream token 1: {streamed['token'] * 1000:.0f} ms")
+    print(f"/api/query/stream done:    {streamed['total'] * 1000:.0f} ms")
+    print(f"Streamed answer:           {streamed['answer']!r}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming vs buffered RAG query latency")
+    parser.add_argument("--generation", type=float, default=1.5, help="Fake completion time in seconds")
+    parser.add_argument("--embedding", type=float, default=0.05, help="Fake embedding time in seconds")
+    parser.add_argument("--db-latency", type=float, default=0.03)
+    args = parser.parse_args()
+    asyncio.run(main(args.generation, args.embedding, args.db_latency))
@@ -0,0 +1,115 @@
+"""
+A burst of /api/tickets/create requests, synchronous vs ?async=true.
+
+Serves the real FastAPI app in-process against LocalSupabase (Pod 7 topology
+seeded) and a delayed fake OpenAI client, and fires --tickets creates at
+once. Synchronous creates hold every connection for the whole validate ->
+prioritize -> insert chain; async creates answer 202 straight away and a
+pool of --workers jobs works through the burst. Reports response latency,
+time until every ticket is stored and the peak number of jobs running
+together, follows one job's SSE stream to show its stage progress, and
+checks both modes store the same tickets.
+
+Usage (from backend/):
+    python -m scripts.bench_ticket_jobs --tickets 40 --workers 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+import httpx
+import jwt
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+
+from scripts.bench_bulk_tickets import build_out, fresh_environment, stored
+from scripts.bench_tickets_api import CREATOR_ID
+from services.ticket_jobs import FINISHED, get_ticket_job_queue
+
+
+def summarize(latencies):
+    return f"p50 {statistics.median(latencies) * 1000:>5.0f} ms, max {max(latencies) * 1000:>5.0f} ms"
+
+
+async def timed(request):
+    start = time.perf_counter()
+    response = await request
+    return response, time.perf_counter() - start
+
+
+async def main(tickets: int, workers: int, latency: float, generation: float):
+    os.environ["TICKET_JOB_WORKERS"] = str(workers)
+    from main import app
+    from routes.tickets import validation_service
+
+    token = jwt.encode({"sub": CREATOR_ID}, "bench", algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+    # Every ticket valid, so both modes store all of them
+    payloads = [dict(payload, assign_to_email="Tech@Example.com") for payload in build_out(tickets)]
+    transport = httpx.ASGITransport(app=app)
+    outcomes = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://api.local", timeout=None) as api:
+        db, client = fresh_environment(latency, generation)
+        validation_service.datacenter_rag._metadata_loaded_at = None
+        start = time.perf_counter()
+        timings = await asyncio.gather(*[
+            timed(api.post("/api/tickets/create", json=payload, headers=headers)) for payload in payloads
+        ])
+        elapsed = time.perf_counter() - start
+        created = sum(response.status_code == 200 and response.json()["success"] for response, _ in timings)
+        outcomes["sync"] = stored(db)
+        print(f" sync: responses {summarize([t for _, t in timings])}; all stored after {elapsed * 1000:>6.0f} ms, "
+              f"{created}/{tickets} created")
+
+        db, client = fresh_environment(latency, generation)
+        validation_service.datacenter_rag._metadata_loaded_at = None
+        queue = get_ticket_job_queue()
+        start = time.perf_counter()
+        timings = await asyncio.gather(*[
+            timed(api.post("/api/tickets/create?async=true", json=payload, headers=headers)) for payload in payloads
+        ])
+        assert all(response.status_code == 202 for response, _ in timings), "async create did not return 202"
+        job_ids = [response.json()["job_id"] for response, _ in timings]
+
+        # Follow the last job's event stream while polling the rest
+        stream = asyncio.ensure_future(api.get(f"/api/tickets/jobs/{job_ids[-1]}/events", headers=headers))
+        peak_running = 0
+        while True:
+            peak_running = max(peak_running, queue.stats()["running"])
+            snapshots = [(await api.get(f"/api/tickets/jobs/{job_id}", headers=headers)).json() for job_id in job_ids]
+            if all(snapshot["status"] in FINISHED for snapshot in snapshots):
+                break
+            await asyncio.sleep(0.02)
+        elapsed = time.perf_counter() - start
+        created = sum(snapshot["status"] == "completed" and snapshot["result"]["success"] for snapshot in snapshots)
+        outcomes["async"] = stored(db)
+        print(f"async: responses {summarize([t for _, t in timings])}; all stored after {elapsed * 1000:>6.0f} ms, "
+              f"{created}/{tickets} created, peak {peak_running} running (workers={workers})")
+
+        events = []
+        for block in (await stream).text.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((lines["event"], json.loads(lines["data"])))
+        print(f"Last job's stream: {len(events)} events")
+        for event, data in events:
+            stages = " ".join(f"{name}={state}" for name, state in data["stages"].items())
+            print(f"  {event:>8} {data['status']:>9}  {stages}")
+
+    assert created == tickets, "some async jobs did not create their ticket"
+    assert peak_running <= workers, "more jobs ran at once than the worker limit"
+    assert outcomes["async"] == outcomes["sync"], "async jobs stored different tickets"
+    print("Stored tickets identical")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synchronous vs queued ticket creation under a burst")
+    parser.add_argument("--tickets", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--db-latency", type=float, default=0.03)
+    parser.add_argument("--generation", type=float, default=0.3, help="Fake completion time in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.tickets, args.workers, args.db_latency, args.generation))
@@ -0,0 +1,127 @@
+"""
+Latency of /api/tickets/list as the board grows.
+
+Serves the real FastAPI app over an in-process ASGI transport against
+local_db.LocalSupabase with a fixed per-round-trip delay, seeding boards of
+increasing size with tickets spread over a pool of assignees and carrying
+realistic validation blobs. Reports cold (user directory empty) and warm
+latency, DB round-trips and payload size for the first page; all should stay
+flat as the ticket count grows. --walk also pages through the whole board
+and checks every ticket comes back exactly once.
+
+Usage (from backend/):
+    python -m scripts.bench_ticket_listing --sizes 50 200 500 1000 --assignees 40 --walk
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+import jwt
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from db import set_db
+from local_db import LocalSupabase
+from scripts.fakes import FakeOpenAI
+from services.openai_client import set_openai_client
+from services.user_directory import get_user_directory
+
+CREATOR_ID = "user_bench_creator"
+
+
+def seed_board(tickets: int, assignees: int, latency: float) -> LocalSupabase:
+    technicians = [f"user_bench_tech_{i}" for i in range(assignees)]
+    users = [{"id": CREATOR_ID, "email": "creator@example.com"}] + [
+        {"id": user_id, "email": f"tech{i}@example.com"} for i, user_id in enumerate(technicians)
+    ]
+    rows = [
+        {
+            "id": i + 1,
+            "title": f"INSTALL H100 in Pod 7 #{i}",
+            "priority": f"P{i % 5}",
+            "status": "ready",
+            # Every fourth ticket is unassigned
+            "assigned_to": technicians[i % assignees] if i % 4 else None,
+            # Every tenth second repeats, so created_at ties exercise the id tiebreak
+            "created_at": f"2025-11-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60 // 10 * 10:02d}+00:00",
+            "technical_requirements": json.dumps(["Use two 16-pin power cables per node. " * 20]),
+            "datacenter_context": json.dumps([{"id": 1, "content": "switch-7b is located in Pod 7. " * 10}] * 2),
+            "technical_context": json.dumps(["H100 manual, pg 12", "H100 manual, pg 14"]),
+            "warnings": json.dumps([]),
+            "suggestions": json.dumps(["Pod 7 power is non-redundant; schedule accordingly."]),
+        }
+        for i in range(tickets)
+    ]
+    return LocalSupabase({
+        "users": users,
+        "user_roles": [{"user_id": CREATOR_ID, "role": "ticket_creator"}],
+        "tickets": rows
+    }, latency=latency)
+
+
+async def time_list(api: httpx.AsyncClient, db: LocalSupabase, headers: dict, runs: int, params: dict):
+    timings = []
+    db.requests = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        response = await api.get("/api/tickets/list", headers=headers, params=params)
+        response.raise_for_status()
+        timings.append(time.perf_counter() - start)
+    return min(timings), db.requests / runs, len(response.content)
+
+
+async def walk_board(api: httpx.AsyncClient, headers: dict, params: dict, expected: int) -> int:
+    """Follow next_cursor to the end and check each ticket appears exactly once"""
+    seen, cursor, pages = [], None, 0
+    while True:
+        response = await api.get("/api/tickets/list", headers=headers, params={**params, **({"cursor": cursor} if cursor else {})})
+        response.raise_for_status()
+        data = response.json()
+        seen.extend(ticket["id"] for ticket in data["tickets"])
+        pages += 1
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == expected, f"walked {len(seen)} tickets ({len(set(seen))} unique), expected {expected}"
+    return pages
+
+
+async def main(sizes, assignees: int, runs: int, latency: float, limit: int, fields: str, walk: bool):
+    set_openai_client(FakeOpenAI())
+    from main import app
+
+    token = jwt.encode({"sub": CREATOR_ID}, "bench", algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    params = {"limit": limit, "fields": fields}
+    print(f"{'tickets':>8} {'cold ms':>9} {'cold trips':>11} {'warm ms':>9} {'warm trips':>11} {'page KB':>8}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api.local", timeout=None) as api:
+        for size in sizes:
+            db = seed_board(size, assignees, latency)
+            set_db(db)
+
+            get_user_directory().invalidate()
+            cold_time, cold_trips, _ = await time_list(api, db, headers, 1, params)
+            warm_time, warm_trips, size_bytes = await time_list(api, db, headers, runs, params)
+            line = (f"{size:>8} {cold_time * 1000:>9.1f} {cold_trips:>11.1f} "
+                    f"{warm_time * 1000:>9.1f} {warm_trips:>11.1f} {size_bytes / 1024:>8.1f}")
+            if walk:
+                line += f"  walked {await walk_board(api, headers, params, size)} pages"
+            print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ticket listing latency vs board size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 500, 1000])
+    parser.add_argument("--assignees", type=int, default=40)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--db-latency", type=float, default=0.005)
+    parser.add_argument("--limit", type=int, default=100, help="Page size")
+    parser.add_argument("--fields", default="board", help='"board", "all" or a column list')
+    parser.add_argument("--walk", action="store_true", help="Page through every ticket and check the cursor")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.assignees, args.runs, args.db_latency, args.limit, args.fields, args.walk))
@@ -0,0 +1,111 @@
+"""
+Offline throughput benchmark for the ticket API.
+
+Serves the real FastAPI app over an in-process ASGI transport, with the
+database swapped for local_db.LocalSupabase (each request sleeps to simulate
+the PostgREST round-trip) and OpenAI swapped for a delayed fake. Reports
+requests/sec for /api/tickets/list and /api/tickets/create under concurrency;
+create requests assign by email, among --users users.
+
+Usage (from backend/):
+    python -m scripts.bench_tickets_api --tickets 200 --users 1000 --requests 50 --concurrency 10
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+import jwt
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from db import set_db
+from local_db import LocalSupabase
+from scripts.fakes import FakeOpenAI
+from services.openai_client import set_openai_client
+
+CREATOR_ID = "user_bench_creator"
+TECHNICIAN_ID = "user_bench_technician"
+
+
+def seed_database(tickets: int, latency: float, extra_users: int = 0) -> LocalSupabase:
+    users = [
+        {"id": CREATOR_ID, "email": "creator@example.com"},
+        {"id": TECHNICIAN_ID, "email": "tech@example.com"},
+    ] + [{"id": f"user_bench_{i}", "email": f"user{i}@example.com"} for i in range(extra_users)]
+    roles = [
+        {"user_id": CREATOR_ID, "role": "ticket_creator"},
+        {"user_id": TECHNICIAN_ID, "role": "technician"},
+    ]
+    rows = [
+        {
+            "id": i + 1,
+            "title": f"INSTALL H100 in Pod 7 #{i}",
+            "device": "H100",
+            "pod": "Pod 7",
+            "priority": f"P{i % 5}",
+            "status": "ready",
+            "assigned_to": TECHNICIAN_ID if i % 2 else None,
+            "created_at": f"2025-11-01T00:{i // 60 % 60:02d}:{i % 60:02d}+00:00",
+        }
+        for i in range(tickets)
+    ]
+    return LocalSupabase({"users": users, "user_roles": roles, "tickets": rows}, latency=latency)
+
+
+async def measure(api: httpx.AsyncClient, method: str, path: str, requests: int, concurrency: int, **kwargs):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            response = await api.request(method, path, **kwargs)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    return time.perf_counter() - start
+
+
+async def main(tickets: int, users: int, requests: int, concurrency: int, latency: float):
+    db = seed_database(tickets, latency, users)
+    set_db(db)
+    set_openai_client(FakeOpenAI())
+
+    from main import app
+
+    token = jwt.encode({"sub": CREATOR_ID}, "bench", algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+    payload = {
+        "device": "H100",
+        "pod": "Pod 7",
+        "rack": "42U",
+        "switch": "switch-7b",
+        "ports": ["49", "50"],
+        "required_parts": ["3m_DAC_cable"],
+        "assign_to_email": " Tech@Example.com",
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api.local", timeout=None) as api:
+        for name, method, path, kwargs in [
+            ("list", "GET", "/api/tickets/list", {"headers": headers}),
+            ("create", "POST", "/api/tickets/create", {"headers": headers, "json": payload}),
+        ]:
+            db.requests = 0
+            elapsed = await measure(api, method, path, requests, concurrency, **kwargs)
+            print(
+                f"{name:<7} {requests} requests in {elapsed * 1000:.0f} ms "
+                f"-> {requests / elapsed:.1f} req/s ({db.requests / requests:.1f} DB round-trips each)"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline ticket API throughput benchmark")
+    parser.add_argument("--tickets", type=int, default=200)
+    parser.add_argument("--users", type=int, default=1000, help="Extra users in the directory")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--db-latency", type=float, default=0.005)
+    args = parser.parse_args()
+    asyncio.run(main(args.tickets, args.users, args.requests, args.concurrency, args.db_latency))
@@ -0,0 +1,131 @@
+"""
+Wall-clock benchmark for TicketValidationService.validate_ticket.
+
+Runs the validation pipeline against a fake OpenAI client and a fake Supabase
+client that sleep to simulate network round-trips, first with a concurrency
+cap of 1 (equivalent to the old sequential pipeline) and then with the
+configured cap, and compares per-part inventory checks with the batched
+inventory stage. Finally replays /validate -> /create with the validation
+token, after editing a part and after an inventory write, and counts the
+upstream calls each re-validation makes.
+
+Usage (from backend/):
+    python -m scripts.bench_validation --parts 4 --runs 3
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+# Keep the benchmark's embedding cache in memory so runs start cold
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+
+import services.validation_service as validation_service_module
+from db import set_db
+from local_db import LocalSupabase
+from scripts.fakes import FakeOpenAI, fixed_rows_rpc
+from services.embedding_cache import get_embedding_cache
+from services.openai_client import set_openai_client
+
+RPC_LATENCY = 0.03
+
+
+def build_service(max_concurrency: int, batch_inventory: bool = True):
+    fake_supabase = LocalSupabase(latency=RPC_LATENCY)
+    fake_supabase.register_rpc("match_documents", fixed_rows_rpc([
+        {"content": "H100 power", "metadata": {"source": "bench.pdf", "page": 1}}
+    ]))
+    fake_supabase.register_rpc("match_datacenter_documents", fixed_rows_rpc([
+        {"id": 1, "content": "switch-7b is located in Pod 7", "similarity": 0.9}
+    ]))
+    set_db(fake_supabase)
+    set_openai_client(FakeOpenAI())
+    get_embedding_cache().clear()
+    return validation_service_module.TicketValidationService(
+        max_concurrency=max_concurrency,
+        batch_inventory=batch_inventory
+    )
+
+
+def findings(result: dict) -> dict:
+    """Validation output without the per-call token bookkeeping"""
+    return {key: value for key, value in result.items() if key not in ("validation_token", "reused_stages")}
+
+
+async def time_validation(service, ticket: dict, runs: int):
+    timings = []
+    result = None
+    for _ in range(runs):
+        get_embedding_cache().clear()
+        start = time.perf_counter()
+        result = await service.validate_ticket(ticket)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+async def main(parts: int, runs: int, max_concurrency: int):
+    ticket = {
+        "device": "H100",
+        "pod": "Pod 7",
+        "rack": "42U",
+        "switch": "switch-7b",
+        "ports": ["49", "50"],
+        "required_parts": [f"part_{i}" for i in range(parts)]
+    }
+
+    sequential_time, sequential_result = await time_validation(build_service(1, False), ticket, runs)
+    concurrent_time, concurrent_result = await time_validation(build_service(max_concurrency, False), ticket, runs)
+
+    print(f"Parts per ticket:   {parts}")
+    print(f"Sequential (cap=1): {sequential_time * 1000:.0f} ms")
+    print(f"Concurrent (cap={max_concurrency}): {concurrent_time * 1000:.0f} ms")
+    print(f"Speedup:            {sequential_time / concurrent_time:.1f}x")
+    print(f"Identical output:   {findings(sequential_result) == findings(concurrent_result)}")
+
+    # Per-part vs batched inventory checks, counting upstream calls per ticket
+    for batch_inventory in (False, True):
+        service = build_service(max_concurrency, batch_inventory)
+        fake_openai = FakeOpenAI()
+        set_openai_client(fake_openai)
+        batch_time, batch_result = await time_validation(service, ticket, 1)
+        label = "Batched inventory:" if batch_inventory else "Per-part inventory:"
+        print(f"{label:<20}{batch_time * 1000:.0f} ms, {fake_openai.embedding_calls} embedding calls, "
+              f"{fake_openai.chat_calls} chat calls, identical output: {findings(batch_result) == findings(sequential_result)}")
+
+    # Same ticket again with the embedding cache already warm
+    service = build_service(max_concurrency)
+    await service.validate_ticket(ticket)
+    fake_openai = FakeOpenAI()
+    set_openai_client(fake_openai)
+    start = time.perf_counter()
+    await service.validate_ticket(ticket)
+    warm_time = time.perf_counter() - start
+    print(f"Warm cache:         {warm_time * 1000:.0f} ms, {fake_openai.embedding_calls} embedding calls")
+
+    # /validate then /create with the token: unchanged stages are reused
+    service = build_service(max_concurrency)
+    validated = await service.validate_ticket(ticket)
+    edited = {**ticket, "required_parts": ticket["required_parts"] + ["extra_part"]}
+    scenarios = [("Same ticket", ticket, None), ("Edited parts", edited, None), ("Inventory write", ticket, "inventory")]
+    for label, replay, write in scenarios:
+        if write:
+            await service.datacenter_rag.add_document("extra_part: 5 in stock", write, {"item": "extra_part", "quantity": 5})
+        fake_openai = FakeOpenAI()
+        set_openai_client(fake_openai)
+        get_embedding_cache().clear()
+        start = time.perf_counter()
+        revalidated = await service.validate_ticket(replay, validated["validation_token"])
+        elapsed = time.perf_counter() - start
+        print(f"Token, {label.lower() + ':':<17}{elapsed * 1000:.0f} ms, {fake_openai.embedding_calls} embedding calls, "
+              f"{fake_openai.chat_calls} chat calls, reused {revalidated['reused_stages']}")
+    assert findings(await service.validate_ticket(ticket, "forged.token")) == findings(validated)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ticket validation latency")
+    parser.add_argument("--parts", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-concurrency", type=int, default=validation_service_module.DEFAULT_MAX_CONCURRENCY)
+    args = parser.parse_args()
+    asyncio.run(main(args.parts, args.runs, args.max_concurrency))
@@ -0,0 +1,91 @@
+"""
+Latency of /api/tickets/create after an intake chat, with and without
+speculative validation prefetch.
+
+Serves the real FastAPI app in-process against LocalSupabase and a delayed
+fake OpenAI client. One /llm/api/chat turn extracts the ticket fields, the
+"user" then takes --think seconds to supply the assignee, and the ticket is
+created; with a session_id the validation stages started during the chat
+are picked up instead of run. Also checks that changing a field cancels the
+stage prefetched for the old value.
+
+Usage (from backend/):
+    python -m scripts.bench_validation_prefetch --think 1.0 --generation 0.3
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+import httpx
+import jwt
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+
+from db import set_db
+from scripts.bench_tickets_api import CREATOR_ID, TECHNICIAN_ID, seed_database
+from scripts.fakes import FakeOpenAI, fixed_rows_rpc
+from services.embedding_cache import get_embedding_cache
+from services.openai_client import set_openai_client
+from services.validation_service import get_validation_service
+
+CHAT = "Install an H100 in Pod 7, rack 42U, switch-7b ports 49 and 50 with a DAC cable and power cable"
+
+
+async def chat_then_create(api: httpx.AsyncClient, headers: dict, session_id, think: float):
+    response = await api.post("/llm/api/chat", json={"message": CHAT, "ticket_data": {}, "session_id": session_id})
+    response.raise_for_status()
+    ticket = {**response.json()["ticket_data"], "assign_to_email": "tech@example.com", "session_id": session_id}
+
+    await asyncio.sleep(think)
+    start = time.perf_counter()
+    response = await api.post("/api/tickets/create", json=ticket, headers=headers)
+    response.raise_for_status()
+    return time.perf_counter() - start, response.json()["validation"]
+
+
+async def check_cancellation():
+    service = get_validation_service()
+    session_id = str(uuid.uuid4())
+    await service.prefetch(session_id, {"pod": "Pod 7", "switch": "switch-7b"})
+    (_, first), = service._prefetches[session_id]["stages"].values()
+    started = await service.prefetch(session_id, {"pod": "Pod 8", "switch": "switch-7b"})
+    await asyncio.sleep(0)
+    assert first.cancelled() and started == ["location"], "changed pod should restart the location stage"
+    service._cancel_prefetch(session_id)
+    print("Changing the pod cancelled the prefetched location stage and started a new one")
+
+
+async def main(think: float, generation: float, latency: float):
+    db = seed_database(0, latency)
+    db.register_rpc("match_documents", fixed_rows_rpc([
+        {"id": 1, "content": "H100 power", "metadata": {"source": "bench.pdf", "page": 1}}
+    ]))
+    db.register_rpc("match_datacenter_documents", fixed_rows_rpc([
+        {"id": 1, "content": "switch-7b is located in Pod 7", "similarity": 0.9}
+    ]))
+    set_db(db)
+    set_openai_client(FakeOpenAI(chat_latency=generation))
+
+    from main import app
+
+    token = jwt.encode({"sub": CREATOR_ID}, "bench", algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api.local", timeout=None) as api:
+        for label, session_id in (("without session", None), ("with session", str(uuid.uuid4()))):
+            get_embedding_cache().clear()
+            elapsed, validation = await chat_then_create(api, headers, session_id, think)
+            print(f"create {label + ':':<17}{elapsed * 1000:>6.0f} ms, prefetched {validation['prefetched_stages']}")
+    await check_cancellation()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ticket create latency with speculative validation prefetch")
+    parser.add_argument("--think", type=float, default=1.0, help="Seconds between the chat turn and create")
+    parser.add_argument("--generation", type=float, default=0.3, help="Fake completion time in seconds")
+    parser.add_argument("--db-latency", type=float, default=0.03)
+    args = parser.parse_args()
+    asyncio.run(main(args.think, args.generation, args.db_latency))
@@ -0,0 +1,78 @@
+"""
+Build the ANN index over the documents table and report its recall.
+
+The index is written to a directory that API workers memory-map on startup
+(point RAG_ANN_INDEX_PATH at it); scripts/ingest.py appends to it afterwards.
+
+Usage (from backend/):
+    python -m scripts.build_ann_index --path .cache/documents_ann --k 10
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+from supabase import create_client
+
+from services.ann_index import IVFIndex
+from services.vector_index import parse_embedding
+
+load_dotenv()
+
+
+def fetch_document_embeddings(page_size: int = 1000):
+    supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_KEY"))
+    ids, vectors = [], []
+    while True:
+        result = supabase.table("documents")\
+            .select("id, embedding")\
+            .order("id")\
+            .range(len(ids), len(ids) + page_size - 1)\
+            .execute()
+        for row in result.data:
+            if row.get("embedding") is not None:
+                ids.append(row["id"])
+                vectors.append(parse_embedding(row["embedding"]))
+        print(f"Fetched {len(ids)} embeddings")
+        if len(result.data) < page_size:
+            return ids, np.asarray(vectors, dtype=np.float32)
+
+
+def report_recall(index: IVFIndex, vectors: np.ndarray, k: int, queries: int):
+    """Recall@k and latency of approximate vs exact search on sampled documents"""
+    rng = np.random.default_rng(0)
+    sample = vectors[rng.choice(len(vectors), min(queries, len(vectors)), replace=False)]
+    # Perturb the sampled vectors so queries are near, not identical to, stored chunks
+    sample = sample + rng.normal(scale=0.01, size=sample.shape).astype(np.float32)
+
+    nprobe = index.meta["nprobe"]
+    for probes in sorted({max(1, nprobe // 2), nprobe, min(index.meta["nlist"], nprobe * 2)}):
+        start = time.perf_counter()
+        for query in sample:
+            index.search(query, k, nprobe=probes)
+        ann_ms = (time.perf_counter() - start) * 1000 / len(sample)
+        recall = index.recall_at_k(sample, k, nprobe=probes)
+        print(f"nprobe={probes:<4} recall@{k}={recall:.3f}  {ann_ms:.2f} ms/query")
+
+    start = time.perf_counter()
+    for query in sample:
+        index.exact_search(query, k)
+    print(f"exact search            {(time.perf_counter() - start) * 1000 / len(sample):.2f} ms/query")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the documents ANN index")
+    parser.add_argument("--path", default=os.getenv("RAG_ANN_INDEX_PATH", ".cache/documents_ann"))
+    parser.add_argument("--nlist", type=int, default=None, help="Number of inverted lists (default 4*sqrt(n))")
+    parser.add_argument("--nprobe", type=int, default=None, help="Lists scanned per query (default nlist/16)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200, help="Sampled queries for the recall report")
+    args = parser.parse_args()
+
+    ids, vectors = fetch_document_embeddings()
+    start = time.perf_counter()
+    index = IVFIndex.build(args.path, ids, vectors, nlist=args.nlist, nprobe=args.nprobe)
+    print(f"Built {index.meta['nlist']}-list index over {len(index)} chunks "
+          f"in {time.perf_counter() - start:.1f}s at {args.path}")
+    report_recall(index, vectors, args.k, args.queries)
@@ -0,0 +1,105 @@
+"""
+Offline stand-ins shared by the benchmark scripts.
+
+FakeOpenAI mimics the parts of AsyncOpenAI the services use and answers after
+a fixed delay; pair it with local_db.LocalSupabase for the database side.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+EMBEDDING_LATENCY = 0.05
+CHAT_LATENCY = 0.2
+
+
+class FakeOpenAI:
+    """Answers embeddings and chat completions after a fixed delay"""
+
+    def __init__(self, embedding_latency: float = EMBEDDING_LATENCY, chat_latency: float = CHAT_LATENCY, embedder=None):
+        self.embedding_latency = embedding_latency
+        # Optional text -> vector function; embeddings are all zeros otherwise
+        self.embedder = embedder
+        self.chat_latency = chat_latency
+        self.embedding_calls = 0
+        self.chat_calls = 0
+        self.embeddings = SimpleNamespace(create=self._create_embedding)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_completion))
+
+    async def _create_embedding(self, model, input):
+        self.embedding_calls += 1
+        await asyncio.sleep(self.embedding_latency)
+        inputs = input if isinstance(input, list) else [input]
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=self.embedder(text) if self.embedder else [0.0] * 1536)
+            for i, text in enumerate(inputs)
+        ])
+
+    async def _create_completion(self, model, messages, **kwargs):
+        self.chat_calls += 1
+        if kwargs.get("stream"):
+            return self._stream_completion(self._completion_text(messages, kwargs))
+        await asyncio.sleep(self.chat_latency)
+        content = self._completion_text(messages, kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def _stream_completion(self, content: str):
+        """Word-sized deltas spread over chat_latency, after a short time to first token"""
+        tokens = [word + " " for word in content.split(" ")]
+        tokens[-1] = tokens[-1][:-1]
+        await asyncio.sleep(self.chat_latency * 0.1)
+        for token in tokens:
+            await asyncio.sleep(self.chat_latency * 0.9 / len(tokens))
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+    def _completion_text(self, messages, kwargs) -> str:
+        prompt = messages[-1]["content"]
+        if kwargs.get("response_format") and '"results"' in prompt and "### Ticket" in prompt:
+            # Batched priority assignment: one entry per listed ticket
+            content = json.dumps({"results": [
+                {"priority": "P2", "justification": "Needs scheduling.", "estimated_duration_minutes": 60}
+                for _ in range(prompt.count("### Ticket"))
+            ]})
+        elif kwargs.get("response_format") and '"results"' in prompt:
+            # Batched inventory check: one entry per listed part
+            content = json.dumps({"results": [
+                {"part": "", "available": True, "quantity": 10, "warning": "", "alternative": ""}
+                for _ in range(prompt.count("The user needs:"))
+            ]})
+        elif kwargs.get("response_format"):
+            content = json.dumps({
+                "has_error": False,
+                "warning": "",
+                "suggestion": "",
+                "available": True,
+                "quantity": 10,
+                "alternative": "",
+                "priority": "P3",
+                "justification": "Routine installation.",
+                "estimated_duration_minutes": 30
+            })
+        elif '"extracted_data"' in messages[0]["content"]:
+            # Ticket intake chat: fields first, then the conversational reply
+            content = "```json\n" + json.dumps({
+                "extracted_data": {
+                    "device": "H100",
+                    "pod": "Pod 7",
+                    "rack": "42U",
+                    "switch": "switch-7b",
+                    "ports": ["49", "50"],
+                    "required_parts": ["3m_DAC_cable", "16pin_power"],
+                    "action": "INSTALL",
+                    "description": "Install an H100 node in Pod 7, rack 42U.",
+                    "assign_to_email": None
+                },
+                "response_message": "Got it! I have the H100 install in Pod 7, rack 42U on switch-7b ports 49 and 50. "
+                                    "Who should I assign this ticket to?",
+                "missing_fields": ["assign_to_email"]
+            }, indent=2) + "\n```"
+        else:
+            content = "Use two 16-pin power cables per node [Source: bench.pdf]."
+        return content
+
+
+def fixed_rows_rpc(rows):
+    """LocalSupabase RPC that always returns the same rows"""
+    return lambda db, params: [dict(row) for row in rows]
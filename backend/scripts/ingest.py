@@ -3,7 +3,16 @@ from dotenv import load_dotenv
 from PyPDF2 import PdfReader
 from openai import OpenAI
 from supabase import create_client, Client
-from typing import List, Dict
+from typing import List, Dict, Optional
+from services.embedding_cache import EMBEDDING_MODEL, get_embedding_cache
+from services.ann_index import load_ann_index
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import hashlib
+import json
+import multiprocessing
+import queue
+import threading
 import time
 
 # Load environment variables
@@ -16,6 +25,10 @@ supabase: Client = create_client(
     os.getenv("SUPABASE_SERVICE_KEY")
 )
 
+# Keep the ANN index used by rag_service in step with the documents table
+ANN_INDEX_PATH = os.getenv("RAG_ANN_INDEX_PATH")
+ann_index = load_ann_index(ANN_INDEX_PATH) if ANN_INDEX_PATH else None
+
 def extract_text_from_pdf(pdf_path: str) -> List[Dict]:
     reader = PdfReader(pdf_path)
     pages = []
@@ -42,67 +55,314 @@ def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]
     
     return chunks
 
-def generate_embedding(text: str) -> List[float]:
-    response = openai_client.embeddings.create(
-        model="text-embedding-ada-002",
-        input=text
-    )
-    return response.data[0].embedding
+# Embedding requests are sized by an estimated token budget (the endpoint
+# also caps the number of inputs per request); inserts go in bulk batches
+EMBEDDING_BATCH_TOKENS = int(os.getenv("EMBEDDING_BATCH_TOKENS", "100000"))
+EMBEDDING_BATCH_MAX_INPUTS = 2048
+INSERT_BATCH_SIZE = int(os.getenv("INSERT_BATCH_SIZE", "500"))
 
-def process_pdf(pdf_path: str, source_name: str = None):
-    if source_name is None:
-        source_name = os.path.basename(pdf_path)
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text
+    return max(1, len(text) // 4)
+
+def batch_by_tokens(texts: List[str], token_budget: int = EMBEDDING_BATCH_TOKENS) -> List[List[int]]:
+    """Group text indexes into batches that stay under the token budget"""
+    batches = []
+    current = []
+    current_tokens = 0
     
-    print(f"\n{'='*60}")
-    print(f"Processing: {source_name}")
-    print(f"{'='*60}")
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (current_tokens + tokens > token_budget or len(current) >= EMBEDDING_BATCH_MAX_INPUTS):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(i)
+        current_tokens += tokens
     
-    # Extract text from PDF
-    pages = extract_text_from_pdf(pdf_path)
+    if current:
+        batches.append(current)
+    return batches
+
+def generate_embeddings(texts: List[str]) -> List[Optional[List[float]]]:
+    """
+    Embed many texts with as few API calls as possible.
+    Cached texts are skipped; a failed batch leaves None for its texts.
+    """
+    cache = get_embedding_cache()
+    embeddings = [cache.get(EMBEDDING_MODEL, text) for text in texts]
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
     
-    # Process each page
-    total_chunks = 0
+    for batch in batch_by_tokens([texts[i] for i in missing]):
+        indexes = [missing[j] for j in batch]
+        batch_texts = [texts[i] for i in indexes]
+        try:
+            response = openai_client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=batch_texts
+            )
+        except Exception as e:
+            print(f"Error embedding batch of {len(batch_texts)} chunks: {e}")
+            continue
+        
+        batch_embeddings = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        cache.put_many(EMBEDDING_MODEL, batch_texts, batch_embeddings)
+        for i, embedding in zip(indexes, batch_embeddings):
+            embeddings[i] = embedding
+    
+    return embeddings
+
+def generate_embedding(text: str) -> List[float]:
+    return generate_embeddings([text])[0]
+
+def update_ann_index(ids: List, embeddings: Optional[List[List[float]]] = None):
+    """Add (or with embeddings=None, remove) rows in the ANN index"""
+    if ann_index is None or not ids:
+        return
+    try:
+        if embeddings is None:
+            ann_index.remove(ids)
+        else:
+            ann_index.add(ids, embeddings)
+    except Exception as e:
+        print(f"Error updating ANN index: {e}")
+
+def insert_rows(rows: List[Dict], batch_size: int = INSERT_BATCH_SIZE) -> int:
+    """Bulk insert rows into documents, returning how many were stored"""
+    inserted = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            result = supabase.table("documents").insert(batch).execute()
+            update_ann_index([row["id"] for row in result.data], [row["embedding"] for row in batch])
+            inserted += len(batch)
+        except Exception as e:
+            print(f"Error inserting rows {start}-{start + len(batch) - 1}: {e}")
+    return inserted
+
+def upsert_rows(rows: List[Dict], batch_size: int = INSERT_BATCH_SIZE) -> int:
+    """Bulk upsert rows that already exist (carry an id), returning how many were stored"""
+    upserted = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            supabase.table("documents").upsert(batch).execute()
+            update_ann_index([row["id"] for row in batch], [row["embedding"] for row in batch])
+            upserted += len(batch)
+        except Exception as e:
+            print(f"Error updating rows {start}-{start + len(batch) - 1}: {e}")
+    return upserted
+
+def write_rows(rows: List[Dict]) -> int:
+    """Upsert changed chunks and insert new ones"""
+    existing = [row for row in rows if "id" in row]
+    new = [row for row in rows if "id" not in row]
+    return upsert_rows(existing) + insert_rows(new)
+
+def delete_rows(ids: List, batch_size: int = INSERT_BATCH_SIZE) -> int:
+    deleted = 0
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start:start + batch_size]
+        try:
+            supabase.table("documents").delete().in_("id", batch).execute()
+            update_ann_index(batch)
+            deleted += len(batch)
+        except Exception as e:
+            print(f"Error deleting {len(batch)} stale chunks: {e}")
+    return deleted
+
+# ============================================================================
+# INCREMENTAL SYNC
+# Each chunk row stores a content_hash in its metadata; a local manifest
+# stores a fingerprint per PDF so unchanged files are skipped without parsing.
+# Manifest entries also record the PDF's directory; a directory sync only
+# prunes manuals that were ingested from that same directory.
+# ============================================================================
+
+MANIFEST_PATH = os.getenv(
+    "INGEST_MANIFEST_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "ingest_manifest.json")
+)
+_manifest_lock = threading.Lock()
+
+def file_fingerprint(pdf_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def load_manifest() -> Dict:
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def source_directory(pdf_path: str) -> str:
+    return os.path.dirname(os.path.abspath(pdf_path))
+
+def record_in_manifest(source_name: str, fingerprint: Optional[str], directory: Optional[str] = None):
+    """Remember (or forget, with fingerprint=None) a fully synced file"""
+    with _manifest_lock:
+        manifest = load_manifest()
+        if fingerprint is None:
+            manifest.pop(source_name, None)
+        else:
+            manifest[source_name] = {"fingerprint": fingerprint, "directory": directory, "synced_at": time.time()}
+        os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+        tmp_path = f"{MANIFEST_PATH}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, MANIFEST_PATH)
+
+def fetch_existing_chunks(source_name: str, page_size: int = 1000) -> List[Dict]:
+    rows = []
+    while True:
+        result = supabase.table("documents")\
+            .select("id, metadata")\
+            .eq("metadata->>source", source_name)\
+            .order("id")\
+            .range(len(rows), len(rows) + page_size - 1)\
+            .execute()
+        rows.extend(result.data)
+        if len(result.data) < page_size:
+            return rows
+
+def is_unchanged(source_name: str, fingerprint: str, manifest: Dict) -> bool:
+    if manifest.get(source_name, {}).get("fingerprint") != fingerprint:
+        return False
+    # Guard against a manifest that outlived the rows it describes
+    result = supabase.table("documents")\
+        .select("id")\
+        .eq("metadata->>source", source_name)\
+        .limit(1)\
+        .execute()
+    return bool(result.data)
+
+def diff_chunks(chunks: List[Dict], existing: List[Dict]) -> Dict:
+    """
+    Match parsed chunks to stored rows by (page, chunk_index).
+    Returns the chunks to write (with the row id when replacing one),
+    the ids of rows that no longer exist in the file, and the unchanged count.
+    """
+    stored = {}
+    stale_ids = []
+    for row in existing:
+        metadata = row.get("metadata") or {}
+        key = (metadata.get("page"), metadata.get("chunk_index"))
+        if key in stored:
+            # Duplicate left behind by a non-incremental run
+            stale_ids.append(row["id"])
+        else:
+            stored[key] = row
+    
+    changed = []
+    unchanged = 0
+    for chunk in chunks:
+        metadata = chunk["metadata"]
+        row = stored.pop((metadata["page"], metadata["chunk_index"]), None)
+        if row is not None and (row.get("metadata") or {}).get("content_hash") == metadata["content_hash"]:
+            unchanged += 1
+            continue
+        changed.append({**chunk, "id": row["id"]} if row is not None else chunk)
+    
+    stale_ids.extend(row["id"] for row in stored.values())
+    return {"changed": changed, "stale_ids": stale_ids, "unchanged": unchanged}
+
+def remove_missing_sources(pdf_directory: str, pdf_files: List[str]) -> int:
+    """
+    Delete chunks of PDFs previously synced from pdf_directory that are no
+    longer in it. Manuals ingested from other directories or as single files
+    elsewhere (and entries without a recorded directory) are left alone.
+    """
+    directory = os.path.abspath(pdf_directory)
+    present = set(pdf_files)
+    missing = [
+        source_name
+        for source_name, entry in load_manifest().items()
+        if entry.get("directory") == directory and source_name not in present
+    ]
+    removed = 0
+    for source_name in missing:
+        try:
+            result = supabase.table("documents").delete().eq("metadata->>source", source_name).execute()
+            update_ann_index([row["id"] for row in result.data])
+            record_in_manifest(source_name, None)
+            removed += 1
+            print(f"Removed chunks for deleted manual {source_name}")
+        except Exception as e:
+            print(f"Error removing chunks for {source_name}: {e}")
+    return removed
+
+def build_chunks(pages: List[Dict], source_name: str, verbose: bool = True) -> List[Dict]:
+    chunks = []
     for page_data in pages:
         page_num = page_data["page_number"]
-        text = page_data["text"]
         
         # Chunk the page text
-        chunks = chunk_text(text, chunk_size=500, overlap=50)
-        print(f"Page {page_num}: Created {len(chunks)} chunks")
+        page_chunks = chunk_text(page_data["text"], chunk_size=500, overlap=50)
+        if verbose:
+            print(f"Page {page_num}: Created {len(page_chunks)} chunks")
         
-        # Generate embeddings and upload each chunk
-        for chunk_idx, chunk in enumerate(chunks):
-            try:
-                # Generate embedding
-                embedding = generate_embedding(chunk)
-                
-                # Prepare metadata
-                metadata = {
+        for chunk_idx, chunk in enumerate(page_chunks):
+            chunks.append({
+                "content": chunk,
+                "metadata": {
                     "source": source_name,
                     "page": page_num,
-                    "chunk_index": chunk_idx
+                    "chunk_index": chunk_idx,
+                    "content_hash": content_hash(chunk)
                 }
-                
-                # Insert into Supabase
-                supabase.table("documents").insert({
-                    "content": chunk,
-                    "embedding": embedding,
-                    "metadata": metadata
-                }).execute()
-                
-                total_chunks += 1
-                
-                # Rate limiting - OpenAI has limits on embeddings per minute
-                time.sleep(0.1)
-                
-            except Exception as e:
-                print(f"Error processing chunk {chunk_idx} on page {page_num}: {e}")
-                continue
+            })
+    return chunks
+
+def process_pdf(pdf_path: str, source_name: str = None, manifest: Optional[Dict] = None):
+    if source_name is None:
+        source_name = os.path.basename(pdf_path)
+    
+    print(f"\n{'='*60}")
+    print(f"Processing: {source_name}")
+    print(f"{'='*60}")
+    
+    start = time.perf_counter()
+    
+    # Skip files that have not changed since the last sync
+    fingerprint = file_fingerprint(pdf_path)
+    if is_unchanged(source_name, fingerprint, load_manifest() if manifest is None else manifest):
+        print(f"Unchanged since last sync, skipping {source_name}")
+        return 0
+    
+    # Extract and chunk text from PDF
+    pages = extract_text_from_pdf(pdf_path)
+    chunks = build_chunks(pages, source_name)
+    
+    # Only changed and new chunks need embedding
+    plan = diff_chunks(chunks, fetch_existing_chunks(source_name))
+    changed = plan["changed"]
+    embeddings = generate_embeddings([chunk["content"] for chunk in changed])
+    rows = [
+        {**chunk, "embedding": embedding}
+        for chunk, embedding in zip(changed, embeddings)
+        if embedding is not None
+    ]
     
-    print(f"\n✓ Successfully uploaded {total_chunks} chunks from {source_name}")
+    # Upload in bulk and drop chunks that disappeared from the file
+    total_chunks = write_rows(rows)
+    deleted = delete_rows(plan["stale_ids"])
+    
+    if total_chunks == len(changed) and deleted == len(plan["stale_ids"]):
+        record_in_manifest(source_name, fingerprint, source_directory(pdf_path))
+    
+    elapsed = time.perf_counter() - start
+    print(f"\n✓ Synced {source_name}: {total_chunks} chunks uploaded, {plan['unchanged']} unchanged, "
+          f"{deleted} removed in {elapsed:.1f}s ({total_chunks / elapsed if elapsed else 0:.1f} chunks/sec)")
     return total_chunks
 
-def ingest_manuals(pdf_directory: str):
+def ingest_manuals(pdf_directory: str, prune: bool = False):
     pdf_files = [f for f in os.listdir(pdf_directory) if f.endswith('.pdf')]
     
     if not pdf_files:
@@ -111,17 +371,200 @@ def ingest_manuals(pdf_directory: str):
     
     print(f"\nFound {len(pdf_files)} PDF files to process")
     total_chunks = 0
+    start = time.perf_counter()
+    manifest = load_manifest()
     
     for pdf_file in pdf_files:
         pdf_path = os.path.join(pdf_directory, pdf_file)
-        chunks = process_pdf(pdf_path, source_name=pdf_file)
+        chunks = process_pdf(pdf_path, source_name=pdf_file, manifest=manifest)
         total_chunks += chunks
     
+    if prune:
+        remove_missing_sources(pdf_directory, pdf_files)
+    
+    elapsed = time.perf_counter() - start
     print(f"\n{'='*60}")
     print(f"INGESTION COMPLETE")
     print(f"Total PDFs processed: {len(pdf_files)}")
     print(f"Total chunks uploaded: {total_chunks}")
+    print(f"Throughput: {total_chunks / elapsed if elapsed else 0:.1f} chunks/sec")
+    print(f"{'='*60}")
+
+def parse_pdf(pdf_path: str, source_name: str) -> Dict:
+    """CPU-bound stage run in the process pool: PDF parsing and chunking"""
+    pages = extract_text_from_pdf(pdf_path)
+    return {"source": source_name, "chunks": build_chunks(pages, source_name, verbose=False)}
+
+def ingest_manuals_parallel(
+    pdf_directory: str,
+    workers: int = os.cpu_count() or 1,
+    io_workers: int = 8,
+    queue_size: int = 32,
+    prune: bool = False
+):
+    """
+    Pipelined ingestion for large manual libraries:
+    parse/chunk in a process pool -> bounded queue -> embed/upload in I/O threads.
+    With prune=True, manuals previously synced from this directory that are
+    no longer in it are deleted from the documents table.
+    """
+    pdf_files = sorted(f for f in os.listdir(pdf_directory) if f.endswith('.pdf'))
+    
+    if not pdf_files:
+        print(f"No PDF files found in {pdf_directory}")
+        return
+    
+    print(f"\nFound {len(pdf_files)} PDF files to process "
+          f"({workers} parse workers, {io_workers} upload workers)")
+    
+    # Each item is one token-budgeted batch of changed chunks from one PDF;
+    # a full queue blocks the parsers' consumer, which in turn stops new PDFs
+    # from being submitted
+    batches: queue.Queue = queue.Queue(maxsize=queue_size)
+    stats = {"pdfs": 0, "skipped_pdfs": 0, "failed_pdfs": 0, "failed_batches": 0,
+             "chunks": 0, "unchanged": 0, "deleted": 0, "uploaded": 0}
+    stats_lock = threading.Lock()
+    # Per-PDF bookkeeping so the manifest is only updated once every batch landed
+    pending = {}
+    start = time.perf_counter()
+    manifest = load_manifest()
+    
+    def finish_batch(source_name: str, ok: bool):
+        entry = pending[source_name]
+        entry["remaining"] -= 1
+        entry["ok"] = entry["ok"] and ok
+        if entry["remaining"] == 0:
+            del pending[source_name]
+            if entry["ok"]:
+                record_in_manifest(source_name, entry["fingerprint"], os.path.abspath(pdf_directory))
+    
+    def upload_worker():
+        while True:
+            item = batches.get()
+            if item is None:
+                batches.task_done()
+                return
+            source_name, batch = item
+            ok = False
+            try:
+                embeddings = generate_embeddings([chunk["content"] for chunk in batch])
+                rows = [
+                    {**chunk, "embedding": embedding}
+                    for chunk, embedding in zip(batch, embeddings)
+                    if embedding is not None
+                ]
+                uploaded = write_rows(rows)
+                ok = uploaded == len(batch)
+                with stats_lock:
+                    stats["uploaded"] += uploaded
+                    elapsed = time.perf_counter() - start
+                    print(f"  uploaded {stats['uploaded']}/{stats['chunks']} changed chunks "
+                          f"({stats['uploaded'] / elapsed:.1f} chunks/sec)")
+            except Exception as e:
+                # Keep draining: a dead uploader would leave the producer blocked on put()
+                print(f"Error uploading {len(batch)} chunks of {source_name}: {e}")
+                with stats_lock:
+                    stats["failed_batches"] += 1
+            finally:
+                try:
+                    with stats_lock:
+                        finish_batch(source_name, ok)
+                except Exception as e:
+                    print(f"Error recording {source_name} in the manifest: {e}")
+                batches.task_done()
+    
+    uploaders = [threading.Thread(target=upload_worker, daemon=True) for _ in range(io_workers)]
+    for thread in uploaders:
+        thread.start()
+    
+    # Spawned rather than forked: the uploader threads above may hold SQLite,
+    # httpx or embedding cache locks at the moment a worker would be forked
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        remaining_files = iter(pdf_files)
+        in_flight = {}
+        
+        def submit_next():
+            for pdf_file in remaining_files:
+                pdf_path = os.path.join(pdf_directory, pdf_file)
+                fingerprint = file_fingerprint(pdf_path)
+                if is_unchanged(pdf_file, fingerprint, manifest):
+                    with stats_lock:
+                        stats["skipped_pdfs"] += 1
+                    print(f"Unchanged since last sync, skipping {pdf_file}")
+                    continue
+                future = pool.submit(parse_pdf, pdf_path, pdf_file)
+                in_flight[future] = (pdf_file, fingerprint)
+                return
+        
+        # Keep a bounded number of PDFs parsed ahead of the upload stage
+        for _ in range(workers * 2):
+            submit_next()
+        
+        while in_flight:
+            future = next(as_completed(in_flight))
+            pdf_file, fingerprint = in_flight.pop(future)
+            try:
+                parsed = future.result()
+                plan = diff_chunks(parsed["chunks"], fetch_existing_chunks(pdf_file))
+            except Exception as e:
+                print(f"Error preparing {pdf_file}: {e}")
+                with stats_lock:
+                    stats["failed_pdfs"] += 1
+                submit_next()
+                continue
+            
+            changed = plan["changed"]
+            deleted = delete_rows(plan["stale_ids"])
+            chunk_batches = batch_by_tokens([chunk["content"] for chunk in changed])
+            with stats_lock:
+                stats["pdfs"] += 1
+                stats["chunks"] += len(changed)
+                stats["unchanged"] += plan["unchanged"]
+                stats["deleted"] += deleted
+                # One extra "batch" for the deletes so an empty diff still completes
+                pending[pdf_file] = {"fingerprint": fingerprint, "remaining": len(chunk_batches) + 1, "ok": True}
+                finish_batch(pdf_file, deleted == len(plan["stale_ids"]))
+            print(f"[{stats['pdfs'] + stats['skipped_pdfs'] + stats['failed_pdfs']}/{len(pdf_files)}] "
+                  f"Parsed {pdf_file}: {len(changed)} changed, {plan['unchanged']} unchanged, {deleted} removed")
+            
+            for batch in chunk_batches:
+                batches.put((pdf_file, [changed[i] for i in batch]))
+            submit_next()
+    
+    for _ in uploaders:
+        batches.put(None)
+    for thread in uploaders:
+        thread.join()
+    
+    if prune:
+        remove_missing_sources(pdf_directory, pdf_files)
+    
+    elapsed = time.perf_counter() - start
+    print(f"\n{'='*60}")
+    print(f"INGESTION COMPLETE")
+    print(f"Total PDFs processed: {stats['pdfs']} ({stats['skipped_pdfs']} unchanged, {stats['failed_pdfs']} failed)")
+    print(f"Total chunks uploaded: {stats['uploaded']}/{stats['chunks']} "
+          f"({stats['unchanged']} unchanged, {stats['deleted']} removed, {stats['failed_batches']} batches failed)")
+    print(f"Elapsed: {elapsed:.1f}s")
+    print(f"Throughput: {stats['uploaded'] / elapsed if elapsed else 0:.1f} chunks/sec")
     print(f"{'='*60}")
+    return stats
 
 if __name__ == "__main__":
-    process_pdf("manuals/Nvidia_H100_Install_Guide.pdf", "Nvidia_H100_Install_Guide.pdf")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Ingest PDF manuals into the documents table")
+    parser.add_argument("path", nargs="?", default="manuals/Nvidia_H100_Install_Guide.pdf",
+                        help="A PDF file, or a directory of PDFs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes used for PDF parsing and chunking")
+    parser.add_argument("--io-workers", type=int, default=8,
+                        help="Threads used for embedding and upload")
+    parser.add_argument("--queue-size", type=int, default=32,
+                        help="Chunk batches buffered between the parse and upload stages")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete manuals previously synced from this directory that are no longer in it")
+    args = parser.parse_args()
+    
+    if os.path.isdir(args.path):
+        ingest_manuals_parallel(args.path, args.workers, args.io_workers, args.queue_size, args.prune)
+    else:
+        process_pdf(args.path, os.path.basename(args.path))
\ No newline at end of file
@@ -1,6 +1,7 @@
+import asyncio
 from services.datacenter_rag import DatacenterRAG
 
-def seed_datacenter_knowledge():
+async def seed_datacenter_knowledge():
     rag = DatacenterRAG()
     
     inventory_docs = [
@@ -189,17 +190,17 @@ def seed_datacenter_knowledge():
     # Insert all documents
     print("Seeding inventory data...")
     for doc in inventory_docs:
-        result = rag.add_document(doc["content"], doc["type"], doc["metadata"])
+        result = await rag.add_document(doc["content"], doc["type"], doc["metadata"])
         print(f"Added: {doc['metadata']['item']}")
     
     print("\nSeeding topology data...")
     for doc in topology_docs:
         # Handle metadata that might not have a strictly defined 'item' equivalent for printing
         meta_id = doc["metadata"].get("switch") or doc["metadata"].get("rack") or doc["metadata"].get("pod") or "General Topology"
-        result = rag.add_document(doc["content"], doc["type"], doc["metadata"])
+        result = await rag.add_document(doc["content"], doc["type"], doc["metadata"])
         print(f"Added: {meta_id}")
     
     print("\nDatacenter RAG seeded successfully!")
 
 if __name__ == "__main__":
-    seed_datacenter_knowledge()
\ No newline at end of file
+    asyncio.run(seed_datacenter_knowledge())
\ No newline at end of file
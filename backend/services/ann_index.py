@@ -0,0 +1,308 @@
+"""
+Approximate-nearest-neighbour index for the manuals corpus (documents table).
+
+IVFIndex is an inverted-file index: spherical k-means centroids partition the
+unit-normalized embeddings into lists, and a query only scans the nprobe lists
+whose centroids are closest. Everything is stored in a directory as raw
+append-only files that are memory-mapped on open, so API workers load a large
+index instantly and the ingest pipeline can append new vectors in place.
+
+Other index types can plug in by subclassing ANNIndex and registering a
+loader in INDEX_TYPES under the "kind" stored in meta.json.
+"""
+from abc import ABC, abstractmethod
+import json
+import os
+import threading
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+
+META_FILE = "meta.json"
+CENTROIDS_FILE = "centroids.npy"
+VECTORS_FILE = "vectors.f32"
+IDS_FILE = "ids.i64"
+LISTS_FILE = "lists.i32"
+TOMBSTONES_FILE = "tombstones.i64"
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class ANNIndex(ABC):
+    """Interface every ANN backend used by rag_service implements"""
+
+    @abstractmethod
+    def search(self, query, k: int, threshold: float = 0.0, nprobe: Optional[int] = None) -> List[Tuple[int, float]]:
+        ...
+
+    @abstractmethod
+    def exact_search(self, query, k: int, threshold: float = 0.0) -> List[Tuple[int, float]]:
+        ...
+
+    @abstractmethod
+    def add(self, ids: Iterable[int], vectors) -> None:
+        ...
+
+    @abstractmethod
+    def remove(self, ids: Iterable[int]) -> None:
+        ...
+
+    def refresh_if_changed(self) -> None:
+        """Pick up appends written by another process"""
+
+    def recall_at_k(self, queries, k: int = 10, nprobe: Optional[int] = None) -> float:
+        """Mean fraction of the exact top-k that the approximate search returns"""
+        queries = _normalize_rows(queries)
+        total = 0.0
+        for query in queries:
+            exact = {doc_id for doc_id, _ in self.exact_search(query, k)}
+            if not exact:
+                total += 1.0
+                continue
+            approx = {doc_id for doc_id, _ in self.search(query, k, nprobe=nprobe)}
+            total += len(exact & approx) / len(exact)
+        return total / len(queries) if len(queries) else 0.0
+
+
+def spherical_kmeans(vectors: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Unit-norm centroids maximizing cosine similarity to their members"""
+    rng = np.random.default_rng(seed)
+    vectors = _normalize_rows(vectors)
+    nlist = max(1, min(nlist, len(vectors)))
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        counts = np.bincount(assignments, minlength=nlist)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty lists with random vectors so every list stays useful
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = _normalize_rows(sums)
+
+    return centroids
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), batch_size):
+        block = vectors[start:start + batch_size]
+        assignments[start:start + batch_size] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+class IVFIndex(ANNIndex):
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._load()
+
+    # --- persistence ------------------------------------------------------
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        ids: Iterable[int],
+        vectors,
+        nlist: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        train_size: int = 50_000,
+        iterations: int = 10
+    ) -> "IVFIndex":
+        """Train centroids on (a sample of) the vectors and write a fresh index"""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        vectors = _normalize_rows(vectors)
+        if len(ids) == 0:
+            raise ValueError("Cannot build an ANN index without vectors")
+
+        nlist = nlist or max(1, int(4 * np.sqrt(len(vectors))))
+        rng = np.random.default_rng(0)
+        sample = vectors if len(vectors) <= train_size else vectors[rng.choice(len(vectors), train_size, replace=False)]
+        centroids = spherical_kmeans(sample, nlist, iterations)
+
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, CENTROIDS_FILE), centroids)
+        for name in (VECTORS_FILE, IDS_FILE, LISTS_FILE, TOMBSTONES_FILE):
+            open(os.path.join(path, name), "wb").close()
+        cls._write_meta(path, {
+            "kind": "ivf",
+            "dim": int(vectors.shape[1]),
+            "nlist": int(len(centroids)),
+            "nprobe": int(nprobe or max(1, len(centroids) // 16)),
+            "count": 0,
+            "tombstones": 0,
+            "version": 0
+        })
+
+        index = cls(path)
+        index.add(ids, vectors)
+        return index
+
+    @staticmethod
+    def _write_meta(path: str, meta: Dict) -> None:
+        tmp_path = os.path.join(path, f"{META_FILE}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(path, META_FILE))
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self) -> None:
+        with open(self._file(META_FILE)) as f:
+            self.meta = json.load(f)
+        self._meta_mtime = os.stat(self._file(META_FILE)).st_mtime_ns
+        count, dim = self.meta["count"], self.meta["dim"]
+
+        self.centroids = np.load(self._file(CENTROIDS_FILE))
+        self.vectors = (
+            np.memmap(self._file(VECTORS_FILE), dtype=np.float32, mode="r", shape=(count, dim))
+            if count else np.zeros((0, dim), dtype=np.float32)
+        )
+        self.ids = np.fromfile(self._file(IDS_FILE), dtype=np.int64, count=count)
+        self.lists = np.fromfile(self._file(LISTS_FILE), dtype=np.int32, count=count)
+        tombstones = np.fromfile(self._file(TOMBSTONES_FILE), dtype=np.int64, count=self.meta["tombstones"])
+
+        self.alive = np.ones(count, dtype=bool)
+        self.alive[tombstones] = False
+
+        # Inverted lists: positions grouped by list, with offsets into that order
+        self._order = np.argsort(self.lists, kind="stable")
+        self._offsets = np.searchsorted(self.lists[self._order], np.arange(self.meta["nlist"] + 1))
+
+    def _meta_changed(self) -> bool:
+        try:
+            return os.stat(self._file(META_FILE)).st_mtime_ns != self._meta_mtime
+        except FileNotFoundError:
+            return False
+
+    def refresh_if_changed(self) -> None:
+        if self._meta_changed():
+            with self._lock:
+                if self._meta_changed():
+                    self._load()
+
+    def __len__(self) -> int:
+        return int(self.alive.sum())
+
+    # --- writes -----------------------------------------------------------
+
+    def add(self, ids: Iterable[int], vectors) -> None:
+        """Append vectors; re-adding an existing id replaces its old vector"""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if len(ids) == 0:
+            return
+        vectors = _normalize_rows(vectors)
+        lists = _assign(vectors, self.centroids)
+
+        with self._lock:
+            self._discard_uncommitted()
+            self._tombstone(ids)
+            with open(self._file(VECTORS_FILE), "ab") as f:
+                f.write(vectors.astype(np.float32).tobytes())
+            with open(self._file(IDS_FILE), "ab") as f:
+                f.write(ids.tobytes())
+            with open(self._file(LISTS_FILE), "ab") as f:
+                f.write(lists.astype(np.int32).tobytes())
+            self._commit(count=self.meta["count"] + len(ids))
+
+    def remove(self, ids: Iterable[int]) -> None:
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if len(ids) == 0:
+            return
+        with self._lock:
+            self._discard_uncommitted()
+            if self._tombstone(ids):
+                self._commit()
+
+    def _discard_uncommitted(self) -> None:
+        """Cut every file back to what meta.json covers before appending.
+
+        A write that died between appending and committing leaves rows past
+        meta["count"] (or tombstones past meta["tombstones"]); appending after
+        them would misalign the new rows with the count the next commit records.
+        """
+        if self._meta_changed():
+            self._load()
+        count, dim = self.meta["count"], self.meta["dim"]
+        sizes = {
+            VECTORS_FILE: count * dim * np.dtype(np.float32).itemsize,
+            IDS_FILE: count * np.dtype(np.int64).itemsize,
+            LISTS_FILE: count * np.dtype(np.int32).itemsize,
+            TOMBSTONES_FILE: self.meta["tombstones"] * np.dtype(np.int64).itemsize
+        }
+        for name, size in sizes.items():
+            if os.path.getsize(self._file(name)) > size:
+                print(f"ANN index: discarding uncommitted data in {name}")
+                os.truncate(self._file(name), size)
+
+    def _tombstone(self, ids: np.ndarray) -> int:
+        positions = np.flatnonzero(np.isin(self.ids, ids) & self.alive).astype(np.int64)
+        if len(positions):
+            with open(self._file(TOMBSTONES_FILE), "ab") as f:
+                f.write(positions.tobytes())
+            self.meta["tombstones"] += len(positions)
+        return len(positions)
+
+    def _commit(self, count: Optional[int] = None) -> None:
+        if count is not None:
+            self.meta["count"] = count
+        self.meta["version"] += 1
+        self._write_meta(self.path, self.meta)
+        self._load()
+
+    # --- reads ------------------------------------------------------------
+
+    def _view(self) -> Tuple[np.ndarray, ...]:
+        # Searches run in worker threads while a refresh or write swaps these
+        # arrays under the lock, so each search takes one consistent set
+        with self._lock:
+            return self.meta, self.centroids, self._order, self._offsets, self.alive, self.vectors, self.ids
+
+    @staticmethod
+    def _top_k(vectors, ids, positions: np.ndarray, query: np.ndarray, k: int, threshold: float) -> List[Tuple[int, float]]:
+        if len(positions) == 0 or k <= 0:
+            return []
+        positions = np.sort(positions)
+        similarities = vectors[positions] @ query
+        keep = np.flatnonzero(similarities > threshold)
+        if len(keep) > k:
+            keep = keep[np.argpartition(-similarities[keep], k - 1)[:k]]
+        keep = keep[np.argsort(-similarities[keep], kind="stable")]
+        return [(int(ids[positions[i]]), float(similarities[i])) for i in keep]
+
+    def search(self, query, k: int, threshold: float = 0.0, nprobe: Optional[int] = None) -> List[Tuple[int, float]]:
+        meta, centroids, order, offsets, alive, vectors, ids = self._view()
+        query = _normalize_rows(query)[0]
+        nprobe = min(nprobe or meta["nprobe"], meta["nlist"])
+        probes = np.argpartition(-(centroids @ query), nprobe - 1)[:nprobe]
+        positions = np.concatenate([
+            order[offsets[probe]:offsets[probe + 1]] for probe in probes
+        ]) if len(probes) else np.zeros(0, dtype=np.int64)
+        return self._top_k(vectors, ids, positions[alive[positions]], query, k, threshold)
+
+    def exact_search(self, query, k: int, threshold: float = 0.0) -> List[Tuple[int, float]]:
+        _, _, _, _, alive, vectors, ids = self._view()
+        query = _normalize_rows(query)[0]
+        return self._top_k(vectors, ids, np.flatnonzero(alive), query, k, threshold)
+
+INDEX_TYPES = {"ivf": IVFIndex}
+
+
+def load_ann_index(path: str) -> Optional[ANNIndex]:
+    """Open the index stored at path, or None if there is none"""
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        kind = json.load(f).get("kind", "ivf")
+    return INDEX_TYPES[kind](path)
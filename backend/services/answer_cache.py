@@ -0,0 +1,159 @@
+"""
+Semantic cache of /api/query answers.
+
+A query whose embedding is within `threshold` cosine similarity of a cached
+query is a candidate for reusing that answer and its sources. Near-identical
+wording is not enough on its own ("H100 power cables" and "H200 power
+cables" embed above 0.95), so rag_service still runs retrieval and confirm()
+only serves the candidate if the new query retrieved exactly the chunks the
+answer was generated from, with unchanged content. The cache saves the
+completion, not the search. Entries are LRU-bounded and expire after
+ttl_seconds so newly ingested manuals are picked up too.
+
+Off unless RAG_ANSWER_CACHE is set.
+"""
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import hashlib
+import itertools
+import os
+import time
+
+import numpy as np
+
+
+def chunk_fingerprint(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class SemanticAnswerCache:
+    def __init__(self, threshold: float = 0.95, ttl_seconds: float = 3600.0, max_entries: int = 512):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._ids = itertools.count()
+        # Stacked unit vectors of the live entries, rebuilt lazily after a change
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: List[int] = []
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "expirations": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "rejections": 0
+        }
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def lookup(self, embedding: List[float]) -> Optional[Dict]:
+        """
+        Closest live entry within the threshold, as {id, query, answer, sources,
+        chunks, similarity}; a candidate until confirm() checks its chunks
+        """
+        vector = self._unit(embedding)
+        while vector is not None and self._entries:
+            if self._matrix is None:
+                self._matrix_ids = list(self._entries)
+                self._matrix = np.stack([self._entries[entry_id]["vector"] for entry_id in self._matrix_ids])
+            similarities = self._matrix @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                break
+
+            entry_id = self._matrix_ids[best]
+            entry = self._entries[entry_id]
+            if entry["expires_at"] < time.monotonic():
+                self._stats["expirations"] += 1
+                self._drop(entry_id)
+                continue
+
+            self._entries.move_to_end(entry_id)
+            return {"id": entry_id, **{k: v for k, v in entry.items() if k not in ("vector", "expires_at")},
+                    "similarity": float(similarities[best])}
+
+        self._stats["misses"] += 1
+        return None
+
+    def confirm(self, candidate: Dict, chunks: List[Dict]) -> bool:
+        """
+        Whether a lookup() candidate answers a query that retrieved `chunks`.
+        The same chunk ids with different content mean they were re-ingested,
+        so the entry is dropped; different chunks mean the queries only looked
+        alike, so the entry is kept for its own query.
+        """
+        retrieved = {chunk["id"]: chunk_fingerprint(chunk["content"]) for chunk in chunks}
+        if retrieved == candidate["chunks"]:
+            self._stats["hits"] += 1
+            return True
+        if set(retrieved) == set(candidate["chunks"]):
+            self.discard(candidate["id"])
+        else:
+            self._stats["rejections"] += 1
+        self._stats["misses"] += 1
+        return False
+
+    def store(self, query: str, embedding: List[float], answer: str, sources: List[str], chunks: List[Dict]) -> None:
+        """Cache an answer along with the id -> content fingerprint of its source chunks"""
+        vector = self._unit(embedding)
+        if vector is None:
+            return
+        while len(self._entries) >= self.max_entries:
+            self._stats["evictions"] += 1
+            self._drop(next(iter(self._entries)))
+        self._entries[next(self._ids)] = {
+            "vector": vector,
+            "query": query,
+            "answer": answer,
+            "sources": sources,
+            "chunks": {chunk["id"]: chunk_fingerprint(chunk["content"]) for chunk in chunks},
+            "expires_at": time.monotonic() + self.ttl_seconds
+        }
+        self._matrix = None
+
+    def discard(self, entry_id: int) -> None:
+        """Drop an entry whose source chunks were re-ingested"""
+        if entry_id in self._entries:
+            self._stats["invalidations"] += 1
+            self._drop(entry_id)
+
+    def invalidate(self) -> None:
+        self._stats["invalidations"] += len(self._entries)
+        self._entries.clear()
+        self._matrix = None
+
+    def _drop(self, entry_id: int) -> None:
+        del self._entries[entry_id]
+        self._matrix = None
+
+    def stats(self) -> Dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "threshold": self.threshold,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+
+_cache: Optional[SemanticAnswerCache] = None
+
+
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """Process-wide cache, or None unless RAG_ANSWER_CACHE is on"""
+    global _cache
+    if os.getenv("RAG_ANSWER_CACHE", "false").lower() not in ("1", "true", "yes"):
+        return None
+    if _cache is None:
+        _cache = SemanticAnswerCache(
+            threshold=float(os.getenv("RAG_ANSWER_CACHE_THRESHOLD", "0.95")),
+            ttl_seconds=float(os.getenv("RAG_ANSWER_CACHE_TTL_SECONDS", "3600")),
+            max_entries=int(os.getenv("RAG_ANSWER_CACHE_MAX_ENTRIES", "512"))
+        )
+    return _cache
@@ -0,0 +1,92 @@
+"""
+Incremental reader for the ticket-intake assistant's JSON reply.
+
+The model answers with {"extracted_data": {...}, "response_message": "...",
+"missing_fields": [...]}, optionally wrapped in a markdown fence. While the
+completion streams in, ChatReplyStreamParser reports each extracted_data
+field once its value is complete and the response_message text as it grows,
+so the chat endpoint can forward both before the JSON is finished.
+"""
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"\s*")
+_EXTRACTED = re.compile(r'"extracted_data"\s*:\s*\{')
+_MESSAGE = re.compile(r'"response_message"\s*:\s*"')
+
+
+def _partial_string(text: str, start: int) -> Tuple[str, bool]:
+    """Decode the JSON string body starting at start; returns (text so far, closed)"""
+    end = start
+    while end < len(text):
+        char = text[end]
+        if char == '"':
+            return json.loads(f'"{text[start:end]}"'), True
+        if char == "\\":
+            # Stop before an escape sequence that hasn't fully arrived
+            width = 6 if text[end + 1:end + 2] == "u" else 2
+            if end + width > len(text):
+                break
+            end += width
+            continue
+        end += 1
+    return json.loads(f'"{text[start:end]}"'), False
+
+
+class ChatReplyStreamParser:
+    def __init__(self):
+        self.text = ""
+        self.fields = {}
+        self._fields_start: Optional[int] = None
+        self._fields_done = False
+        self._message_sent = 0
+
+    def feed(self, delta: str) -> List[Tuple[str, Any]]:
+        """Add a completion delta; returns new ("field", (key, value)) and ("message", text) events"""
+        self.text += delta
+        events: List[Tuple[str, Any]] = [("field", field) for field in self._new_fields()]
+
+        match = _MESSAGE.search(self.text)
+        if match:
+            message, _ = _partial_string(self.text, match.end())
+            if len(message) > self._message_sent:
+                events.append(("message", message[self._message_sent:]))
+                self._message_sent = len(message)
+        return events
+
+    def _new_fields(self) -> List[Tuple[str, Any]]:
+        if self._fields_done:
+            return []
+        if self._fields_start is None:
+            match = _EXTRACTED.search(self.text)
+            if not match:
+                return []
+            self._fields_start = match.end()
+
+        fields = []
+        position = self._fields_start
+        while True:
+            position = _WHITESPACE.match(self.text, position).end()
+            if position < len(self.text) and self.text[position] == ",":
+                position = _WHITESPACE.match(self.text, position + 1).end()
+            if position < len(self.text) and self.text[position] == "}":
+                self._fields_done = True
+                break
+            try:
+                key, after_key = _decoder.raw_decode(self.text, position)
+                colon = _WHITESPACE.match(self.text, after_key).end()
+                if self.text[colon:colon + 1] != ":":
+                    break
+                value_start = _WHITESPACE.match(self.text, colon + 1).end()
+                value, value_end = _decoder.raw_decode(self.text, value_start)
+            except ValueError:
+                break
+            # A number at the very end of the buffer may still be growing
+            if value_end >= len(self.text) and isinstance(value, (int, float)):
+                break
+            self.fields[key] = value
+            fields.append((key, value))
+            position = self._fields_start = value_end
+        return fields
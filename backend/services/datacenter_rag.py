@@ -1,51 +1,204 @@
-from supabase import create_client, Client
-from openai import OpenAI
+from services.embedding_cache import embed, embed_many
+from services.vector_index import LocalVectorIndex
+from services.inventory_index import InventoryIndex
+from services.topology_graph import TopologyGraph, TOPOLOGY_TYPES
+from db import get_db
 from typing import List, Dict, Optional
-import os
 from dotenv import load_dotenv
+import asyncio
+import hashlib
+import json
+import os
+import time
 
 
 load_dotenv()
 
 
 class DatacenterRAG:
-    def __init__(self):
-        # Initialize Supabase client
-        self.supabase: Client = create_client(
-            os.getenv("SUPABASE_URL"),
-            os.getenv("SUPABASE_SERVICE_KEY")
-        )
-        
-        # Initialize OpenAI client
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        
-    def generate_embedding(self, text: str) -> List[float]:
-        response = self.openai_client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text
-        )
-        return response.data[0].embedding
+    def __init__(self, use_local_index: Optional[bool] = None):
+        # Optional in-process mirror of datacenter_knowledge; the
+        # match_datacenter_documents RPC stays the fallback
+        if use_local_index is None:
+            use_local_index = os.getenv("DATACENTER_RAG_LOCAL_INDEX", "").lower() in ("1", "true", "yes")
+        self.use_local_index = use_local_index
+        # Writes made by other processes (e.g. the seed script) show up after this long
+        self.index_refresh_seconds = float(os.getenv("DATACENTER_RAG_INDEX_REFRESH_SECONDS", "300"))
+        self.local_index: Optional[LocalVectorIndex] = None
+        self._index_loaded_at = 0.0
+        self._index_lock = asyncio.Lock()
+        # Exact item/alias lookup over inventory metadata and a pod/switch/rack
+        # graph over topology metadata, both consulted ahead of vector search
+        self.use_inventory_index = os.getenv("DATACENTER_RAG_INVENTORY_INDEX", "true").lower() in ("1", "true", "yes")
+        self.use_topology_graph = os.getenv("DATACENTER_RAG_TOPOLOGY_GRAPH", "true").lower() in ("1", "true", "yes")
+        self.inventory_index: Optional[InventoryIndex] = None
+        self.topology_graph: Optional[TopologyGraph] = None
+        self._metadata_loaded_at = None
+        self._metadata_lock = asyncio.Lock()
+        # Per-section {doc id: row hash} behind knowledge_version()
+        self._section_rows: Dict[str, Dict] = {}
+
+    async def _get_local_index(self) -> Optional[LocalVectorIndex]:
+        if not self.use_local_index:
+            return None
+        if self.local_index is not None and time.monotonic() - self._index_loaded_at < self.index_refresh_seconds:
+            return self.local_index
+
+        async with self._index_lock:
+            if self.local_index is None or time.monotonic() - self._index_loaded_at >= self.index_refresh_seconds:
+                try:
+                    await self.refresh_local_index()
+                except Exception as e:
+                    print(f"Local datacenter index unavailable, using RPC: {e}")
+                    return None
+        return self.local_index
+
+    async def refresh_local_index(self):
+        """Reload every datacenter_knowledge row into the local index"""
+        db = await get_db()
+        result = await db.table("datacenter_knowledge")\
+            .select("id, content, document_type, metadata, embedding")\
+            .execute()
+        index = LocalVectorIndex()
+        index.load(result.data)
+        self.local_index = index
+        self._index_loaded_at = time.monotonic()
+        print(f"Loaded {len(index)} datacenter documents into the local index")
+
+    def _metadata_stale(self) -> bool:
+        return self._metadata_loaded_at is None or time.monotonic() - self._metadata_loaded_at >= self.index_refresh_seconds
+
+    async def _load_metadata_indexes(self) -> bool:
+        """Make sure the inventory index and topology graph are loaded and fresh"""
+        if not (self.use_inventory_index or self.use_topology_graph):
+            return False
+        if not self._metadata_stale():
+            return True
+
+        async with self._metadata_lock:
+            if self._metadata_stale():
+                try:
+                    await self.refresh_metadata_indexes()
+                except Exception as e:
+                    print(f"Datacenter metadata indexes unavailable, using vector search: {e}")
+                    return False
+        return True
+
+    async def refresh_metadata_indexes(self):
+        """Reload inventory and topology documents into their structured indexes"""
+        document_types = []
+        if self.use_inventory_index:
+            document_types.append("inventory")
+        if self.use_topology_graph:
+            document_types.extend(TOPOLOGY_TYPES)
+
+        db = await get_db()
+        result = await db.table("datacenter_knowledge")\
+            .select("id, content, document_type, metadata")\
+            .in_("document_type", document_types)\
+            .execute()
+
+        if self.use_inventory_index:
+            inventory_index = InventoryIndex()
+            inventory_index.load(result.data)
+            self.inventory_index = inventory_index
+        if self.use_topology_graph:
+            topology_graph = TopologyGraph()
+            topology_graph.load(result.data)
+            self.topology_graph = topology_graph
+
+        section_rows = {section: {} for section in self._sections()}
+        for row in result.data:
+            section = self._section_of(row)
+            if section in section_rows:
+                section_rows[section][row["id"]] = self._row_hash(row)
+        self._section_rows = section_rows
+        self._metadata_loaded_at = time.monotonic()
+
+    def _sections(self) -> List[str]:
+        sections = []
+        if self.use_inventory_index:
+            sections.append("inventory")
+        if self.use_topology_graph:
+            sections.append("topology")
+        return sections
+
+    @staticmethod
+    def _section_of(row: Dict) -> Optional[str]:
+        if row.get("document_type") == "inventory":
+            return "inventory"
+        if row.get("document_type") in TOPOLOGY_TYPES:
+            return "topology"
+        return None
+
+    @staticmethod
+    def _row_hash(row: Dict) -> str:
+        content = json.dumps([row.get("content"), row.get("metadata")], sort_keys=True, default=str)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    async def knowledge_version(self, section: str) -> Optional[str]:
+        """
+        Fingerprint of the "inventory" or "topology" documents as this process
+        sees them; None when that section isn't indexed, so callers can't
+        tell whether it changed
+        """
+        if not await self._load_metadata_indexes() or section not in self._section_rows:
+            return None
+        rows = sorted(self._section_rows[section].items(), key=lambda item: str(item[0]))
+        return hashlib.sha256(json.dumps(rows, default=str).encode("utf-8")).hexdigest()[:16]
+
+    async def check_inventory(self, parts: List[str]) -> List[Optional[Dict]]:
+        """Deterministic availability per part; None where no item id or alias matches"""
+        if not await self._load_metadata_indexes() or self.inventory_index is None:
+            return [None] * len(parts)
+        return [self.inventory_index.check(part) for part in parts]
+
+    async def check_topology(self, ticket_data: Dict) -> Optional[Dict]:
+        """Deterministic location check; None when the graph knows neither the switch nor the pod"""
+        if not await self._load_metadata_indexes() or self.topology_graph is None:
+            return None
+        return self.topology_graph.check(ticket_data)
+
+    def _sync_indexes(self, row: Dict, embedding: List[float]):
+        if self.local_index is not None:
+            self.local_index.upsert({**row, "embedding": embedding})
+        if self.inventory_index is not None:
+            self.inventory_index.upsert(row)
+        if self.topology_graph is not None:
+            self.topology_graph.upsert(row)
+        for rows in self._section_rows.values():
+            rows.pop(row["id"], None)
+        section = self._section_of(row)
+        if section in self._section_rows:
+            self._section_rows[section][row["id"]] = self._row_hash(row)
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        return await embed(text)
     
-    def add_document(
+    async def add_document(
         self, 
         content: str, 
         document_type: str, 
         metadata: Optional[Dict] = None
     ) -> Dict:
         # Generate embedding
-        embedding = self.generate_embedding(content)
+        embedding = await self.generate_embedding(content)
         
         # Insert into Supabase
-        result = self.supabase.table("datacenter_knowledge").insert({
+        db = await get_db()
+        result = await db.table("datacenter_knowledge").insert({
             "content": content,
             "document_type": document_type,
             "metadata": metadata or {},
             "embedding": embedding
         }).execute()
         
+        if result.data:
+            self._sync_indexes(result.data[0], embedding)
+        
         return result.data[0] if result.data else None
     
-    def query(
+    async def query(
         self, 
         query_text: str, 
         match_threshold: float = 0.7,
@@ -53,10 +206,43 @@ class DatacenterRAG:
         filter_type: Optional[str] = None
     ) -> List[Dict]:
         # Generate embedding for the query
-        query_embedding = self.generate_embedding(query_text)
+        query_embedding = await self.generate_embedding(query_text)
+        
+        return await self._search(query_embedding, match_threshold, match_count, filter_type)
+    
+    async def query_many(
+        self,
+        query_texts: List[str],
+        match_threshold: float = 0.7,
+        match_count: int = 5,
+        filter_type: Optional[str] = None
+    ) -> List[List[Dict]]:
+        """Run several queries with one embedding request and concurrent searches"""
+        if not query_texts:
+            return []
+        query_embeddings = await embed_many(query_texts)
+        return await asyncio.gather(*[
+            self._search(query_embedding, match_threshold, match_count, filter_type)
+            for query_embedding in query_embeddings
+        ])
+    
+    async def _search(
+        self,
+        query_embedding: List[float],
+        match_threshold: float,
+        match_count: int,
+        filter_type: Optional[str]
+    ) -> List[Dict]:
+        local_index = await self._get_local_index()
+        if local_index is not None:
+            try:
+                return local_index.query(query_embedding, match_threshold, match_count, filter_type)
+            except Exception as e:
+                print(f"Local datacenter index query failed, using RPC: {e}")
         
         # Call the Postgres function for similarity search
-        result = self.supabase.rpc(
+        db = await get_db()
+        result = await db.rpc(
             "match_datacenter_documents",
             {
                 "query_embedding": query_embedding,
@@ -68,8 +254,8 @@ class DatacenterRAG:
         
         return result.data
     
-    def update_document(self, doc_id: int, content: str, metadata: Optional[Dict] = None):
-        embedding = self.generate_embedding(content)
+    async def update_document(self, doc_id: int, content: str, metadata: Optional[Dict] = None):
+        embedding = await self.generate_embedding(content)
         
         update_data = {
             "content": content,
@@ -80,18 +266,32 @@ class DatacenterRAG:
         if metadata:
             update_data["metadata"] = metadata
         
-        result = self.supabase.table("datacenter_knowledge")\
+        db = await get_db()
+        result = await db.table("datacenter_knowledge")\
             .update(update_data)\
             .eq("id", doc_id)\
             .execute()
         
+        if result.data:
+            self._sync_indexes(result.data[0], embedding)
+        
         return result.data[0] if result.data else None
     
-    def delete_document(self, doc_id: int):
+    async def delete_document(self, doc_id: int):
         """Delete a document from the knowledge base"""
-        result = self.supabase.table("datacenter_knowledge")\
+        db = await get_db()
+        result = await db.table("datacenter_knowledge")\
             .delete()\
             .eq("id", doc_id)\
             .execute()
         
+        if self.local_index is not None:
+            self.local_index.remove(doc_id)
+        if self.inventory_index is not None:
+            self.inventory_index.remove(doc_id)
+        if self.topology_graph is not None:
+            self.topology_graph.remove(doc_id)
+        for rows in self._section_rows.values():
+            rows.pop(doc_id, None)
+        
         return result
@@ -0,0 +1,295 @@
+"""
+Two-tier cache for OpenAI embeddings.
+
+Entries are keyed by (model, normalized text). A small in-memory LRU sits in
+front of a SQLite file that survives restarts; both tiers evict by entry
+count. The API services go through embed(), which reads and writes the SQLite
+tier in a worker thread so disk I/O never blocks the event loop; the ingest
+scripts use the cache directly around their own client.
+"""
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from services.openai_client import get_openai_client
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "embeddings.sqlite")
+
+# Disk hits only record last_used (an eviction hint) in memory; it is written
+# back with the next put or once this many hits have accumulated
+TOUCH_FLUSH_SIZE = 256
+
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_CACHE_PATH,
+        memory_entries: int = 2048,
+        disk_entries: int = 200_000
+    ):
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        # _lock guards the memory tier and stats, _disk_lock the connection,
+        # so memory hits never wait behind a disk write
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        self._disk_count = 0
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0
+        }
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            self._conn.commit()
+            # Kept up to date by puts and evictions instead of re-counted
+            (self._disk_count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    @classmethod
+    def make_key(cls, model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{cls.normalize(text)}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = self.make_key(model, text)
+        embedding = self._get_memory(key)
+        return embedding if embedding is not None else self._get_disk([key]).get(key)
+
+    async def aget(self, model: str, text: str) -> Optional[List[float]]:
+        """get() with the disk tier read in a worker thread"""
+        return (await self.aget_many(model, [text]))[0]
+
+    async def aget_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Memory hits first, then one disk query (in a worker thread) for the rest"""
+        keys = [self.make_key(model, text) for text in texts]
+        embeddings = [self._get_memory(key) for key in keys]
+        missing = [key for key, embedding in zip(keys, embeddings) if embedding is None]
+        if missing:
+            if self._conn is None:
+                found = self._get_disk(missing)
+            else:
+                found = await asyncio.to_thread(self._get_disk, missing)
+            embeddings = [
+                embedding if embedding is not None else found.get(key)
+                for key, embedding in zip(keys, embeddings)
+            ]
+        return embeddings
+
+    def _get_memory(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return list(self._memory[key])
+        return None
+
+    def _get_disk(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Disk tier lookup of keys that missed memory; blocking, so async callers run it in a thread"""
+        rows = []
+        if self._conn is not None:
+            unique = list(dict.fromkeys(keys))
+            with self._disk_lock:
+                # Chunked to stay under SQLite's bound-parameter limit
+                for i in range(0, len(unique), 500):
+                    chunk = unique[i:i + 500]
+                    rows.extend(self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall())
+                now = time.time()
+                self._touched.update((key, now) for key, _ in rows)
+                if len(self._touched) >= TOUCH_FLUSH_SIZE:
+                    self._flush_touched()
+                    self._conn.commit()
+
+        found = {key: array("d", vector).tolist() for key, vector in rows}
+        with self._lock:
+            for key in keys:
+                if key in found:
+                    self._remember(key, found[key])
+                    self._stats["disk_hits"] += 1
+                else:
+                    self._stats["misses"] += 1
+        return {key: list(embedding) for key, embedding in found.items()}
+
+    def put(self, model: str, text: str, embedding: List[float]) -> None:
+        self.put_many(model, [text], [embedding])
+
+    def put_many(self, model: str, texts: List[str], embeddings: List[List[float]]) -> None:
+        self._write_disk(self._remember_many(model, texts, embeddings))
+
+    async def aput_many(self, model: str, texts: List[str], embeddings: List[List[float]]) -> None:
+        """put_many() with the disk write done in a worker thread"""
+        rows = self._remember_many(model, texts, embeddings)
+        if self._conn is not None and rows:
+            await asyncio.to_thread(self._write_disk, rows)
+
+    def _remember_many(self, model: str, texts: List[str], embeddings: List[List[float]]) -> List[tuple]:
+        """Store in the memory tier; returns the rows for the disk tier"""
+        now = time.time()
+        rows = []
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                key = self.make_key(model, text)
+                self._remember(key, list(embedding))
+                rows.append((key, model, array("d", embedding).tobytes(), now))
+        return rows
+
+    def _write_disk(self, rows: List[tuple]) -> None:
+        if self._conn is None or not rows:
+            return
+        with self._disk_lock:
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, model, vector, last_used) VALUES (?, ?, ?, ?)",
+                rows
+            ).rowcount
+            if inserted < len(rows):
+                # Keys already on disk hold the same embedding; just refresh them
+                self._touched.update((key, now) for key, _, _, now in rows)
+            self._disk_count += inserted
+            self._flush_touched()
+            self._evict_disk()
+            self._conn.commit()
+
+    def _flush_touched(self) -> None:
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _remember(self, key: str, embedding: List[float]) -> None:
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    def _evict_disk(self) -> None:
+        overflow = self._disk_count - self.disk_entries
+        if overflow > 0:
+            evicted = self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (overflow,)
+            ).rowcount
+            self._disk_count -= evicted
+            with self._lock:
+                self._stats["disk_evictions"] += evicted
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_count
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self._conn is not None:
+            with self._disk_lock:
+                self._conn.execute("DELETE FROM embeddings")
+                self._conn.commit()
+                self._touched.clear()
+                self._disk_count = 0
+
+
+_cache: Optional[EmbeddingCache] = None
+_pending: Dict[str, asyncio.Future] = {}
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache; EMBEDDING_CACHE_PATH="" keeps it memory-only"""
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache(
+            path=os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH),
+            memory_entries=int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "2048")),
+            disk_entries=int(os.getenv("EMBEDDING_CACHE_DISK_ENTRIES", "200000"))
+        )
+    return _cache
+
+
+async def embed_many(texts: List[str], model: str = EMBEDDING_MODEL) -> List[List[float]]:
+    """Embed several texts through the cache with at most one API call"""
+    cache = get_embedding_cache()
+    embeddings = await cache.aget_many(model, texts)
+    missing = list({text: None for text, embedding in zip(texts, embeddings) if embedding is None})
+
+    if missing:
+        response = await get_openai_client().embeddings.create(model=model, input=missing)
+        fetched = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        await cache.aput_many(model, missing, fetched)
+        by_text = dict(zip(missing, fetched))
+        embeddings = [
+            embedding if embedding is not None else by_text[text]
+            for text, embedding in zip(texts, embeddings)
+        ]
+
+    return embeddings
+
+
+async def embed(text: str, model: str = EMBEDDING_MODEL) -> List[float]:
+    """Embed text through the cache, sharing one API call between concurrent misses"""
+    cache = get_embedding_cache()
+    embedding = await cache.aget(model, text)
+    if embedding is not None:
+        return embedding
+
+    key = cache.make_key(model, text)
+    if key in _pending:
+        return list(await asyncio.shield(_pending[key]))
+
+    future = asyncio.get_running_loop().create_future()
+    _pending[key] = future
+    try:
+        response = await get_openai_client().embeddings.create(model=model, input=text)
+        embedding = response.data[0].embedding
+        await cache.aput_many(model, [text], [embedding])
+        future.set_result(embedding)
+        return embedding
+    except BaseException as e:
+        if isinstance(e, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(e)
+            # Mark retrieved so failures without waiters don't warn on garbage collection
+            future.exception()
+        raise
+    finally:
+        del _pending[key]
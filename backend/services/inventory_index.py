@@ -0,0 +1,195 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Shorthand technicians use in tickets that the seeded labels don't cover
+DEFAULT_ALIASES = {
+    "DAC cable": "3m_DAC_cable",
+    "power cable": "16pin_power",
+    "H100 node": "H100",
+    "OSFP transceiver": "800G_OSFP_Transceiver",
+    "800G transceiver": "800G_OSFP_Transceiver",
+    "ConnectX-7 NIC": "ConnectX-7",
+    "NVMe SSD": "NVMe_15.36TB",
+    "DDR5 RAM": "DDR5_128GB_RDIMM",
+    "fiber patch cable": "SMF_LCLC_5m",
+    "rail kit": "Rail_Kit_R760",
+    "PSU": "PSU_2400W_Titanium",
+    "breakout cable": "MPO_Breakout_3m",
+    "thermal paste": "Thermal_Paste_MX6",
+}
+
+_COUNT_PREFIX = re.compile(r"^\s*(\d+)\s*x\s+", re.IGNORECASE)
+
+
+def normalize_part(text: str) -> str:
+    """Case-, separator- and plural-insensitive lookup key ("16-pin power cables" -> "16pinpowercable")"""
+    tokens = re.findall(r"[a-z0-9.]+", str(text).lower())
+    tokens = [
+        token[:-1] if len(token) > 3 and token.endswith("s") and not token.endswith("ss") else token
+        for token in tokens
+    ]
+    return "".join(tokens)
+
+
+def _family(item: str) -> str:
+    """Item id without a leading size token, so 2m_DAC_cable and 3m_DAC_cable share a family"""
+    tokens = [token for token in re.split(r"[_\s]+", item.lower()) if token]
+    if len(tokens) > 1 and tokens[0][0].isdigit():
+        tokens = tokens[1:]
+    return normalize_part(" ".join(tokens))
+
+
+def _as_int(value) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+class InventoryIndex:
+    """
+    Exact lookup of inventory documents by canonical item id or alias.
+
+    Rows are datacenter_knowledge inventory documents; their structured
+    metadata (item, quantity, status, location, reserved_for) answers
+    availability directly, so only parts that match no id or alias need the
+    embedding + LLM path.
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, str]] = None):
+        self.aliases = DEFAULT_ALIASES if aliases is None else aliases
+        self._items: Dict[str, Dict] = {}
+        self._doc_items: Dict = {}
+        self._lookup: Optional[Dict[str, str]] = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def load(self, rows: List[Dict]) -> None:
+        """Replace the index contents with datacenter_knowledge rows"""
+        self._items = {}
+        self._doc_items = {}
+        for row in rows:
+            self.upsert(row)
+
+    def upsert(self, row: Dict) -> None:
+        """Add or replace a document; rows that are not inventory items are dropped"""
+        self.remove(row.get("id"))
+        metadata = row.get("metadata") or {}
+        if row.get("document_type") != "inventory" or not metadata.get("item"):
+            return
+
+        item = str(metadata["item"])
+        self._items[item] = {
+            "id": row.get("id"),
+            "item": item,
+            "content": row.get("content") or "",
+            "metadata": metadata
+        }
+        self._doc_items[row.get("id")] = item
+        self._lookup = None
+
+    def remove(self, doc_id) -> None:
+        item = self._doc_items.pop(doc_id, None)
+        if item is not None and self._items.get(item, {}).get("id") == doc_id:
+            del self._items[item]
+            self._lookup = None
+
+    def _build_lookup(self) -> Dict[str, str]:
+        """Map normalized ids and aliases to items; derived aliases shared by two items are dropped"""
+        derived: Dict[str, set] = {}
+        for item, record in self._items.items():
+            names = [record["content"].split(":", 1)[0]] if ":" in record["content"] else []
+            names.extend(record["metadata"].get("aliases") or [])
+            for name in names:
+                derived.setdefault(normalize_part(name), set()).add(item)
+
+        lookup = {key: next(iter(items)) for key, items in derived.items() if len(items) == 1}
+        for alias, item in self.aliases.items():
+            if item in self._items:
+                lookup[normalize_part(alias)] = item
+        for item in self._items:
+            lookup[normalize_part(item)] = item
+        return lookup
+
+    def resolve(self, part: str) -> Optional[Dict]:
+        """Inventory record for an exact id or alias match, else None"""
+        if self._lookup is None:
+            self._lookup = self._build_lookup()
+        item = self._lookup.get(normalize_part(part))
+        return self._items.get(item) if item else None
+
+    def _alternative(self, item: str, needed: int) -> Optional[Dict]:
+        family = _family(item)
+        for candidate, record in self._items.items():
+            if candidate != item and _family(candidate) == family and self._in_stock(record, needed):
+                return record
+        return None
+
+    @staticmethod
+    def _in_stock(record: Dict, needed: int) -> bool:
+        metadata = record["metadata"]
+        if metadata.get("status") == "out_of_stock":
+            return False
+        quantity = _as_int(metadata.get("quantity"))
+        # Non-numeric quantities ("Sufficient_72h") count as available
+        return quantity is None or quantity >= needed
+
+    def check(self, part: str) -> Optional[Dict]:
+        """
+        Deterministic availability for a required part, or None when it matches
+        no item. "2x DAC cable" asks for two units.
+        """
+        needed, name = self._split_count(part)
+        record = self.resolve(name)
+        if record is None:
+            return None
+
+        item, metadata = record["item"], record["metadata"]
+        quantity = _as_int(metadata.get("quantity"))
+        available = self._in_stock(record, needed)
+
+        warning = ""
+        alternative = ""
+        if not available:
+            if metadata.get("status") == "out_of_stock" or quantity == 0:
+                warning = f"{part} is out of stock ({item})."
+                if metadata.get("eta"):
+                    warning += f" Next shipment expected {metadata['eta']}."
+            else:
+                warning = f"Only {quantity} units of {item} in stock; {needed} needed for {part}."
+            substitute = self._alternative(item, needed)
+            if substitute is not None:
+                substitute_meta = substitute["metadata"]
+                alternative = f"Use {substitute['item']} instead"
+                if substitute_meta.get("quantity") is not None:
+                    alternative += f" ({substitute_meta['quantity']} available"
+                    alternative += f" at {substitute_meta['location']})" if substitute_meta.get("location") else ")"
+                alternative += "."
+
+        note = ""
+        if metadata.get("reserved_for"):
+            note = f"{item} stock is reserved for {metadata['reserved_for']}; confirm the allocation before pulling units."
+
+        return {
+            "part": part,
+            "item": item,
+            "available": available,
+            "quantity": quantity,
+            "status": metadata.get("status"),
+            "location": metadata.get("location"),
+            "reserved_for": metadata.get("reserved_for"),
+            "warning": warning,
+            "alternative": alternative,
+            "note": note
+        }
+
+    @staticmethod
+    def _split_count(part: str) -> Tuple[int, str]:
+        match = _COUNT_PREFIX.match(part)
+        if match:
+            return max(1, int(match.group(1))), part[match.end():]
+        return 1, part
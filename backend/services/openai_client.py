@@ -0,0 +1,23 @@
+from openai import AsyncOpenAI
+from typing import Optional
+import os
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+_client: Optional[AsyncOpenAI] = None
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Shared non-blocking OpenAI client used by every service and route"""
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+
+def set_openai_client(client) -> None:
+    """Swap the shared client, e.g. for a fake server in benchmarks"""
+    global _client
+    _client = client
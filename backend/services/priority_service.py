@@ -1,32 +1,80 @@
-from openai import OpenAI
-from typing import Dict
-import os
+from services.openai_client import get_openai_client
+from typing import Dict, List, Optional, Tuple
 import json
+import os
+import re
 
-class PriorityService:
-    def __init__(self):
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    
-    async def assign_priority(self, ticket_data: Dict, validation_result: Dict) -> Dict:
-        """
-        Assign priority (P0-P4) to a ticket based on:
-        - Device type and action
-        - Impact (production vs new install)
-        - Dependencies (blocked by inventory, etc.)
-        - Location and urgency signals
-        """
-        
-        # Build context for the LLM
-        priority_prompt = f"""
-You are a data center operations expert. Assign a priority level (P0-P4) to this ticket.
+# Decide unambiguous tickets with rules and only ask the LLM about the rest
+DEFAULT_USE_RULES = os.getenv("PRIORITY_RULES", "true").lower() in ("1", "true", "yes")
+
+# Context clues as the LLM prompt has always stated them; the rule tier uses
+# the stricter priority_signals() below and never changes what the LLM sees
+PROMPT_IMPACT_KEYWORDS = ['production', 'down', 'outage', 'critical', 'urgent']
+
+OUTAGE_KEYWORDS = re.compile(r"\b(down|outage|offline|safety|fire|smoke)\b")
+PRODUCTION_KEYWORDS = re.compile(r"\b(production|down|outage|critical|urgent|degraded)\b")
+TROUBLESHOOT_ACTIONS = ("FIX", "REPLACE", "TROUBLESHOOT")
 
+# Rough minutes per action, plus time per extra part and per port to cable
+ACTION_MINUTES = {"INSTALL": 45, "UPGRADE": 60, "REPLACE": 60, "FIX": 90, "TROUBLESHOOT": 90}
+MINUTES_PER_EXTRA_PART = 10
+MINUTES_PER_PORT = 5
+
+
+def _ticket_text(ticket_data: Dict) -> str:
+    """Free-text ticket values the impact keywords are matched against"""
+    values = []
+    for key, value in ticket_data.items():
+        if key in ("assign_to_email", "assigned_to_user_id"):
+            continue
+        if isinstance(value, list):
+            values.extend(str(item) for item in value)
+        elif value is not None:
+            values.append(str(value))
+    return " ".join(values).lower()
+
+
+def priority_signals(ticket_data: Dict, validation_result: Dict) -> Dict:
+    """Keyword signals the rule tier decides on"""
+    action = (ticket_data.get("action") or "INSTALL").strip().upper()
+    text = _ticket_text(ticket_data)
+    warnings = validation_result.get("warnings") or []
+    return {
+        "action": action,
+        "troubleshooting": any(keyword in action for keyword in TROUBLESHOOT_ACTIONS),
+        "outage": bool(OUTAGE_KEYWORDS.search(text)),
+        "production_impact": bool(PRODUCTION_KEYWORDS.search(text)),
+        "inventory_issue": any("inventory" in w.lower() for w in warnings),
+        "has_warnings": bool(warnings)
+    }
+
+
+def estimate_duration(ticket_data: Dict, action: str) -> int:
+    parts = len(ticket_data.get("required_parts") or [])
+    ports = len(ticket_data.get("ports") or [])
+    return (
+        ACTION_MINUTES.get(action, 60)
+        + MINUTES_PER_EXTRA_PART * max(parts - 1, 0)
+        + MINUTES_PER_PORT * ports
+    )
+
+
+PRIORITY_DEFINITIONS = """
 Priority Definitions:
 - P0 (Critical): Production systems down, major outage, immediate safety risk
 - P1 (High): Production degraded, critical system at risk, urgent maintenance
 - P2 (Medium): Important but not urgent, scheduled maintenance, planned upgrades
 - P3 (Low): Standard installations, routine tasks, non-urgent requests
 - P4 (Very Low): Nice-to-have, documentation, low-priority improvements
+"""
+
 
+def ticket_section(ticket_data: Dict, validation_result: Dict) -> str:
+    """Ticket details, validation results and context clues as shown to the LLM"""
+    warnings = validation_result.get('warnings') or []
+    troubleshooting = "troubleshoot" in (ticket_data.get('action') or '').lower()
+    production_impact = any(keyword in str(ticket_data).lower() for keyword in PROMPT_IMPACT_KEYWORDS)
+    return f"""
 Ticket Details:
 - Action: {ticket_data.get('action', 'INSTALL')}
 - Device: {ticket_data.get('device')}
@@ -35,12 +83,83 @@ Ticket Details:
 
 Validation Results:
 - Warnings: {', '.join(validation_result.get('warnings', [])) if validation_result.get('warnings') else 'None'}
-- Inventory Issues: {'Yes' if any('inventory' in w.lower() for w in validation_result.get('warnings', [])) else 'No'}
+- Inventory Issues: {'Yes' if any('inventory' in w.lower() for w in warnings) else 'No'}
 
 Context Clues:
-- Is this a new installation or troubleshooting? {"Troubleshooting" if "troubleshoot" in ticket_data.get('action', '').lower() else "New Installation"}
-- Any production impact mentioned? {"Yes" if any(keyword in str(ticket_data).lower() for keyword in ['production', 'down', 'outage', 'critical', 'urgent']) else "No"}
+- Is this a new installation or troubleshooting? {"Troubleshooting" if troubleshooting else "New Installation"}
+- Any production impact mentioned? {"Yes" if production_impact else "No"}
+"""
+
+
+def default_priority(error: Exception) -> Dict:
+    return {
+        "priority": "P3",
+        "justification": f"Default priority assigned due to error: {str(error)}",
+        "estimated_duration_minutes": 30,
+        "tier": "default"
+    }
+
+
+class PriorityService:
+    def __init__(self, use_rules: Optional[bool] = None):
+        self.use_rules = DEFAULT_USE_RULES if use_rules is None else use_rules
+        self.tier_counts = {"rules": 0, "llm": 0, "default": 0}
 
+    def classify(self, ticket_data: Dict, validation_result: Dict) -> Optional[Dict]:
+        """
+        Deterministic priority for tickets whose signals are unambiguous;
+        None when the LLM should decide
+        """
+        signals = priority_signals(ticket_data, validation_result)
+        action = signals["action"]
+        if signals["has_warnings"] or action not in ACTION_MINUTES:
+            return None
+
+        if signals["troubleshooting"] and signals["outage"]:
+            priority, justification = "P0", f"{action.title()} for a reported outage or safety issue."
+        elif signals["troubleshooting"] and signals["production_impact"]:
+            priority, justification = "P1", f"{action.title()} on production systems reported as degraded or critical."
+        elif signals["production_impact"]:
+            # Installs that mention production, or fixes without impact keywords, need judgement
+            return None
+        elif action == "INSTALL":
+            priority, justification = "P3", "Standard installation with no production impact or inventory issues."
+        elif action == "UPGRADE":
+            priority, justification = "P2", "Planned upgrade with no production impact or inventory issues."
+        else:
+            return None
+
+        return {
+            "priority": priority,
+            "justification": justification,
+            "estimated_duration_minutes": estimate_duration(ticket_data, action),
+            "tier": "rules"
+        }
+
+    async def assign_priority(self, ticket_data: Dict, validation_result: Dict) -> Dict:
+        """
+        Assign priority (P0-P4) to a ticket based on:
+        - Device type and action
+        - Impact (production vs new install)
+        - Dependencies (blocked by inventory, etc.)
+        - Location and urgency signals
+
+        Unambiguous tickets are decided by classify(); the rest go to the LLM.
+        The result's "tier" records which one decided ("rules", "llm" or
+        "default" when the LLM call failed).
+        """
+        if self.use_rules:
+            result = self.classify(ticket_data, validation_result)
+            if result is not None:
+                self.tier_counts["rules"] += 1
+                return result
+        return await self._ask_llm(ticket_data, validation_result)
+
+    async def _ask_llm(self, ticket_data: Dict, validation_result: Dict) -> Dict:
+        # Build context for the LLM
+        priority_prompt = f"""
+You are a data center operations expert. Assign a priority level (P0-P4) to this ticket.
+{PRIORITY_DEFINITIONS}{ticket_section(ticket_data, validation_result)}
 Respond in JSON format:
 {{
   "priority": "P0" | "P1" | "P2" | "P3" | "P4",
@@ -48,22 +167,77 @@ Respond in JSON format:
   "estimated_duration_minutes": <integer estimate of how long this will take>
 }}
 """
-        
+
         try:
-            response = self.openai_client.chat.completions.create(
+            response = await get_openai_client().chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": priority_prompt}],
                 response_format={"type": "json_object"},
                 temperature=0.3
             )
-            
+
             result = json.loads(response.choices[0].message.content)
+            result["tier"] = "llm"
+            self.tier_counts["llm"] += 1
             return result
-            
+
         except Exception as e:
             # Fallback to P3 if AI fails
-            return {
-                "priority": "P3",
-                "justification": f"Default priority assigned due to error: {str(e)}",
-                "estimated_duration_minutes": 30
-            }
+            self.tier_counts["default"] += 1
+            return default_priority(e)
+
+    async def assign_priorities(self, tickets: List[Tuple[Dict, Dict]]) -> List[Dict]:
+        """
+        Priorities for (ticket_data, validation_result) pairs: the rule tier
+        first, then a single completion covering every ambiguous ticket, with
+        identical tickets asked about once
+        """
+        results: List[Optional[Dict]] = [None] * len(tickets)
+        ambiguous: Dict[str, List[int]] = {}
+        for i, (ticket_data, validation_result) in enumerate(tickets):
+            if self.use_rules:
+                results[i] = self.classify(ticket_data, validation_result)
+                if results[i] is not None:
+                    self.tier_counts["rules"] += 1
+                    continue
+            ambiguous.setdefault(ticket_section(ticket_data, validation_result), []).append(i)
+
+        if len(ambiguous) == 1:
+            (indexes,) = ambiguous.values()
+            result = await self._ask_llm(*tickets[indexes[0]])
+            self.tier_counts[result["tier"]] += len(indexes) - 1
+            for i in indexes:
+                results[i] = dict(result)
+        elif ambiguous:
+            sections = list(ambiguous)
+            listing = "".join(f"\n### Ticket {n + 1}\n{section}" for n, section in enumerate(sections))
+            priority_prompt = f"""
+You are a data center operations expert. Assign a priority level (P0-P4) to each ticket below.
+{PRIORITY_DEFINITIONS}{listing}
+Respond in JSON format, one entry per ticket in the same order, with exactly {len(sections)} entries:
+{{"results": [{{
+  "priority": "P0" | "P1" | "P2" | "P3" | "P4",
+  "justification": "Brief 1-2 sentence explanation of why this priority was assigned",
+  "estimated_duration_minutes": <integer estimate of how long this will take>
+}}]}}
+"""
+            try:
+                response = await get_openai_client().chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[{"role": "user", "content": priority_prompt}],
+                    response_format={"type": "json_object"},
+                    temperature=0.3
+                )
+                batch = json.loads(response.choices[0].message.content)["results"]
+                if len(batch) != len(sections) or not all(isinstance(result, dict) for result in batch):
+                    raise ValueError(f"expected {len(sections)} priorities, got {batch!r:.200}")
+            except Exception as e:
+                batch = [default_priority(e)] * len(sections)
+
+            for result, indexes in zip(batch, ambiguous.values()):
+                tier = result.get("tier", "llm")
+                self.tier_counts[tier] += len(indexes)
+                for i in indexes:
+                    results[i] = {**result, "tier": tier}
+
+        return results
@@ -1,36 +1,84 @@
+import asyncio
 import os
 from dotenv import load_dotenv
-from openai import OpenAI
-from db import supabase
-from typing import List, Dict
+from services.openai_client import get_openai_client
+from services.embedding_cache import embed
+from services.ann_index import ANNIndex, load_ann_index
+from services.answer_cache import SemanticAnswerCache, get_answer_cache
+from db import get_db
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize OpenAI client with API key from environment
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+MATCH_THRESHOLD = 0.78
+
+# Directory of a prebuilt ANN index over documents (see scripts/build_ann_index.py);
+# without one, similarity search goes through the match_documents RPC
+ANN_INDEX_PATH = os.getenv("RAG_ANN_INDEX_PATH")
+_ann_index: Optional[ANNIndex] = None
+
+def get_ann_index() -> Optional[ANNIndex]:
+    global _ann_index
+    if not ANN_INDEX_PATH:
+        return None
+    if _ann_index is None:
+        _ann_index = load_ann_index(ANN_INDEX_PATH)
+    else:
+        _ann_index.refresh_if_changed()
+    return _ann_index
 
 async def generate_query_embedding(query: str) -> List[float]:
-    response = client.embeddings.create(
-        model="text-embedding-ada-002",
-        input=query
-    )
-    return response.data[0].embedding
+    return await embed(query)
+
+async def search_ann_index(index: ANNIndex, query_embedding: List[float], match_count: int) -> List[Dict]:
+    # The scan reads memory-mapped vectors and can page them in from disk
+    hits = await asyncio.to_thread(index.search, query_embedding, match_count, threshold=MATCH_THRESHOLD)
+    if not hits:
+        return []
+    
+    db = await get_db()
+    response = await db.table("documents")\
+        .select("id, content, metadata")\
+        .in_("id", [doc_id for doc_id, _ in hits])\
+        .execute()
+    
+    rows = {row["id"]: row for row in response.data}
+    return [
+        {**rows[doc_id], "similarity": similarity}
+        for doc_id, similarity in hits
+        if doc_id in rows
+    ]
 
 async def search_similar_chunks(query_embedding: List[float], match_count: int = 3) -> List[Dict]:
-    response = supabase.rpc(
+    index = None
+    try:
+        # May stat meta.json and reload the index files; keep that off the event loop
+        index = await asyncio.to_thread(get_ann_index)
+    except Exception as e:
+        print(f"ANN index unavailable, using match_documents: {e}")
+    
+    if index is not None:
+        try:
+            return await search_ann_index(index, query_embedding, match_count)
+        except Exception as e:
+            print(f"ANN search failed, using match_documents: {e}")
+    
+    db = await get_db()
+    response = await db.rpc(
         'match_documents',
         {
             'query_embedding': query_embedding,
-            'match_threshold': 0.78,
+            'match_threshold': MATCH_THRESHOLD,
             'match_count': match_count
         }
     ).execute()
     
     return response.data
 
-async def generate_answer(query: str, chunks: List[Dict]) -> str:
-    
+NO_ANSWER = "I couldn't find relevant information in the manuals for that question."
+
+def build_answer_messages(query: str, chunks: List[Dict]) -> List[Dict]:
     # Build context from retrieved chunks
     context = "\n\n".join([
         f"[Source: {chunk['metadata']['source']}, Page {chunk['metadata'].get('page', 'N/A')}]\n{chunk['content']}"
@@ -38,22 +86,59 @@ async def generate_answer(query: str, chunks: List[Dict]) -> str:
     ])
     
     # Create prompt for gpt-4o-mini
-    messages = [
+    return [
         {"role": "system", "content": "You are a technical assistant for data center technicians. Provide concise, accurate answers (2-3 sentences) based solely on the provided manual excerpts. Always cite the source manual."},
         {"role": "user", "content": f"Context from manuals:\n{context}\n\nQuestion: {query}\n\nProvide a clear answer with source citations."}
     ]
-    
-    response = client.chat.completions.create(
+
+async def generate_answer(query: str, chunks: List[Dict]) -> str:
+    response = await get_openai_client().chat.completions.create(
         model="gpt-4o-mini",
-        messages=messages,
+        messages=build_answer_messages(query, chunks),
         temperature=0.3,
         max_tokens=200
     )
     
     return response.choices[0].message.content
 
-async def process_query(query: str) -> Dict:
-    """Main RAG pipeline: embed -> search -> generate"""
+async def stream_answer(query: str, chunks: List[Dict]) -> AsyncIterator[str]:
+    """Answer tokens as gpt-4o-mini produces them"""
+    stream = await get_openai_client().chat.completions.create(
+        model="gpt-4o-mini",
+        messages=build_answer_messages(query, chunks),
+        temperature=0.3,
+        max_tokens=200,
+        stream=True
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def extract_sources(chunks: List[Dict]) -> List[str]:
+    sources = [
+        f"{chunk['metadata']['source']}, pg {chunk['metadata'].get('page', 'N/A')}"
+        for chunk in chunks
+    ]
+    return list(set(sources))  # Remove duplicates
+
+def get_cached_answer(cache: Optional[SemanticAnswerCache], query_embedding: List[float], chunks: List[Dict]) -> Optional[Dict]:
+    """
+    Answer cached for a semantically close query, served only if this query
+    retrieved the same, unchanged chunks it was generated from
+    """
+    if cache is None:
+        return None
+    hit = cache.lookup(query_embedding)
+    if hit is None or not cache.confirm(hit, chunks):
+        return None
+    return {"answer": hit["answer"], "sources": hit["sources"]}
+
+async def process_query(query: str, use_answer_cache: bool = True) -> Dict:
+    """
+    Main RAG pipeline: embed -> search -> (semantic cache) -> generate.
+    use_answer_cache=False always generates, e.g. for templated queries that
+    differ only in a device name.
+    """
     
     # Generate embedding for query
     query_embedding = await generate_query_embedding(query)
@@ -63,20 +148,52 @@ async def process_query(query: str) -> Dict:
     
     if not chunks:
         return {
-            "answer": "I couldn't find relevant information in the manuals for that question.",
+            "answer": NO_ANSWER,
             "sources": []
         }
     
+    cache = get_answer_cache() if use_answer_cache else None
+    cached = get_cached_answer(cache, query_embedding, chunks)
+    if cached is not None:
+        return cached
+    
     # Generate answer
     answer = await generate_answer(query, chunks)
-    
-    # Extract sources
-    sources = [
-        f"{chunk['metadata']['source']}, pg {chunk['metadata'].get('page', 'N/A')}"
-        for chunk in chunks
-    ]
+    sources = extract_sources(chunks)
+    if cache is not None:
+        cache.store(query, query_embedding, answer, sources, chunks)
     
     return {
         "answer": answer,
-        "sources": list(set(sources))  # Remove duplicates
+        "sources": sources
     }
+
+async def stream_query(query: str) -> AsyncIterator[Tuple[str, Dict]]:
+    """
+    Streaming RAG pipeline: a "sources" event as soon as retrieval finishes,
+    "token" events while the answer is generated, then "done" with the full answer
+    """
+    query_embedding = await generate_query_embedding(query)
+    chunks = await search_similar_chunks(query_embedding)
+    sources = extract_sources(chunks)
+    yield "sources", {"sources": sources}
+    
+    if not chunks:
+        yield "token", {"text": NO_ANSWER}
+        yield "done", {"answer": NO_ANSWER}
+        return
+    
+    cache = get_answer_cache()
+    cached = get_cached_answer(cache, query_embedding, chunks)
+    if cached is not None:
+        yield "token", {"text": cached["answer"]}
+        yield "done", {"answer": cached["answer"]}
+        return
+    
+    answer = []
+    async for token in stream_answer(query, chunks):
+        answer.append(token)
+        yield "token", {"text": token}
+    if cache is not None:
+        cache.store(query, query_embedding, "".join(answer), sources, chunks)
+    yield "done", {"answer": "".join(answer)}
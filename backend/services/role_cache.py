@@ -0,0 +1,90 @@
+"""
+TTL cache of user_roles lookups for the authorization checks.
+
+Users without a user_roles row get DEFAULT_ROLE, and that answer is cached
+like any other. Call invalidate() after changing a user's role; entries
+otherwise expire after ROLE_CACHE_TTL_SECONDS.
+"""
+from typing import Dict, Optional, Tuple
+import os
+import time
+
+from db import get_db
+
+DEFAULT_ROLE = "technician"
+
+
+class RoleCache:
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 50_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._roles: Dict[str, Tuple[str, bool, float]] = {}
+        self._stats = {
+            "hits": 0,
+            "default_hits": 0,
+            "misses": 0,
+            "expirations": 0,
+            "invalidations": 0
+        }
+
+    async def get_role(self, user_id: str) -> str:
+        """Role for user_id; DB errors propagate and are not cached"""
+        entry = self._roles.get(user_id)
+        if entry is not None:
+            role, is_default, expires_at = entry
+            if expires_at >= time.monotonic():
+                self._stats["hits"] += 1
+                if is_default:
+                    self._stats["default_hits"] += 1
+                return role
+            del self._roles[user_id]
+            self._stats["expirations"] += 1
+
+        self._stats["misses"] += 1
+        db = await get_db()
+        result = await db.table("user_roles")\
+            .select("role")\
+            .eq("user_id", user_id)\
+            .limit(1)\
+            .execute()
+
+        if result.data and result.data[0].get("role"):
+            self._remember(user_id, result.data[0]["role"], False)
+            return result.data[0]["role"]
+        self._remember(user_id, DEFAULT_ROLE, True)
+        return DEFAULT_ROLE
+
+    def _remember(self, user_id: str, role: str, is_default: bool) -> None:
+        if len(self._roles) >= self.max_entries and user_id not in self._roles:
+            self._roles.pop(next(iter(self._roles)))
+        self._roles[user_id] = (role, is_default, time.monotonic() + self.ttl_seconds)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Forget one user's role, or every role when user_id is None"""
+        if user_id is None:
+            self._stats["invalidations"] += len(self._roles)
+            self._roles.clear()
+        elif self._roles.pop(user_id, None) is not None:
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> Dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            "entries": len(self._roles),
+            "ttl_seconds": self.ttl_seconds
+        }
+
+
+_cache: Optional[RoleCache] = None
+
+
+def get_role_cache() -> RoleCache:
+    global _cache
+    if _cache is None:
+        _cache = RoleCache(
+            ttl_seconds=float(os.getenv("ROLE_CACHE_TTL_SECONDS", "300")),
+            max_entries=int(os.getenv("ROLE_CACHE_MAX_ENTRIES", "50000"))
+        )
+    return _cache
@@ -0,0 +1,175 @@
+"""
+In-process job queue for asynchronous ticket creation.
+
+/api/tickets/create?async=true enqueues the validate -> prioritize -> insert
+chain here and returns 202 with a job id. TICKET_JOB_WORKERS workers drain a
+queue bounded by TICKET_JOB_MAX_QUEUED; each job records per-stage progress
+(location, inventory, technical, priority, insert) for the polling and SSE
+endpoints. A "completed" job ran the whole chain; its result says whether
+the ticket was created or failed validation. Jobs live in memory and are
+forgotten TICKET_JOB_RETENTION_SECONDS after they finish, so nothing outside
+the API process is needed.
+
+Jobs spend nearly all their time waiting on OpenAI and the database, so the
+worker count is sized like an I/O pool rather than by CPU: with the default
+of 32, a burst of up to 32 creates drains as fast as the same requests made
+synchronously, and larger bursts take one more chain per extra 32. Fewer
+workers smooth the load on OpenAI (rate limits) at the cost of a longer
+drain; more mostly add concurrent LLM calls.
+"""
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+import asyncio
+import os
+import time
+import uuid
+
+JOB_STAGES = ["location", "inventory", "technical", "priority", "insert"]
+FINISHED = ("completed", "failed")
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class TicketJob:
+    def __init__(self, owner: Optional[str]):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.status = "queued"
+        # Wall-clock timestamps (time.time()), reported to clients
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        # Validation stage name (location, parts, part:N, technical, ...) -> state
+        self._stages: Dict[str, str] = {}
+        self._changed = asyncio.Event()
+
+    @staticmethod
+    def _job_stage(name: str) -> str:
+        kind = name.split(":")[0]
+        return "inventory" if kind in ("part", "parts") else kind
+
+    def _touch(self):
+        self.updated_at = time.time()
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def progress(self, name: str, state: str):
+        """Record a stage moving to running/done/failed; passed to create_validated_ticket"""
+        self._stages[name] = state
+        self._touch()
+
+    def stages(self) -> Dict[str, str]:
+        """Per job stage: pending, running, done, failed or skipped"""
+        grouped: Dict[str, list] = {stage: [] for stage in JOB_STAGES}
+        for name, state in self._stages.items():
+            grouped.setdefault(self._job_stage(name), []).append(state)
+
+        view = {}
+        for stage, states in grouped.items():
+            if not states:
+                view[stage] = "skipped" if self.status in FINISHED else "pending"
+            elif "failed" in states:
+                view[stage] = "failed"
+            elif all(state == "done" for state in states):
+                view[stage] = "done"
+            else:
+                view[stage] = "running"
+        return view
+
+    def snapshot(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stages": self.stages(),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class TicketJobQueue:
+    def __init__(self, workers: int = 32, max_queued: int = 1000, retention_seconds: float = 3600.0):
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.retention_seconds = retention_seconds
+        self.jobs: Dict[str, TicketJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks = []
+
+    def _ensure_workers(self):
+        # Created lazily so the queue binds to the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._worker_tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, owner: Optional[str], work: Callable[[TicketJob], Awaitable[Dict]]) -> TicketJob:
+        """Queue work(job) and return the job; raises QueueFullError when the backlog is full"""
+        self._ensure_workers()
+        self._expire()
+        job = TicketJob(owner)
+        try:
+            self._queue.put_nowait((job, work))
+        except asyncio.QueueFull:
+            raise QueueFullError(f"{self.max_queued} ticket jobs already queued")
+        self.jobs[job.id] = job
+        return job
+
+    async def _worker(self):
+        while True:
+            job, work = await self._queue.get()
+            job.status = "running"
+            job._touch()
+            try:
+                job.result = await work(job)
+                job.status = "completed"
+            except Exception as e:
+                print(f"Ticket job {job.id} failed: {e}")
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.finished_at = time.time()
+                job._touch()
+                self._queue.task_done()
+
+    def _expire(self):
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [key for key, job in self.jobs.items() if job.finished_at is not None and job.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[TicketJob]:
+        return self.jobs.get(job_id)
+
+    async def watch(self, job: TicketJob) -> AsyncIterator[Dict]:
+        """Snapshots of a job each time it changes, ending with the finished state"""
+        while True:
+            changed = job._changed
+            snapshot = job.snapshot()
+            yield snapshot
+            if snapshot["status"] in FINISHED:
+                return
+            await changed.wait()
+
+    def stats(self) -> Dict:
+        counts = {"queued": 0, "running": 0, "completed": 0, "failed": 0}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return {**counts, "workers": self.workers, "max_queued": self.max_queued}
+
+
+_queue: Optional[TicketJobQueue] = None
+
+
+def get_ticket_job_queue() -> TicketJobQueue:
+    global _queue
+    if _queue is None:
+        _queue = TicketJobQueue(
+            workers=int(os.getenv("TICKET_JOB_WORKERS", "32")),
+            max_queued=int(os.getenv("TICKET_JOB_MAX_QUEUED", "1000")),
+            retention_seconds=float(os.getenv("TICKET_JOB_RETENTION_SECONDS", "3600"))
+        )
+    return _queue
@@ -0,0 +1,285 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+TOPOLOGY_TYPES = ("topology", "switch_status")
+
+_PORT_RANGE = re.compile(r"ports?\s+(\d+)\s*-\s*(\d+)\s+(currently\s+)?(in use|available|free|reserved)", re.IGNORECASE)
+_PORT_TOTAL = re.compile(r"(\d+)[\s-]ports?\b", re.IGNORECASE)
+
+
+def normalize_name(value) -> str:
+    """"Pod 7", "Pod_7" and "pod7" all become "pod7" """
+    return re.sub(r"[^a-z0-9]", "", str(value or "").lower())
+
+
+def parse_rack(value) -> Optional[int]:
+    match = re.search(r"\d+", str(value or ""))
+    return int(match.group()) if match else None
+
+
+def _port_number(label: str) -> Optional[int]:
+    """Trailing number of a port label: "30", "port 30" and "Eth1/30" -> 30"""
+    match = re.search(r"(\d+)\s*$", label)
+    return int(match.group(1)) if match else None
+
+
+def parse_ports(value) -> Optional[set]:
+    """
+    Port numbers of a ticket port label: "Eth1/30" -> {30}, "25-28" and
+    "Eth1/25-Eth1/28" -> {25, 26, 27, 28}; None if it can't be read
+    """
+    bounds = [_port_number(part) for part in str(value or "").split("-")]
+    if len(bounds) == 1 and bounds[0] is not None:
+        return {bounds[0]}
+    if len(bounds) == 2 and None not in bounds and bounds[0] <= bounds[1]:
+        return set(range(bounds[0], bounds[1] + 1))
+    return None
+
+
+def parse_range(value) -> Optional[Tuple[int, int]]:
+    """"40U-48U" -> (40, 48)"""
+    numbers = re.findall(r"\d+", str(value or ""))
+    if len(numbers) != 2:
+        return None
+    low, high = int(numbers[0]), int(numbers[1])
+    return min(low, high), max(low, high)
+
+
+def format_ports(ports) -> str:
+    """Collapse port numbers into "25-48, 50" """
+    ranges = []
+    for port in sorted(ports):
+        if ranges and port == ranges[-1][1] + 1:
+            ranges[-1][1] = port
+        else:
+            ranges.append([port, port])
+    return ", ".join(str(low) if low == high else f"{low}-{high}" for low, high in ranges)
+
+
+class TopologyGraph:
+    """
+    Pod -> switch / rack graph built from topology and switch_status documents.
+
+    Validates the location fields of a ticket (switch in pod, rack in pod,
+    requested ports free) directly from document metadata and the port ranges
+    stated in switch_status content, so the location check needs no LLM call
+    whenever the graph knows the switch or pod involved.
+    """
+
+    def __init__(self):
+        self._docs: Dict = {}
+        self._graph: Optional[Dict] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def load(self, rows: List[Dict]) -> None:
+        """Replace the graph contents with datacenter_knowledge rows"""
+        self._docs = {}
+        for row in rows:
+            self.upsert(row)
+
+    def upsert(self, row: Dict) -> None:
+        """Add or replace a document; rows of other types are dropped"""
+        self._docs.pop(row.get("id"), None)
+        if row.get("document_type") in TOPOLOGY_TYPES:
+            self._docs[row.get("id")] = {
+                "id": row.get("id"),
+                "content": row.get("content") or "",
+                "document_type": row.get("document_type"),
+                "metadata": row.get("metadata") or {}
+            }
+        self._graph = None
+
+    def remove(self, doc_id) -> None:
+        if self._docs.pop(doc_id, None) is not None:
+            self._graph = None
+
+    # --- graph construction ----------------------------------------------
+
+    def _build(self) -> Dict:
+        pods: Dict[str, Dict] = {}
+        switches: Dict[str, Dict] = {}
+        racks: Dict[int, Dict] = {}
+
+        def pod_node(name) -> Dict:
+            key = normalize_name(name)
+            return pods.setdefault(key, {
+                "name": str(name).replace("_", " "),
+                "switches": [],
+                "rack_ranges": [],
+                "notes": [],
+                "docs": []
+            })
+
+        for doc in self._docs.values():
+            metadata = doc["metadata"]
+
+            if doc["document_type"] == "switch_status" and metadata.get("switch"):
+                switches[normalize_name(metadata["switch"])] = self._switch_node(doc)
+                if metadata.get("pod"):
+                    node = pod_node(metadata["pod"])
+                    if metadata["switch"] not in node["switches"]:
+                        node["switches"].append(metadata["switch"])
+                continue
+
+            if metadata.get("rack") and metadata.get("pod"):
+                racks[parse_rack(metadata["rack"])] = {
+                    "name": metadata["rack"],
+                    "pod": normalize_name(metadata["pod"]),
+                    "status": metadata.get("status"),
+                    "available_space": metadata.get("available_space"),
+                    "doc": doc
+                }
+                continue
+
+            if metadata.get("pod"):
+                node = pod_node(metadata["pod"])
+                node["docs"].append(doc)
+                if metadata.get("switch") and metadata["switch"] not in node["switches"]:
+                    node["switches"].insert(0, metadata["switch"])
+                rack_range = parse_range(metadata.get("rack_range"))
+                if rack_range:
+                    node["rack_ranges"].append(rack_range)
+                if metadata.get("power_status") == "non-redundant":
+                    note = f"{node['name']} power is non-redundant (running on {metadata.get('active_bus', 'one bus')}"
+                    if metadata.get("maintenance_end"):
+                        note += f" until {metadata['maintenance_end']}"
+                    node["notes"].append(note + "); schedule accordingly.")
+
+        return {"pods": pods, "switches": switches, "racks": racks}
+
+    @staticmethod
+    def _switch_node(doc: Dict) -> Dict:
+        metadata = doc["metadata"]
+        node = {
+            "name": metadata["switch"],
+            "pod": normalize_name(metadata.get("pod")) or None,
+            "status": metadata.get("status"),
+            "total_ports": None,
+            "in_use": set(),
+            "reserved": set(),
+            "free": set(),
+            "doc": doc
+        }
+
+        total = _PORT_TOTAL.search(doc["content"])
+        if total:
+            node["total_ports"] = int(total.group(1))
+        for low, high, _, state in _PORT_RANGE.findall(doc["content"]):
+            ports = set(range(int(low), int(high) + 1))
+            state = state.lower()
+            if state == "in use":
+                node["in_use"] |= ports
+            elif state == "reserved":
+                node["reserved"] |= ports
+            else:
+                node["free"] |= ports
+        return node
+
+    def _get_graph(self) -> Dict:
+        if self._graph is None:
+            self._graph = self._build()
+        return self._graph
+
+    # --- validation -------------------------------------------------------
+
+    def check(self, ticket_data: Dict) -> Optional[Dict]:
+        """
+        Location warnings and suggestions for a ticket, or None when the graph
+        knows neither its switch nor its pod.
+        """
+        graph = self._get_graph()
+        pod_key = normalize_name(ticket_data.get("pod"))
+        switch_key = normalize_name(ticket_data.get("switch"))
+        pod = graph["pods"].get(pod_key) if pod_key else None
+        switch = graph["switches"].get(switch_key) if switch_key else None
+        if pod is None and switch is None:
+            return None
+
+        result = {"warnings": [], "suggestions": [], "context": []}
+        pod_name = pod["name"] if pod else ticket_data.get("pod")
+
+        if switch is not None:
+            result["context"].append(switch["doc"])
+            self._check_switch(graph, ticket_data, pod_key, pod_name, switch, result)
+        elif switch_key and pod is not None:
+            result["warnings"].append(f"{ticket_data.get('switch')} is not a known switch in the datacenter records.")
+            if pod["switches"]:
+                result["suggestions"].append(f"Use {pod['switches'][0]} for {pod_name}.")
+
+        if pod is not None:
+            result["context"].extend(pod["docs"][:1])
+            result["suggestions"].extend(pod["notes"])
+
+        self._check_rack(graph, ticket_data, pod_key, pod, pod_name, result)
+        return result
+
+    @staticmethod
+    def _check_switch(graph: Dict, ticket_data: Dict, pod_key: str, pod_name, switch: Dict, result: Dict):
+        if pod_key and switch["pod"] and switch["pod"] != pod_key:
+            actual_pod = graph["pods"].get(switch["pod"], {}).get("name", switch["pod"])
+            result["warnings"].append(f"{switch['name']} is located in {actual_pod}, not {pod_name}.")
+            pod_switches = graph["pods"].get(pod_key, {}).get("switches") or []
+            if pod_switches:
+                result["suggestions"].append(f"Use {pod_switches[0]} for {pod_name}.")
+
+        if switch["status"] == "offline":
+            result["warnings"].append(f"{switch['name']} is offline.")
+
+        requested = set()
+        for port in ticket_data.get("ports") or []:
+            # Labels we can't read are skipped rather than guessed at
+            requested |= parse_ports(port) or set()
+        if not requested:
+            return
+
+        problems: List[str] = []
+        if switch["total_ports"]:
+            missing = {port for port in requested if port < 1 or port > switch["total_ports"]}
+            if missing:
+                problems.append(f"port(s) {format_ports(missing)} do not exist ({switch['total_ports']} ports total)")
+            requested -= missing
+        in_use = requested & switch["in_use"]
+        if in_use:
+            problems.append(f"port(s) {format_ports(in_use)} are already in use")
+        reserved = requested & switch["reserved"]
+        if reserved:
+            problems.append(f"port(s) {format_ports(reserved)} are reserved")
+
+        if problems:
+            result["warnings"].append(f"On {switch['name']}, " + "; ".join(problems) + ".")
+            if switch["free"]:
+                result["suggestions"].append(f"Available ports on {switch['name']}: {format_ports(switch['free'])}.")
+
+    @staticmethod
+    def _check_rack(graph: Dict, ticket_data: Dict, pod_key: str, pod: Optional[Dict], pod_name, result: Dict):
+        rack_number = parse_rack(ticket_data.get("rack"))
+        if rack_number is None:
+            return
+        rack_label = ticket_data.get("rack")
+
+        rack = graph["racks"].get(rack_number)
+        if rack is not None:
+            result["context"].append(rack["doc"])
+            if rack["status"] == "offline":
+                result["warnings"].append(f"Rack {rack['name']} is offline: {rack['doc']['content']}")
+            elif rack["status"] == "at_capacity" or rack["available_space"] == "0U":
+                result["warnings"].append(f"Rack {rack['name']} has no free space.")
+
+        owners = [
+            node for node in graph["pods"].values()
+            if any(low <= rack_number <= high for low, high in node["rack_ranges"])
+        ]
+        if rack is not None and rack["pod"] in graph["pods"]:
+            owners.append(graph["pods"][rack["pod"]])
+        if pod is None or not (pod["rack_ranges"] or owners):
+            return
+
+        if all(owner is not pod for owner in owners):
+            warning = f"Rack {rack_label} is not in {pod_name}"
+            if pod["rack_ranges"]:
+                warning += " (racks " + ", ".join(f"{low}U-{high}U" for low, high in pod["rack_ranges"]) + ")"
+            result["warnings"].append(warning + ".")
+            if owners:
+                result["suggestions"].append(f"Rack {rack_label} belongs to {owners[0]['name']}.")
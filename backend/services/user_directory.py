@@ -0,0 +1,194 @@
+"""
+Process-wide cache of the users table for the ticket routes.
+
+Assignee emails are resolved for a whole page of tickets with one in_()
+query; answers (including ids with no users row) are kept for
+USER_DIRECTORY_TTL_SECONDS so repeated board loads skip the database.
+
+Assignee lookups by email go through a normalized email -> id map, LRU-bounded
+at max_entries. The Clerk webhook adds new users to it; a miss costs one
+case-insensitive users query on the literal email (ilike with its "%" and "_"
+escaped, so nothing in an address acts as a wildcard), with the match confirmed
+here. Emails with no user are remembered for USER_DIRECTORY_MISS_TTL_SECONDS
+so repeated unknown assignees don't query every time. get_user_ids() resolves
+the misses for a whole batch of emails in one query.
+"""
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+import os
+import time
+
+from db import get_db
+
+
+class UserDirectory:
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 50_000, miss_ttl_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.miss_ttl_seconds = miss_ttl_seconds
+        self._emails: Dict[str, Tuple[Optional[str], float]] = {}
+        self._ids_by_email: "OrderedDict[str, str]" = OrderedDict()
+        # Normalized emails with no users row -> when to ask again
+        self._unknown_emails: "OrderedDict[str, float]" = OrderedDict()
+
+    @staticmethod
+    def normalize_email(email: Optional[str]) -> str:
+        return (email or "").strip().lower()
+
+    @staticmethod
+    def _email_pattern(clean_email: str) -> str:
+        """ilike pattern matching exactly this email"""
+        return clean_email.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    def _known_id(self, clean_email: str) -> Tuple[bool, Optional[str]]:
+        """(answered, user_id) from the email map or a recent miss"""
+        if clean_email in self._ids_by_email:
+            self._ids_by_email.move_to_end(clean_email)
+            return True, self._ids_by_email[clean_email]
+        retry_at = self._unknown_emails.get(clean_email)
+        if retry_at is not None:
+            if retry_at >= time.monotonic():
+                return True, None
+            del self._unknown_emails[clean_email]
+        return False, None
+
+    def _remember_id(self, clean_email: str, user_id: str) -> None:
+        self._unknown_emails.pop(clean_email, None)
+        self._ids_by_email[clean_email] = user_id
+        self._ids_by_email.move_to_end(clean_email)
+        while len(self._ids_by_email) > self.max_entries:
+            self._ids_by_email.popitem(last=False)
+
+    def _remember_unknown(self, clean_email: str) -> None:
+        self._unknown_emails[clean_email] = time.monotonic() + self.miss_ttl_seconds
+        self._unknown_emails.move_to_end(clean_email)
+        while len(self._unknown_emails) > self.max_entries:
+            self._unknown_emails.popitem(last=False)
+
+    def _cached_email(self, user_id: str) -> Tuple[bool, Optional[str]]:
+        entry = self._emails.get(user_id)
+        if entry is None or entry[1] < time.monotonic():
+            return False, None
+        return True, entry[0]
+
+    def remember(self, user_id: str, email: Optional[str]) -> None:
+        if len(self._emails) >= self.max_entries and user_id not in self._emails:
+            # Drop expired entries first, then the oldest if still full
+            now = time.monotonic()
+            self._emails = {key: entry for key, entry in self._emails.items() if entry[1] >= now}
+            if len(self._emails) >= self.max_entries:
+                self._emails.pop(next(iter(self._emails)))
+        self._emails[user_id] = (email, time.monotonic() + self.ttl_seconds)
+
+    def add_user(self, user_id: str, email: Optional[str]) -> None:
+        """Record a users row, e.g. one just inserted by the Clerk webhook"""
+        self.remember(user_id, email)
+        if email:
+            self._remember_id(self.normalize_email(email), user_id)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        if user_id is None:
+            self._emails.clear()
+            self._ids_by_email.clear()
+            self._unknown_emails.clear()
+        else:
+            self._emails.pop(user_id, None)
+            for email in [email for email, known_id in self._ids_by_email.items() if known_id == user_id]:
+                del self._ids_by_email[email]
+
+    async def get_user_id(self, email: str) -> Optional[str]:
+        """user_id for an email, compared case- and whitespace-insensitively"""
+        clean_email = self.normalize_email(email)
+        if not clean_email:
+            return None
+        answered, user_id = self._known_id(clean_email)
+        if answered:
+            return user_id
+
+        # Unknown to this process (e.g. created via another worker)
+        db = await get_db()
+        result = await db.table("users")\
+            .select("id, email")\
+            .ilike("email", self._email_pattern(clean_email))\
+            .execute()
+        for user in result.data:
+            if self.normalize_email(user.get("email")) == clean_email:
+                self.add_user(user["id"], user.get("email"))
+                return user["id"]
+        self._remember_unknown(clean_email)
+        return None
+
+    async def get_user_ids(self, emails: Iterable[str]) -> Dict[str, Optional[str]]:
+        """user_id per normalized email, with one users query for every email not already known"""
+        user_ids: Dict[str, Optional[str]] = {}
+        missing = []
+        for clean_email in dict.fromkeys(self.normalize_email(email) for email in emails):
+            if not clean_email:
+                continue
+            answered, user_id = self._known_id(clean_email)
+            if answered:
+                user_ids[clean_email] = user_id
+            else:
+                missing.append(clean_email)
+
+        if missing:
+            quoted = ",".join(
+                'email.ilike."{}"'.format(self._email_pattern(email).replace("\\", "\\\\").replace('"', '\\"'))
+                for email in missing
+            )
+            db = await get_db()
+            result = await db.table("users")\
+                .select("id, email")\
+                .or_(quoted)\
+                .execute()
+            found = {}
+            for user in result.data:
+                if self.normalize_email(user.get("email")) in missing:
+                    self.add_user(user["id"], user.get("email"))
+                    found[self.normalize_email(user.get("email"))] = user["id"]
+            for clean_email in missing:
+                user_ids[clean_email] = found.get(clean_email)
+                if clean_email not in found:
+                    self._remember_unknown(clean_email)
+
+        return user_ids
+
+    async def get_emails(self, user_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Email per user id, with one users query for every id not already cached"""
+        emails: Dict[str, Optional[str]] = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            if not user_id:
+                continue
+            hit, email = self._cached_email(user_id)
+            if hit:
+                emails[user_id] = email
+            else:
+                missing.append(user_id)
+
+        if missing:
+            db = await get_db()
+            result = await db.table("users")\
+                .select("id, email")\
+                .in_("id", missing)\
+                .execute()
+            found = {row["id"]: row.get("email") for row in result.data}
+            for user_id in missing:
+                self.add_user(user_id, found.get(user_id))
+                emails[user_id] = found.get(user_id)
+
+        return emails
+
+
+_directory: Optional[UserDirectory] = None
+
+
+def get_user_directory() -> UserDirectory:
+    global _directory
+    if _directory is None:
+        _directory = UserDirectory(
+            ttl_seconds=float(os.getenv("USER_DIRECTORY_TTL_SECONDS", "300")),
+            max_entries=int(os.getenv("USER_DIRECTORY_MAX_ENTRIES", "50000")),
+            miss_ttl_seconds=float(os.getenv("USER_DIRECTORY_MISS_TTL_SECONDS", "60"))
+        )
+    return _directory
@@ -1,33 +1,101 @@
 from services.datacenter_rag import DatacenterRAG
 from services.rag_service import process_query
 from services.priority_service import PriorityService
-from openai import OpenAI
-from typing import Dict, List
-from db import supabase
+from services.openai_client import get_openai_client
+from services.validation_token import issue_token, read_token
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from db import get_db
+import asyncio
+import hashlib
 import os
 import json
+import time
+
+# Upper bound on validation stages (location, each required part, technical)
+# that may be in flight at once for a single ticket
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("VALIDATION_MAX_CONCURRENCY", "8"))
+
+# Resolve every required part with one retrieval pass and one completion
+# instead of a query and a completion per part
+DEFAULT_BATCH_INVENTORY = os.getenv("VALIDATION_BATCH_INVENTORY", "true").lower() in ("1", "true", "yes")
+
+# Start stages in the background while the intake chat is still collecting
+# fields, keyed by the chat's session_id; create picks up finished results
+DEFAULT_PREFETCH = os.getenv("VALIDATION_PREFETCH", "true").lower() in ("1", "true", "yes")
+PREFETCH_TTL_SECONDS = float(os.getenv("VALIDATION_PREFETCH_TTL_SECONDS", "900"))
+PREFETCH_MAX_SESSIONS = int(os.getenv("VALIDATION_PREFETCH_MAX_SESSIONS", "1000"))
+
+
+# A planned stage: (name, ticket inputs it reads, knowledge section it
+# consults, coroutine factory). "manuals" has no cheap version, so stages
+# reading it are reused for the validation token's lifetime.
+Stage = Tuple[str, Dict, str, Callable[[], Awaitable[Dict]]]
+
+# Optional observer of (stage name, "running" | "done" | "failed") transitions;
+# ticket creation also reports "priority" and "insert"
+Progress = Optional[Callable[[str, str], None]]
+
+
+def _normalize(value: Any) -> Any:
+    """Case- and whitespace-insensitive form of a ticket value; empty values become None"""
+    if isinstance(value, str):
+        value = " ".join(value.split()).lower()
+        return value or None
+    if isinstance(value, list):
+        return [_normalize(item) for item in value] or None
+    return value
+
+
+def _consume_exception(task: asyncio.Task):
+    """Keep failed prefetches from logging "exception was never retrieved"; create re-runs them"""
+    if not task.cancelled():
+        task.exception()
+
+
+def _empty_stage_result() -> Dict:
+    return {
+        "warnings": [],
+        "suggestions": [],
+        "requirements": [],
+        "datacenter_context": [],
+        "technical_context": []
+    }
+
 
 class TicketValidationService:
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        batch_inventory: Optional[bool] = None,
+        prefetch: Optional[bool] = None
+    ):
         self.datacenter_rag = DatacenterRAG()
         self.priority_service = PriorityService()
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.max_concurrency = max(1, max_concurrency or DEFAULT_MAX_CONCURRENCY)
+        self.batch_inventory = DEFAULT_BATCH_INVENTORY if batch_inventory is None else batch_inventory
+        self.prefetch_enabled = DEFAULT_PREFETCH if prefetch is None else prefetch
+        # session_id -> {"stages": {name: (fingerprint, task)}, "expires_at": float}
+        self._prefetches: Dict[str, Dict] = {}
 
-    async def validate_ticket(self, ticket_data: Dict) -> Dict:
-        warnings = []
-        suggestions = []
-        requirements = []
-        datacenter_context = []
-        technical_context = []
+    async def _validate_location(self, ticket_data: Dict) -> Dict:
+        stage = _empty_stage_result()
+
+        # Known switches and pods are checked against the topology graph
+        topology = await self.datacenter_rag.check_topology(ticket_data)
+        if topology is not None:
+            stage["warnings"].extend(topology["warnings"])
+            stage["suggestions"].extend(topology["suggestions"])
+            stage["datacenter_context"].extend(topology["context"])
+            return stage
 
         location_query = f"switch {ticket_data.get('switch')} location pod {ticket_data.get('pod')}"
-        location_results = self.datacenter_rag.query(
+        location_results = await self.datacenter_rag.query(
             location_query,
             match_count=3,
             filter_type="switch_status"
         )
         if location_results:
-            datacenter_context.extend(location_results[:2])
+            stage["datacenter_context"].extend(location_results[:2])
             # Use GPT model to interpret result
             validation_prompt = f"""
             The user wants to cable to {ticket_data.get('switch')} in {ticket_data.get('pod')}.
@@ -39,92 +107,392 @@ class TicketValidationService:
             Respond in JSON format: {{"has_error": bool, "warning": str, "suggestion": str}}
             """
             try:
-                response = self.openai_client.chat.completions.create(
+                response = await get_openai_client().chat.completions.create(
                     model="gpt-4o-mini",
                     messages=[{"role": "user", "content": validation_prompt}],
                     response_format={"type": "json_object"}
                 )
                 result = json.loads(response.choices[0].message.content)
                 if result["has_error"]:
-                    warnings.append(result["warning"])
-                    suggestions.append(result["suggestion"])
+                    stage["warnings"].append(result["warning"])
+                    stage["suggestions"].append(result["suggestion"])
             except Exception as e:
-                warnings.append(f"Location validation error: {e}")
-
-        if "required_parts" in ticket_data:
-            for part in ticket_data["required_parts"]:
-                inventory_query = f"inventory availability {part}"
-                inventory_results = self.datacenter_rag.query(
-                    inventory_query,
-                    match_count=2,
-                    filter_type="inventory"
+                stage["warnings"].append(f"Location validation error: {e}")
+
+        return stage
+
+    @staticmethod
+    def _apply_inventory_check(stage: Dict, check: Dict):
+        """Report an InventoryIndex.check result the way the LLM results are reported"""
+        if not check["available"]:
+            stage["warnings"].append(check["warning"])
+            if check["alternative"]:
+                stage["suggestions"].append(check["alternative"])
+        if check["note"]:
+            stage["suggestions"].append(check["note"])
+
+    async def _validate_part(self, part: str) -> Dict:
+        stage = _empty_stage_result()
+
+        # Exact item or alias matches are answered from inventory metadata
+        (check,) = await self.datacenter_rag.check_inventory([part])
+        if check is not None:
+            self._apply_inventory_check(stage, check)
+            return stage
+
+        inventory_query = f"inventory availability {part}"
+        inventory_results = await self.datacenter_rag.query(
+            inventory_query,
+            match_count=2,
+            filter_type="inventory"
+        )
+        if inventory_results:
+            inventory_prompt = f"""
+            The user needs: {part}
+            
+            Inventory status:
+            {inventory_results[0]['content']}
+            
+            Is this part available? If not, suggest alternatives.
+            Respond in JSON: {{"available": bool, "quantity": int, "warning": str, "alternative": str}}
+            """
+            try:
+                response = await get_openai_client().chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[{"role": "user", "content": inventory_prompt}],
+                    response_format={"type": "json_object"}
                 )
-                if inventory_results:
-                    inventory_prompt = f"""
-                    The user needs: {part}
-                    
-                    Inventory status:
-                    {inventory_results[0]['content']}
-                    
-                    Is this part available? If not, suggest alternatives.
-                    Respond in JSON: {{"available": bool, "quantity": int, "warning": str, "alternative": str}}
-                    """
-                    try:
-                        response = self.openai_client.chat.completions.create(
-                            model="gpt-4o-mini",
-                            messages=[{"role": "user", "content": inventory_prompt}],
-                            response_format={"type": "json_object"}
-                        )
-                        result = json.loads(response.choices[0].message.content)
-                        if not result["available"]:
-                            warnings.append(result["warning"])
-                            if result.get("alternative"):
-                                suggestions.append(result["alternative"])
-                    except Exception as e:
-                        warnings.append(f"Inventory validation error: {e}")
+                result = json.loads(response.choices[0].message.content)
+                if not result["available"]:
+                    stage["warnings"].append(result["warning"])
+                    if result.get("alternative"):
+                        stage["suggestions"].append(result["alternative"])
+            except Exception as e:
+                stage["warnings"].append(f"Inventory validation error: {e}")
 
-        device = ticket_data.get("device", "")
-        technical_answer = None
-        if device:
-            tech_query = f"{device} installation requirements power cables specifications"
+        return stage
+
+    async def _validate_parts_batch(self, parts: List[str]) -> Dict:
+        """Batched equivalent of running _validate_part for each part in order"""
+        checks = await self.datacenter_rag.check_inventory(parts)
+        unresolved = [part for part, check in zip(parts, checks) if check is None]
+        unresolved_stages = dict(zip(unresolved, await self._query_parts_batch(unresolved)))
+
+        stage = _empty_stage_result()
+        for part, check in zip(parts, checks):
+            if check is not None:
+                self._apply_inventory_check(stage, check)
+            else:
+                for key, values in unresolved_stages[part].items():
+                    stage[key].extend(values)
+        return stage
+
+    async def _query_parts_batch(self, parts: List[str]) -> List[Dict]:
+        """Vector search + one completion for parts the inventory index can't resolve"""
+        stages = [_empty_stage_result() for _ in parts]
+        if not parts:
+            return stages
+
+        inventory_results = await self.datacenter_rag.query_many(
+            [f"inventory availability {part}" for part in parts],
+            match_count=2,
+            filter_type="inventory"
+        )
+        # Parts with no inventory records are skipped, as in the per-part path
+        found = [
+            (stages[i], part, results[0])
+            for i, (part, results) in enumerate(zip(parts, inventory_results))
+            if results
+        ]
+        if not found:
+            return stages
+
+        parts_listing = "\n".join(
+            f"{i + 1}. The user needs: {part}\n   Inventory status: {record['content']}"
+            for i, (_, part, record) in enumerate(found)
+        )
+        inventory_prompt = f"""
+        Check each required part against its inventory status.
+        
+        {parts_listing}
+        
+        For every part, in the same order: is this part available? If not, suggest alternatives.
+        Respond in JSON: {{"results": [{{"part": str, "available": bool, "quantity": int, "warning": str, "alternative": str}}]}}
+        with exactly {len(found)} entries.
+        """
+        try:
+            response = await get_openai_client().chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": inventory_prompt}],
+                response_format={"type": "json_object"}
+            )
+            results = json.loads(response.choices[0].message.content)["results"]
+        except Exception as e:
+            for stage, _, _ in found:
+                stage["warnings"].append(f"Inventory validation error: {e}")
+            return stages
+
+        by_name = {str(result.get("part")): result for result in results if isinstance(result, dict)}
+        for i, (stage, part, _) in enumerate(found):
             try:
-                technical_answer = await process_query(tech_query)
-                requirements.append(technical_answer["answer"])
-                technical_context = technical_answer["sources"]
+                if len(results) == len(found):
+                    result = results[i]
+                elif part in by_name:
+                    result = by_name[part]
+                else:
+                    raise ValueError(f"no result returned for {part}")
+                if not result["available"]:
+                    stage["warnings"].append(result["warning"])
+                    if result.get("alternative"):
+                        stage["suggestions"].append(result["alternative"])
             except Exception as e:
-                warnings.append(f"Technical RAG error: {e}")
+                stage["warnings"].append(f"Inventory validation error: {e}")
+
+        return stages
+
+    async def _validate_technical(self, device: str) -> Dict:
+        stage = _empty_stage_result()
+
+        tech_query = f"{device} installation requirements power cables specifications"
+        try:
+            # Templated queries for different devices embed too close together
+            # to share answers through the semantic cache
+            technical_answer = await process_query(tech_query, use_answer_cache=False)
+            stage["requirements"].append(technical_answer["answer"])
+            stage["technical_context"] = technical_answer["sources"]
+        except Exception as e:
+            stage["warnings"].append(f"Technical RAG error: {e}")
+
+        return stage
+
+    def _plan_stages(self, ticket_data: Dict) -> List[Stage]:
+        """Independent validation stages, in the order their output is reported"""
+        location_inputs = {key: ticket_data.get(key) for key in ("pod", "switch", "rack", "ports")}
+        stages = [("location", location_inputs, "topology", lambda: self._validate_location(ticket_data))]
+
+        parts = ticket_data.get("required_parts") or []
+        if self.batch_inventory and len(parts) > 1:
+            stages.append(("parts", {"parts": parts}, "inventory", lambda: self._validate_parts_batch(parts)))
+        else:
+            for i, part in enumerate(parts):
+                stages.append((f"part:{i}", {"part": part}, "inventory", lambda part=part: self._validate_part(part)))
+
+        device = ticket_data.get("device", "")
+        if device:
+            stages.append(("technical", {"device": device}, "manuals", lambda: self._validate_technical(device)))
+
+        return stages
+
+    async def _fingerprint_stages(self, stages: List[Stage]) -> List[Optional[str]]:
+        """Per-stage fingerprint of its inputs and knowledge version; None when it can't be versioned"""
+        versions = {"manuals": "token-ttl"}
+        for section in {section for _, _, section, _ in stages} - set(versions):
+            versions[section] = await self.datacenter_rag.knowledge_version(section)
+
+        fingerprints = []
+        for name, inputs, section, _ in stages:
+            if versions[section] is None:
+                fingerprints.append(None)
+                continue
+            key = json.dumps([name, _normalize(inputs), section, versions[section]], sort_keys=True)
+            fingerprints.append(hashlib.sha256(key.encode("utf-8")).hexdigest())
+        return fingerprints
+
+    @staticmethod
+    def _summarize(stage_results: List[Dict]) -> Dict:
+        """Merge stage results, in plan order, into the validation response"""
+        validation = _empty_stage_result()
+        for stage in stage_results:
+            for key, values in stage.items():
+                validation[key].extend(values)
 
         return {
-            "is_valid": len(warnings) == 0,
-            "warnings": warnings,
-            "suggestions": suggestions,
-            "technical_requirements": requirements,
-            "datacenter_context": datacenter_context,
-            "technical_context": technical_context
+            "is_valid": len(validation["warnings"]) == 0,
+            "warnings": validation["warnings"],
+            "suggestions": validation["suggestions"],
+            "technical_requirements": validation["requirements"],
+            "datacenter_context": validation["datacenter_context"],
+            "technical_context": validation["technical_context"]
         }
-    
-    async def create_validated_ticket(self, ticket_data: Dict, user_id: str = None) -> Dict:
+
+    async def validate_tickets(self, tickets: List[Dict]) -> List[Dict]:
         """
-        Complete flow: Validate -> Assign Priority -> Create Ticket in Supabase
+        Validate a batch of tickets, running each distinct stage once: tickets
+        sharing a switch/pod/rack/ports, parts list or device share that stage's result
         """
-        # Step 1: Validate the ticket
-        validation_result = await self.validate_ticket(ticket_data)
-        
-        if not validation_result["is_valid"]:
-            return {
-                "success": False,
-                "message": "Ticket validation failed. Please address warnings.",
-                "validation": validation_result
-            }
-        
-        # Step 2: Assign priority
-        priority_result = await self.priority_service.assign_priority(
-            ticket_data, 
-            validation_result
-        )
-        
-        # Step 3: Create ticket in Supabase
-        ticket_record = {
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_stage(stage: Callable[[], Awaitable[Dict]]) -> Dict:
+            async with semaphore:
+                return await stage()
+
+        plans = [self._plan_stages(ticket_data) for ticket_data in tickets]
+        keys = [
+            [json.dumps([name.split(":")[0], _normalize(inputs)], sort_keys=True) for name, inputs, _, _ in plan]
+            for plan in plans
+        ]
+        unique = {}
+        for plan, plan_keys in zip(plans, keys):
+            for (_, _, _, stage), key in zip(plan, plan_keys):
+                unique.setdefault(key, stage)
+
+        tasks = [asyncio.ensure_future(run_stage(stage)) for stage in unique.values()]
+        try:
+            results = dict(zip(unique, await asyncio.gather(*tasks)))
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return [self._summarize([results[key] for key in plan_keys]) for plan_keys in keys]
+
+    async def prefetch(self, session_id: Optional[str], ticket_data: Dict) -> List[str]:
+        """
+        Start, in the background, the stages whose inputs a partially filled
+        ticket already has (switch + pod, required_parts, device). A stage
+        already running for this session is kept if its inputs are unchanged
+        and cancelled otherwise. Returns the names of newly started stages.
+        """
+        if not self.prefetch_enabled or not session_id:
+            return []
+        self._expire_prefetches()
+
+        plan = [
+            stage for stage in self._plan_stages(ticket_data)
+            if stage[0] != "location" or (ticket_data.get("switch") and ticket_data.get("pod"))
+        ]
+        fingerprints = await self._fingerprint_stages(plan)
+        previous = self._prefetches.pop(session_id, {"stages": {}})["stages"]
+
+        stages, started = {}, []
+        for (name, _, _, stage), fingerprint in zip(plan, fingerprints):
+            if fingerprint is None:
+                continue
+            running = previous.pop(name, None)
+            if running is not None and running[0] == fingerprint and not running[1].cancelled():
+                stages[name] = running
+                continue
+            if running is not None:
+                running[1].cancel()
+            task = asyncio.ensure_future(stage())
+            task.add_done_callback(_consume_exception)
+            stages[name] = (fingerprint, task)
+            started.append(name)
+
+        # Stages the ticket no longer plans (e.g. part:0 became parts)
+        for _, task in previous.values():
+            task.cancel()
+
+        self._prefetches[session_id] = {"stages": stages, "expires_at": time.monotonic() + PREFETCH_TTL_SECONDS}
+        while len(self._prefetches) > PREFETCH_MAX_SESSIONS:
+            self._cancel_prefetch(next(iter(self._prefetches)))
+        return started
+
+    def _cancel_prefetch(self, session_id: str):
+        for _, task in self._prefetches.pop(session_id, {"stages": {}})["stages"].values():
+            task.cancel()
+
+    def _expire_prefetches(self):
+        now = time.monotonic()
+        for session_id in [key for key, session in self._prefetches.items() if session["expires_at"] < now]:
+            self._cancel_prefetch(session_id)
+
+    async def validate_ticket(
+        self,
+        ticket_data: Dict,
+        validation_token: Optional[str] = None,
+        session_id: Optional[str] = None,
+        progress: Progress = None
+    ) -> Dict:
+        """
+        Run the validation stages. Stages recorded in validation_token with a
+        matching fingerprint are reused, and stages the chat session already
+        prefetched with the same inputs are awaited instead of started; the
+        result carries a fresh token.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        prefetched = self._prefetches.pop(session_id, {"stages": {}})["stages"] if session_id else {}
+        report = progress or (lambda name, state: None)
+
+        async def run_stage(name: str, fingerprint: Optional[str], stage: Callable[[], Awaitable[Dict]]) -> Dict:
+            report(name, "running")
+            try:
+                result = await resolve_stage(name, fingerprint, stage)
+            except Exception:
+                report(name, "failed")
+                raise
+            report(name, "done")
+            return result
+
+        async def resolve_stage(name: str, fingerprint: Optional[str], stage: Callable[[], Awaitable[Dict]]) -> Dict:
+            running = prefetched.pop(name, None)
+            if running is not None and fingerprint is not None and running[0] == fingerprint:
+                try:
+                    # Shielded so cancelling this request doesn't look like a replaced prefetch
+                    return await asyncio.shield(running[1])
+                except asyncio.CancelledError:
+                    if not running[1].cancelled():
+                        raise
+                except Exception as e:
+                    print(f"Prefetched {name} stage failed, re-running: {e}")
+            elif running is not None:
+                running[1].cancel()
+            async with semaphore:
+                return await stage()
+
+        plan = self._plan_stages(ticket_data)
+        fingerprints = await self._fingerprint_stages(plan)
+        previous = read_token(validation_token)
+
+        stage_results: List[Optional[Dict]] = [None] * len(plan)
+        # Reused results keep the time they were computed so re-issuing a token
+        # doesn't extend how long they can be carried forward
+        computed_at = [time.time()] * len(plan)
+        pending = {}
+        for i, ((name, _, _, stage), fingerprint) in enumerate(zip(plan, fingerprints)):
+            recorded = previous.get(name) or {}
+            if fingerprint is not None and recorded.get("fingerprint") == fingerprint:
+                stage_results[i] = recorded["result"]
+                computed_at[i] = recorded["computed_at"]
+                report(name, "done")
+            else:
+                pending[i] = (name, fingerprint, stage)
+        prefetched_stages = [
+            name for name, fingerprint, _ in pending.values()
+            if name in prefetched and prefetched[name][0] == fingerprint
+        ]
+
+        # Stages only depend on the ticket, so run them concurrently and merge
+        # their results back in plan order
+        tasks = [asyncio.ensure_future(run_stage(*stage)) for stage in pending.values()]
+        try:
+            for i, result in zip(pending, await asyncio.gather(*tasks)):
+                stage_results[i] = result
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            # Prefetches for stages this ticket no longer has
+            for _, task in prefetched.values():
+                task.cancel()
+
+        return {
+            **self._summarize(stage_results),
+            "validation_token": issue_token({
+                name: {"fingerprint": fingerprint, "result": result, "computed_at": stage_computed_at}
+                for (name, _, _, _), fingerprint, result, stage_computed_at
+                in zip(plan, fingerprints, stage_results, computed_at)
+                if fingerprint is not None
+            }),
+            "reused_stages": [name for i, (name, _, _, _) in enumerate(plan) if i not in pending],
+            "prefetched_stages": prefetched_stages
+        }
+    
+    @staticmethod
+    def _ticket_record(ticket_data: Dict, validation_result: Dict, priority_result: Dict, user_id: Optional[str]) -> Dict:
+        """tickets row for a validated, prioritized ticket"""
+        return {
             "title": f"{ticket_data.get('action', 'INSTALL')} {ticket_data['device']} in {ticket_data['pod']}",
             "description": ticket_data.get('description', ''),
             "device": ticket_data['device'],
@@ -145,8 +513,49 @@ class TicketValidationService:
             "created_by": user_id,
             "assigned_to": ticket_data.get('assigned_to_user_id')  # Use resolved user_id
         }
+
+    async def create_validated_ticket(
+        self,
+        ticket_data: Dict,
+        user_id: str = None,
+        validation_token: Optional[str] = None,
+        session_id: Optional[str] = None,
+        progress: Progress = None
+    ) -> Dict:
+        """
+        Complete flow: Validate -> Assign Priority -> Create Ticket in Supabase
+        """
+        report = progress or (lambda name, state: None)
+
+        # Step 1: Validate the ticket, reusing stages /validate or the chat already ran
+        validation_result = await self.validate_ticket(ticket_data, validation_token, session_id, progress)
         
-        result = supabase.table("tickets").insert(ticket_record).execute()
+        if not validation_result["is_valid"]:
+            return {
+                "success": False,
+                "message": "Ticket validation failed. Please address warnings.",
+                "validation": validation_result
+            }
+        
+        # Step 2: Assign priority
+        report("priority", "running")
+        priority_result = await self.priority_service.assign_priority(
+            ticket_data, 
+            validation_result
+        )
+        report("priority", "done")
+        
+        # Step 3: Create ticket in Supabase
+        ticket_record = self._ticket_record(ticket_data, validation_result, priority_result, user_id)
+        
+        report("insert", "running")
+        db = await get_db()
+        try:
+            result = await db.table("tickets").insert(ticket_record).execute()
+        except Exception:
+            report("insert", "failed")
+            raise
+        report("insert", "done")
         
         return {
             "success": True,
@@ -156,3 +565,55 @@ class TicketValidationService:
             "priority": priority_result
         }
 
+    async def create_validated_tickets(self, tickets: List[Dict], user_id: str = None) -> List[Dict]:
+        """
+        Bulk create_validated_ticket: shared stages validated once, one
+        priority pass for the batch and a single insert. Returns one result
+        per ticket, in order.
+        """
+        validations = await self.validate_tickets(tickets)
+        valid = [i for i, validation in enumerate(validations) if validation["is_valid"]]
+
+        priorities = await self.priority_service.assign_priorities(
+            [(tickets[i], validations[i]) for i in valid]
+        )
+        records = [
+            self._ticket_record(tickets[i], validations[i], priority, user_id)
+            for i, priority in zip(valid, priorities)
+        ]
+
+        rows = []
+        if records:
+            db = await get_db()
+            result = await db.table("tickets").insert(records).execute()
+            rows = result.data or []
+
+        results = [
+            {
+                "success": False,
+                "message": "Ticket validation failed. Please address warnings.",
+                "validation": validation
+            }
+            for validation in validations
+        ]
+        for n, (i, priority) in enumerate(zip(valid, priorities)):
+            results[i] = {
+                "success": True,
+                "message": "Ticket created successfully",
+                "ticket": rows[n] if n < len(rows) else None,
+                "validation": validations[i],
+                "priority": priority
+            }
+        return results
+
+
+
+_service: Optional[TicketValidationService] = None
+
+
+def get_validation_service() -> TicketValidationService:
+    """Process-wide service, shared by the chat (prefetch) and ticket routes"""
+    global _service
+    if _service is None:
+        _service = TicketValidationService()
+    return _service
@@ -0,0 +1,64 @@
+"""
+Signed validation tokens handed out by /api/tickets/validate.
+
+A token carries each validation stage's result together with the fingerprint
+of what that stage read (its normalized ticket fields and the version of the
+knowledge it consulted). /api/tickets/create passes the token back so stages
+whose fingerprint still matches are reused instead of re-run. Tokens are
+HMAC-signed so clients can't forge a passing result. Each stage also carries
+the time its result was computed, kept as-is when a reused result is signed
+into a new token, and is dropped once that is VALIDATION_TOKEN_TTL_SECONDS
+old. This bounds staleness of knowledge that has no cheap version (the
+manuals corpus) however many times a token is passed back and re-issued.
+"""
+from typing import Dict, Optional
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+import zlib
+
+TOKEN_TTL_SECONDS = float(os.getenv("VALIDATION_TOKEN_TTL_SECONDS", "900"))
+
+_secret = os.getenv("VALIDATION_TOKEN_SECRET")
+if not _secret:
+    # Tokens then only verify in the process that issued them
+    print("VALIDATION_TOKEN_SECRET not set; using a per-process validation token secret")
+    _secret = secrets.token_hex(32)
+SECRET = _secret.encode("utf-8")
+
+
+def _sign(body: bytes) -> str:
+    return hmac.new(SECRET, body, hashlib.sha256).hexdigest()
+
+
+def issue_token(stages: Dict[str, Dict]) -> str:
+    """stages maps a stage name to {"fingerprint", "result", "computed_at"}"""
+    payload = json.dumps({"issued_at": time.time(), "stages": stages}, separators=(",", ":"))
+    body = base64.urlsafe_b64encode(zlib.compress(payload.encode("utf-8"))).rstrip(b"=")
+    return f"{body.decode('ascii')}.{_sign(body)}"
+
+
+def read_token(token: Optional[str]) -> Dict[str, Dict]:
+    """Unexpired stages of a valid token; {} for anything else"""
+    if not token:
+        return {}
+    try:
+        body, signature = token.rsplit(".", 1)
+        if not hmac.compare_digest(_sign(body.encode("ascii")), signature):
+            return {}
+        padded = body + "=" * (-len(body) % 4)
+        payload = json.loads(zlib.decompress(base64.urlsafe_b64decode(padded)))
+    except Exception:
+        return {}
+    now = time.time()
+    if now - payload.get("issued_at", 0) > TOKEN_TTL_SECONDS:
+        return {}
+    return {
+        name: stage
+        for name, stage in (payload.get("stages") or {}).items()
+        if now - stage.get("computed_at", 0) <= TOKEN_TTL_SECONDS
+    }
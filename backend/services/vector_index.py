@@ -0,0 +1,134 @@
+import json
+import numpy as np
+from typing import Dict, List, Optional
+
+
+def parse_embedding(value) -> List[float]:
+    """pgvector columns come back from PostgREST as a '[0.1,0.2,...]' string"""
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
+
+class LocalVectorIndex:
+    """
+    Exact cosine-similarity search over an in-memory embedding matrix.
+
+    Rows live in one contiguous float32 matrix of unit vectors, so a query is
+    a single matrix-vector product; positions are grouped by document_type so
+    filtered queries only touch their own rows.
+    """
+
+    def __init__(self):
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        self._rows: List[Dict] = []
+        self._positions: Dict = {}
+        self._by_type: Optional[Dict[str, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(parse_embedding(embedding), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def load(self, rows: List[Dict]) -> None:
+        """Replace the index contents with rows carrying an embedding column"""
+        rows = [row for row in rows if row.get("embedding") is not None]
+        vectors = [self._normalize(row["embedding"]) for row in rows]
+        dim = len(vectors[0]) if vectors else 0
+        self._matrix = np.vstack(vectors) if vectors else np.zeros((0, dim), dtype=np.float32)
+        self._size = len(rows)
+        self._rows = [self._strip(row) for row in rows]
+        self._positions = {row["id"]: i for i, row in enumerate(self._rows)}
+        self._by_type = None
+
+    @staticmethod
+    def _strip(row: Dict) -> Dict:
+        return {
+            "id": row.get("id"),
+            "content": row.get("content"),
+            "document_type": row.get("document_type"),
+            "metadata": row.get("metadata") or {}
+        }
+
+    def upsert(self, row: Dict) -> None:
+        vector = self._normalize(row["embedding"])
+        position = self._positions.get(row["id"])
+
+        if position is None:
+            if self._size == 0:
+                self._matrix = np.zeros((8, len(vector)), dtype=np.float32)
+            elif self._size == len(self._matrix):
+                # Grow geometrically so repeated inserts stay amortized O(1)
+                grown = np.zeros((len(self._matrix) * 2, self._matrix.shape[1]), dtype=np.float32)
+                grown[:self._size] = self._matrix[:self._size]
+                self._matrix = grown
+            position = self._size
+            self._size += 1
+            self._rows.append(self._strip(row))
+            self._positions[row["id"]] = position
+        else:
+            self._rows[position] = {**self._rows[position], **{
+                key: value for key, value in self._strip(row).items() if row.get(key) is not None
+            }}
+
+        self._matrix[position] = vector
+        self._by_type = None
+
+    def remove(self, doc_id) -> None:
+        position = self._positions.pop(doc_id, None)
+        if position is None:
+            return
+
+        # Move the last row into the hole to keep the matrix contiguous
+        last = self._size - 1
+        if position != last:
+            self._matrix[position] = self._matrix[last]
+            self._rows[position] = self._rows[last]
+            self._positions[self._rows[position]["id"]] = position
+        self._rows.pop()
+        self._size -= 1
+        self._by_type = None
+
+    def _type_positions(self, document_type: str) -> np.ndarray:
+        if self._by_type is None:
+            groups: Dict[str, List[int]] = {}
+            for position, row in enumerate(self._rows):
+                groups.setdefault(row["document_type"], []).append(position)
+            self._by_type = {key: np.asarray(value, dtype=np.intp) for key, value in groups.items()}
+        return self._by_type.get(document_type, np.zeros(0, dtype=np.intp))
+
+    def query(
+        self,
+        query_embedding,
+        match_threshold: float = 0.7,
+        match_count: int = 5,
+        filter_type: Optional[str] = None
+    ) -> List[Dict]:
+        """Same contract as the match_datacenter_documents RPC"""
+        if self._size == 0 or match_count <= 0:
+            return []
+
+        query = self._normalize(query_embedding)
+        if filter_type:
+            positions = self._type_positions(filter_type)
+            if len(positions) == 0:
+                return []
+            similarities = self._matrix[positions] @ query
+        else:
+            positions = np.arange(self._size)
+            similarities = self._matrix[:self._size] @ query
+
+        keep = np.flatnonzero(similarities > match_threshold)
+        if len(keep) > match_count:
+            keep = keep[np.argpartition(-similarities[keep], match_count - 1)[:match_count]]
+        keep = keep[np.argsort(-similarities[keep], kind="stable")]
+
+        return [
+            {**self._rows[positions[i]], "similarity": float(similarities[i])}
+            for i in keep
+        ]
@@ -0,0 +1,32 @@
+"""
+Server-sent events helpers for the streaming endpoints.
+
+Streams are async iterators of (event, data) pairs; event_stream() frames
+them as text/event-stream and turns an exception raised mid-stream into a
+final "error" event, since the status code has already been sent.
+"""
+import json
+from typing import Any, AsyncIterator, Tuple
+
+from fastapi.responses import StreamingResponse
+
+
+def format_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def event_stream(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    async def body():
+        try:
+            async for event, data in events:
+                yield format_event(event, data)
+        except Exception as e:
+            print(f"Stream error: {e}")
+            yield format_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,46 @@
+"""
+/llm/api/chat must not hold the event loop while it waits on OpenAI.
+
+Run from backend/:
+    python -m pytest -q
+"""
+import asyncio
+import os
+import time
+
+import httpx
+from fastapi import FastAPI
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from routes import llm
+from scripts.fakes import FakeOpenAI
+from services.openai_client import set_openai_client
+
+CHAT_LATENCY = 0.3
+REQUESTS = 10
+PAYLOAD = {"message": "Install an H100 in Pod 7", "ticket_data": {}}
+
+
+async def fire_chats(requests: int):
+    app = FastAPI()
+    app.include_router(llm.router, prefix="/llm")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api.local") as api:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            api.post("/llm/api/chat", json=PAYLOAD) for _ in range(requests)
+        ])
+        return responses, time.perf_counter() - start
+
+
+def test_concurrent_chats_overlap():
+    client = FakeOpenAI(chat_latency=CHAT_LATENCY)
+    set_openai_client(client)
+
+    responses, elapsed = asyncio.run(fire_chats(REQUESTS))
+
+    assert all(response.status_code == 200 for response in responses)
+    assert client.chat_calls == REQUESTS
+    # Serially this would take REQUESTS * CHAT_LATENCY; overlapping calls finish in about one
+    assert elapsed < 3 * CHAT_LATENCY, f"{REQUESTS} chats took {elapsed:.2f}s, they ran one after another"
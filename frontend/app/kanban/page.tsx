@@ -1,5 +1,5 @@
 'use client';
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useAuth, useUser } from '@clerk/nextjs';
 import { useRouter } from 'next/navigation';
 // import { Header } from '../../components/Header';
@@ -23,6 +23,10 @@ export default function KanbanBoard() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [isGeneratingWorkflow, setIsGeneratingWorkflow] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Scroll events fire faster than state updates; guards against double-fetching a page
+  const loadingMoreRef = useRef(false);
 
   const columns: { title: string; status: TicketStatus }[] = [
     { title: 'Ready', status: 'ready' },
@@ -70,17 +74,112 @@ export default function KanbanBoard() {
     }
   };
 
+  const toTicket = (ticket: any): Ticket => ({
+    id: ticket.id,
+    title: ticket.title,
+    priority: ticket.priority,
+    status: ticket.status,
+    deviceType: ticket.device,
+    location: `${ticket.pod}, Rack ${ticket.rack || 'N/A'}`,
+    estimatedDuration: ticket.estimated_duration_minutes || 30,
+    createdAt: new Date(ticket.created_at),
+    description: ticket.description || '',
+    inventory: ticket.required_parts ? JSON.parse(ticket.required_parts) : [],
+    technicalRequirements: ticket.technical_requirements ? JSON.parse(ticket.technical_requirements) : [],
+    warnings: ticket.warnings ? JSON.parse(ticket.warnings) : [],
+    suggestions: ticket.suggestions ? JSON.parse(ticket.suggestions) : [],
+    priorityJustification: ticket.priority_justification || '',
+    assignedToEmail: ticket.assigned_to_email || ticket.assigned_to || '',
+    switchName: ticket.switch || undefined,
+    ports: (() => {
+      if (!ticket.ports) return undefined;
+      if (Array.isArray(ticket.ports)) return ticket.ports;
+      try {
+        return JSON.parse(ticket.ports);
+      } catch {
+        return undefined;
+      }
+    })(),
+  });
+
+  const fetchTicketPage = async (cursor: string | null) => {
+    const token = await getToken();
+    if (!token) throw new Error('Not authenticated');
+
+    // ticket_creator sees all tickets, technician sees only assigned tickets
+    const endpoint = userRole === 'ticket_creator' ? `${API_BASE_URL}/list` : `${API_BASE_URL}/my-tickets`;
+    const pageUrl: string = cursor ? `${endpoint}?cursor=${encodeURIComponent(cursor)}` : endpoint;
+    const response = await fetch(pageUrl, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+        Authorization: `Bearer ${token}`,
+      },
+    });
+
+    if (!response.ok) throw new Error(`Failed to fetch tickets: ${response.statusText}`);
+
+    const data = await response.json();
+    return {
+      tickets: data.tickets.map(toTicket) as Ticket[],
+      nextCursor: (data.next_cursor as string | null) || null,
+    };
+  };
+
+  // The board view is paginated: render the first page right away and load
+  // later pages as the board is scrolled (or with "Load more")
   const fetchTickets = async () => {
     try {
       setLoading(true);
       setError(null);
+      const page = await fetchTicketPage(null);
+      setTickets(page.tickets);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('Error fetching tickets:', err);
+      setError(err instanceof Error ? err.message : 'Failed to load tickets');
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const loadMoreTickets = async () => {
+    if (!nextCursor || loadingMoreRef.current) return;
+    loadingMoreRef.current = true;
+    setLoadingMore(true);
+    try {
+      const page = await fetchTicketPage(nextCursor);
+      setTickets((prevTickets) => {
+        const loaded = new Set(prevTickets.map((t) => t.id));
+        return [...prevTickets, ...page.tickets.filter((t) => !loaded.has(t.id))];
+      });
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('Error loading more tickets:', err);
+    } finally {
+      loadingMoreRef.current = false;
+      setLoadingMore(false);
+    }
+  };
+
+  const handleBoardScroll = (e: React.UIEvent<HTMLDivElement>) => {
+    const board = e.currentTarget;
+    if (board.scrollHeight - board.scrollTop - board.clientHeight < 300) {
+      loadMoreTickets();
+    }
+  };
+
+  // Warnings, suggestions and technical requirements are not part of the board
+  // view; load them the first time a card is expanded
+  const loadTicketContext = async (ticketId: string) => {
+    const ticket = tickets.find((t) => t.id === ticketId);
+    if (!ticket || ticket.contextLoaded) return;
+
+    try {
       const token = await getToken();
       if (!token) throw new Error('Not authenticated');
 
-      // ticket_creator sees all tickets, technician sees only assigned tickets
-      const endpoint = userRole === 'ticket_creator' ? `${API_BASE_URL}/list` : `${API_BASE_URL}/my-tickets`;
-
-      const response = await fetch(endpoint, {
+      const response = await fetch(`${API_BASE_URL}/${ticketId}/context`, {
         method: 'GET',
         headers: {
           'Content-Type': 'application/json',
@@ -88,43 +187,25 @@ export default function KanbanBoard() {
         },
       });
 
-      if (!response.ok) throw new Error(`Failed to fetch tickets: ${response.statusText}`);
+      if (!response.ok) throw new Error(`Failed to fetch ticket details: ${response.statusText}`);
 
       const data = await response.json();
-      const transformedTickets: Ticket[] = data.tickets.map((ticket: any) => ({
-        id: ticket.id,
-        title: ticket.title,
-        priority: ticket.priority,
-        status: ticket.status,
-        deviceType: ticket.device,
-        location: `${ticket.pod}, Rack ${ticket.rack || 'N/A'}`,
-        estimatedDuration: ticket.estimated_duration_minutes || 30,
-        createdAt: new Date(ticket.created_at),
-        description: ticket.description || '',
-        inventory: ticket.required_parts ? JSON.parse(ticket.required_parts) : [],
-        technicalRequirements: ticket.technical_requirements ? JSON.parse(ticket.technical_requirements) : [],
-        warnings: ticket.warnings ? JSON.parse(ticket.warnings) : [],
-        suggestions: ticket.suggestions ? JSON.parse(ticket.suggestions) : [],
-        priorityJustification: ticket.priority_justification || '',
-        assignedToEmail: ticket.assigned_to_email || ticket.assigned_to || '',
-        switchName: ticket.switch || undefined,
-        ports: (() => {
-          if (!ticket.ports) return undefined;
-          if (Array.isArray(ticket.ports)) return ticket.ports;
-          try {
-            return JSON.parse(ticket.ports);
-          } catch {
-            return undefined;
-          }
-        })(),
-      }));
-
-      setTickets(transformedTickets);
+      const context = data.ticket;
+      setTickets((prevTickets) =>
+        prevTickets.map((t) =>
+          t.id === ticketId
+            ? {
+                ...t,
+                technicalRequirements: context.technical_requirements ? JSON.parse(context.technical_requirements) : [],
+                warnings: context.warnings ? JSON.parse(context.warnings) : [],
+                suggestions: context.suggestions ? JSON.parse(context.suggestions) : [],
+                contextLoaded: true,
+              }
+            : t
+        )
+      );
     } catch (err) {
-      console.error('Error fetching tickets:', err);
-      setError(err instanceof Error ? err.message : 'Failed to load tickets');
-    } finally {
-      setLoading(false);
+      console.error('Error fetching ticket details:', err);
     }
   };
 
@@ -395,7 +476,7 @@ export default function KanbanBoard() {
           )}
         </div>
 
-        <div className="flex-1 overflow-auto min-h-0">
+        <div className="flex-1 overflow-auto min-h-0" onScroll={handleBoardScroll}>
           <div className="p-6">
             <div className="flex gap-4">
               {columns.map((col) => (
@@ -406,9 +487,25 @@ export default function KanbanBoard() {
                   tickets={tickets.filter((t) => t.status === col.status)}
                   onDrop={handleDrop}
                   onDragStart={handleDragStart}
+                  onExpandTicket={loadTicketContext}
                 />
               ))}
             </div>
+            {nextCursor && (
+              <div className="flex justify-center mt-6">
+                <button
+                  onClick={loadMoreTickets}
+                  disabled={loadingMore}
+                  className={`px-4 py-2 rounded transition ${
+                    loadingMore
+                      ? 'bg-gray-300 text-gray-500 cursor-not-allowed'
+                      : 'bg-white border border-gray-300 text-gray-700 hover:bg-gray-100'
+                  }`}
+                >
+                  {loadingMore ? 'Loading...' : 'Load more tickets'}
+                </button>
+              </div>
+            )}
           </div>
         </div>
       </div>
@@ -8,6 +8,7 @@ interface BoardColumnProps {
   tickets: Ticket[];
   onDrop: (ticketId: string, newStatus: TicketStatus) => void;
   onDragStart: () => void;
+  onExpandTicket?: (ticketId: string) => void;
 }
 
 export const BoardColumn: React.FC<BoardColumnProps> = ({ 
@@ -15,7 +16,8 @@ export const BoardColumn: React.FC<BoardColumnProps> = ({
   status, 
   tickets,
   onDrop,
-  onDragStart
+  onDragStart,
+  onExpandTicket
 }) => {
   const [isDragOver, setIsDragOver] = useState(false);
   const [draggingId, setDraggingId] = useState<string | null>(null);
@@ -73,7 +75,7 @@ export const BoardColumn: React.FC<BoardColumnProps> = ({
               >
                 <TicketCard 
                   ticket={ticket} 
-                  onExpand={() => {}} 
+                  onExpand={() => onExpandTicket?.(ticket.id)} 
                   isDragging={draggingId === ticket.id}
                 />
               </div>
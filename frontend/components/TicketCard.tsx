@@ -24,6 +24,7 @@ export interface Ticket {
   priorityJustification?: string;
   switchName?: string;
   ports?: string[];
+  contextLoaded?: boolean;
 }
 
 const priorityColors: Record<Priority, string> = {
@@ -91,7 +92,10 @@ export const TicketCard: React.FC<TicketCardProps> = ({ ticket, onExpand, isDrag
       className={`w-110 bg-white rounded-2xl shadow-lg border-t-4 ${priorityBorders[ticket.priority]} px-6 py-4 cursor-grab active:cursor-grabbing hover:shadow-xl transition-shadow ${
         isDragging ? 'opacity-50 rotate-2' : ''
       }`}
-      onClick={() => setIsExpanded(!isExpanded)}
+      onClick={() => {
+        if (!isExpanded) onExpand();
+        setIsExpanded(!isExpanded);
+      }}
     >
       <div className="flex items-start justify-between mb-2">
         <div className="flex items-center gap-2">
@@ -160,6 +160,8 @@ export const ChatInterface: React.FC = () => {
   const [ticketCreatedSuccessfully, setTicketCreatedSuccessfully] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [hasValidationError, setHasValidationError] = useState(false);
+  // Keys the backend's background validation of this ticket; renewed after each ticket is created
+  const [sessionId, setSessionId] = useState(() => crypto.randomUUID());
 
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const inputRef = useRef<HTMLInputElement>(null);
@@ -207,7 +209,7 @@ export const ChatInterface: React.FC = () => {
     setHasValidationError(false); // Clear validation error when user sends new message
 
     try {
-      const response = await fetch(`${API_BASE_URL}/llm/api/chat`, {
+      const response = await fetch(`${API_BASE_URL}/llm/api/chat/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -215,31 +217,70 @@ export const ChatInterface: React.FC = () => {
         body: JSON.stringify({
           message: currentInput,
           ticket_data: ticketData,
+          session_id: sessionId,
         }),
       });
 
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         throw new Error(`API error: ${response.status}`);
       }
 
-      const data = await response.json();
-
-      setTicketData(data.ticket_data);
-      setIsComplete(data.is_complete);
-
-      const fields = convertTicketDataToFields(data.ticket_data);
-      setExtractedFields(fields);
+      // Server-sent events: reply "token"s and extracted "field"s as they arrive, then "done"
+      const assistantId = (Date.now() + 1).toString();
+      let streamedData: TicketData = { ...ticketData };
+      let started = false;
+
+      const updateAssistant = (update: (message: Message) => Message) => {
+        if (!started) {
+          started = true;
+          setIsTyping(false);
+          setMessages((prev) => [
+            ...prev,
+            { id: assistantId, sender: 'assistant', content: '', timestamp: new Date() },
+          ]);
+        }
+        setMessages((prev) => prev.map((message) => (message.id === assistantId ? update(message) : message)));
+      };
 
-      const assistantMessage: Message = {
-        id: (Date.now() + 1).toString(),
-        sender: 'assistant',
-        content: data.response,
-        fields: fields.length > 0 ? fields : undefined,
-        timestamp: new Date(),
+      const handleEvent = (event: string, data: any) => {
+        if (event === 'token') {
+          updateAssistant((message) => ({ ...message, content: message.content + data.text }));
+        } else if (event === 'field') {
+          streamedData = { ...streamedData, [data.field]: data.value };
+          setExtractedFields(convertTicketDataToFields(streamedData));
+        } else if (event === 'done') {
+          setTicketData(data.ticket_data);
+          setIsComplete(data.is_complete);
+
+          const fields = convertTicketDataToFields(data.ticket_data);
+          setExtractedFields(fields);
+          updateAssistant((message) => ({
+            ...message,
+            content: data.response,
+            fields: fields.length > 0 ? fields : undefined,
+          }));
+        } else if (event === 'error') {
+          throw new Error(data.detail);
+        }
       };
 
-      setIsTyping(false);
-      setMessages((prev) => [...prev, assistantMessage]);
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const frame = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          const event = frame.match(/^event: (.*)$/m)?.[1];
+          const data = frame.match(/^data: (.*)$/m)?.[1];
+          if (event && data) handleEvent(event, JSON.parse(data));
+        }
+      }
     } catch (err) {
       setIsTyping(false);
       setError('Failed to communicate with the server. Please make sure the backend is running.');
@@ -286,7 +327,7 @@ export const ChatInterface: React.FC = () => {
           'Content-Type': 'application/json',
           Authorization: `Bearer ${token}`,
         },
-        body: JSON.stringify(ticketData),
+        body: JSON.stringify({ ...ticketData, session_id: sessionId }),
       });
 
       const data = await response.json();
@@ -352,6 +393,7 @@ export const ChatInterface: React.FC = () => {
       setTicketData({});
       setExtractedFields([]);
       setIsComplete(false);
+      setSessionId(crypto.randomUUID());
     } catch (err) {
       const errorMsg = err instanceof Error ? err.message : 'Failed to create ticket. Please try again.';
       setError(errorMsg);